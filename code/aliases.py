@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+别名解析：基因 symbol / UniProt / Ensembl gene 等外部 ID -> STRING protein_id（批量）
+
+一次性构建（解析 protein.aliases gz），之后以 mmap 打开：
+- proteins.npy    ：按字典序排序的 protein_id（与 string_net / protein_meta 一致）
+- key_hash.npy    ：uint64，别名键（strip + 大写）的 blake2b-64 哈希，升序
+- key_offset.npy  ：int64，长度 n_keys+1；第 i 个键 = key_arena[offset[i]:offset[i+1]]（UTF-8，驻留一次）
+- key_arena.npy   ：uint8，全部键的字节拼接（与 key_hash 同序）
+- post_offset.npy ：int64，长度 n_keys+1；第 i 个键的候选蛋白 = post_prot[offset[i]:offset[i+1]]
+- post_prot.npy   ：int32，候选蛋白编号（每个键内按支持该别名的来源数降序）
+- post_support.npy：int16，对应的来源数
+
+查询：批量算哈希 -> searchsorted 定位 -> 逐条核对键字节（排除哈希碰撞）。
+protein_id 本身以及去掉物种前缀的 ENSMUSP 也作为别名收录。
+
+歧义（一个别名对应多个蛋白）的处理 ambiguous=：
+  "best" ：取来源数最多的候选（并列取编号最小者）
+  "all"  ：每个候选一行
+  "drop" ：不解析，protein_id 留空
+"""
+
+import os
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+import string_net
+
+ALIASES_GZ = string_net.taxon_file("aliases")
+
+ALIAS_ARRAYS = ("proteins", "key_hash", "key_offset", "key_arena", "post_offset", "post_prot", "post_support")
+
+AMBIGUOUS = ("best", "all", "drop")
+
+
+def normalize(name) -> str:
+    return str(name).strip().upper()
+
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# -----------------------------
+# 1) 一次性构建
+# -----------------------------
+def build_store(aliases_path: str, out_dir: str):
+    df = pd.read_csv(aliases_path, sep="\t", compression="gzip", dtype=str, quoting=3)
+    if df.shape[1] < 2:
+        raise ValueError(f"无法识别列名/列数：当前 df.shape={df.shape}，请检查文件是否为 STRING protein.aliases。")
+    df = df.iloc[:, :3].copy()
+    df.columns = ["protein", "alias", "source"][:df.shape[1]]
+    if "source" not in df.columns:
+        df["source"] = "alias"
+    df = df.dropna(subset=["protein", "alias"])
+
+    prot_code, proteins = pd.factorize(df["protein"], sort=True)
+    # protein_id 自身与去掉物种前缀的形式也可直接解析
+    own = pd.Series(np.asarray(proteins, dtype=str))
+    extra = pd.DataFrame({
+        "prot": np.tile(np.arange(len(own)), 2),
+        "key": pd.concat([own, own.str.split(".", n=1).str[-1]], ignore_index=True).str.upper(),
+        "source": "STRING",
+    })
+    pairs = pd.concat([
+        pd.DataFrame({"prot": prot_code, "key": df["alias"].str.strip().str.upper(), "source": df["source"]}),
+        extra,
+    ], ignore_index=True)
+    pairs = pairs[pairs["key"] != ""]
+
+    # 每个 (键, 蛋白) 的支持来源数
+    support = pairs.groupby(["key", "prot"], sort=False)["source"].nunique().rename("support").reset_index()
+
+    keys = pd.Series(support["key"].unique())
+    hashes = np.fromiter((key_hash(k) for k in keys), dtype=np.uint64, count=len(keys))
+    order = np.argsort(hashes, kind="stable")
+    keys, hashes = keys.iloc[order].reset_index(drop=True), hashes[order]
+    key_code = pd.Series(np.arange(len(keys)), index=keys)
+
+    support["k"] = key_code.loc[support["key"]].to_numpy()
+    support = support.sort_values(["k", "support", "prot"], ascending=[True, False, True], kind="stable")
+    post_offset = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(support["k"], minlength=len(keys)), out=post_offset[1:])
+
+    blobs = [k.encode("utf-8") for k in keys]
+    key_offset = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=key_offset[1:])
+
+    arrays = {
+        "proteins": np.asarray(proteins, dtype=str),
+        "key_hash": hashes,
+        "key_offset": key_offset,
+        "key_arena": np.frombuffer(b"".join(blobs), dtype=np.uint8),
+        "post_offset": post_offset,
+        "post_prot": support["prot"].to_numpy(np.int32),
+        "post_support": np.minimum(support["support"].to_numpy(), np.iinfo(np.int16).max).astype(np.int16),
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    for k in ALIAS_ARRAYS:
+        np.save(os.path.join(out_dir, f"{k}.npy"), arrays[k])
+    string_net.write_stamp(aliases_path, out_dir)
+
+
+# -----------------------------
+# 2) 批量解析
+# -----------------------------
+class AliasIndex:
+    """mmap 打开的别名索引"""
+
+    def __init__(self, out_dir: str):
+        for k in ALIAS_ARRAYS:
+            setattr(self, k, np.load(os.path.join(out_dir, f"{k}.npy"), mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.key_hash)
+
+    def _key(self, i: int) -> str:
+        return self.key_arena[self.key_offset[i]:self.key_offset[i + 1]].tobytes().decode("utf-8")
+
+    def lookup(self, names) -> np.ndarray:
+        """别名 -> 键编号；未收录记 -1"""
+        keys = [normalize(n) for n in names]
+        h = np.fromiter((key_hash(k) for k in keys), dtype=np.uint64, count=len(keys))
+        lo = np.searchsorted(self.key_hash, h, side="left")
+        hi = np.searchsorted(self.key_hash, h, side="right")
+        out = np.full(len(keys), -1, dtype=np.int64)
+        for q in np.nonzero(hi > lo)[0]:
+            for i in range(lo[q], hi[q]):      # 通常只有 1 个候选；多个即 64 位哈希碰撞
+                if self._key(i) == keys[q]:
+                    out[q] = i
+                    break
+        return out
+
+    def resolve(self, names, ambiguous: str = "best") -> pd.DataFrame:
+        """
+        返回列：query, protein_id, n_candidates, status（unique / ambiguous / unmatched）
+        ambiguous="all" 时歧义别名每个候选一行；protein_id 为空表示未解析
+        """
+        if ambiguous not in AMBIGUOUS:
+            raise ValueError(f"未知的歧义处理方式: {ambiguous}（可选：{', '.join(AMBIGUOUS)}）")
+        names = [str(n) for n in names]
+        k = self.lookup(names)
+        hit = k >= 0
+        start = np.where(hit, self.post_offset[np.maximum(k, 0)], 0)
+        n_cand = np.where(hit, self.post_offset[np.maximum(k, 0) + 1] - start, 0)
+        status = np.where(n_cand == 0, "unmatched", np.where(n_cand == 1, "unique", "ambiguous"))
+
+        if ambiguous == "all":
+            rep = np.maximum(n_cand, 1)
+            q = np.repeat(np.arange(len(names)), rep)
+            pos = np.repeat(start, rep) + np.arange(rep.sum()) - np.repeat(np.cumsum(rep) - rep, rep)
+            valid = np.repeat(n_cand > 0, rep)
+        else:
+            q = np.arange(len(names))
+            pos = start
+            valid = (n_cand == 1) | ((n_cand > 1) & (ambiguous == "best"))
+
+        pid = np.full(len(q), None, dtype=object)
+        pid[valid] = self.proteins[self.post_prot[pos[valid]]]
+        return pd.DataFrame({
+            "query": np.asarray(names, dtype=object)[q],
+            "protein_id": pid,
+            "n_candidates": n_cand[q],
+            "status": status[q],
+        })
+
+    def resolve_ids(self, names, ambiguous: str = "best") -> np.ndarray:
+        """只返回解析成功的 protein_id（去重，保持输入顺序）"""
+        res = self.resolve(names, ambiguous)
+        return np.asarray(pd.unique(res["protein_id"].dropna()), dtype=str)
+
+    def resolve_nodes(self, names, ids: np.ndarray, ambiguous: str = "best") -> np.ndarray:
+        """解析并映射为边表节点下标（string_net 编号），不在网络中的丢弃"""
+        idx = string_net.node_index(ids, self.resolve_ids(names, ambiguous))
+        return idx[idx >= 0]
+
+
+def load_aliases(aliases_path: str = ALIASES_GZ, cache_dir: str = string_net.CACHE_DIR) -> AliasIndex:
+    out_dir = string_net.cache_dir_for(aliases_path, cache_dir)
+    if not string_net.cache_is_fresh(aliases_path, out_dir):
+        print(f"[INFO] Building alias index from {aliases_path} ...")
+        build_store(aliases_path, out_dir)
+    return AliasIndex(out_dir)
+
+
+def split_names(text: str) -> list:
+    """粘贴的基因列表（逗号 / 空白 / 分号分隔）-> 名称列表"""
+    return [t for t in text.replace(",", " ").replace(";", " ").split() if t]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if not string_net.require_files(ALIASES_GZ):
+        sys.exit(1)
+
+    t0 = time.time()
+    index = load_aliases()
+    print(f"[INFO] {len(index)} alias keys, {len(index.proteins)} proteins ({time.time() - t0:.2f}s)")
+    names = split_names(" ".join(sys.argv[1:]) or "Trp53 Mdm2 Cdkn1a Brca1 P04637 ENSMUSG00000059552")
+    print(index.resolve(names, ambiguous="all").to_string(index=False))
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+常驻分析服务（localhost HTTP）：网络只加载一次，图表请求亚秒级返回
+
+启动时一次性载入：边表（mmap）+ 全分数 CSR、蛋白元数据存储、富集术语存储，
+并完成 hv.extension('bokeh') / plotly / pyvis 等重型 import。之后的请求：
+
+  GET  /chord?keyword=ribosomal&score=400&top_n=30      -> 弦图 HTML（同 pic7）
+  GET  /chord?genes=Trp53,Mdm2,Cdkn1a&score=400         -> 用户基因列表的弦图（别名解析）
+  GET  /chord_groups?keyword=ribosomal&by=prefix        -> 聚合弦图（按家族前缀 / 注释 / 社区分组）
+  GET  /chord_groups?keyword=ribosomal&by=prefix&expand=Rpl -> 展开某一组的成员弦图
+  GET  /community?cutoff=900&max_nodes=1000             -> 社区网络 HTML（同 pic3）
+  GET  /ego?gene=Trp53&scores=700,700&max_nodes=200     -> k 跳自我网络 HTML（每跳阈值 + 节点预算，pic3 样式）
+  GET  /enrichment?proteins=ID1,ID2,...&category=Process -> 富集结果 JSON（同 pic5）
+  POST /enrichment   body: {"proteins": [...], "category": "Process"}
+  GET  /resolve?names=Trp53,P04637,ENSMUSG00000059552   -> 别名解析结果 JSON
+  GET  /status                                          -> 载入规模与缓存命中统计
+
+- ThreadingHTTPServer：并发请求各占一个线程；bokeh / pyvis 写文件部分串行化
+- 结果按 (路由, 参数) 做 LRU 缓存；同一 key 的并发请求只计算一次
+- proteins / genes 可混用 gene symbol、UniProt、Ensembl 等外部 ID（有 aliases 文件时经 aliases 解析）
+
+用法：python code/analysis_daemon.py [--port 8765] [--data-dir data] [--taxon 10090]
+"""
+
+import os
+import json
+import argparse
+import threading
+import tempfile
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+import string_net
+import protein_meta
+import enrichment
+import kcore
+import aliases
+import chord_batch
+import chord_groups
+import ego_network
+
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_SIZE = 64          # LRU 缓存的结果条数
+WORK_DIR = os.path.join(string_net.ROOT_DIR, "outputs", "daemon")
+
+
+# -----------------------------
+# 1) 线程安全 LRU（同 key 并发请求合并为一次计算）
+# -----------------------------
+class LRUCache:
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+                self.misses += 1
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                if key in self._data:
+                    self.hits += 1
+                    return self._data[key]
+            return self.get_or_compute(key, compute)   # 计算方失败：重新尝试
+
+        try:
+            value = compute()
+            with self._lock:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# -----------------------------
+# 2) 常驻状态：网络 / 元数据 / 术语 + 重型库
+# -----------------------------
+class AnalysisState:
+    def __init__(self, data_dir: str, taxon: str = string_net.TAXON):
+        print("[INFO] Loading edge index ...")
+        self.edges = string_net.load_edges(string_net.taxon_file("links", taxon, data_dir))
+        self.csr = string_net.build_csr(self.edges.n_nodes, self.edges.src, self.edges.dst, self.edges.score)
+        print("[INFO] Loading protein metadata ...")
+        self.meta = protein_meta.load_meta(string_net.taxon_file("info", taxon, data_dir))
+        self.terms_path = string_net.taxon_file("enrichment.terms", taxon, data_dir)
+        self._terms = None
+        self._terms_lock = threading.Lock()
+        self.aliases_path = string_net.taxon_file("aliases", taxon, data_dir)
+        self._aliases = None
+        self._aliases_lock = threading.Lock()
+
+        print("[INFO] Initializing plotting engines ...")
+        import pic3
+        import pic7
+        pic7.init_engine()
+        self.pic3, self.pic7 = pic3, pic7
+        self.render_lock = threading.Lock()   # bokeh / pyvis 的文件输出串行化
+        os.makedirs(WORK_DIR, exist_ok=True)
+        self.meta.find("")                     # 预先解码注释，关键词查询不再付首次成本
+        print(f"[INFO] Ready: nodes={self.edges.n_nodes}, edges={len(self.edges.src)}")
+
+    @property
+    def terms(self) -> enrichment.TermStore:
+        with self._terms_lock:
+            if self._terms is None:
+                self._terms = enrichment.load_terms(self.terms_path)
+            return self._terms
+
+    @property
+    def aliases(self) -> aliases.AliasIndex:
+        with self._aliases_lock:
+            if self._aliases is None:
+                self._aliases = aliases.load_aliases(self.aliases_path)
+            return self._aliases
+
+    def resolve(self, names) -> np.ndarray:
+        """外部 ID / symbol -> protein_id；没有 aliases 文件时原样返回"""
+        if not os.path.exists(self.aliases_path):
+            return np.asarray(list(names), dtype=str)
+        return self.aliases.resolve_ids(names)
+
+    def _render_to_string(self, suffix: str, write) -> bytes:
+        with self.render_lock:
+            fd, path = tempfile.mkstemp(suffix=suffix, dir=WORK_DIR)
+            os.close(fd)
+            try:
+                write(path)
+                with open(path, "rb") as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+    # ---- 弦图：关键词（或基因列表）+ 分数阈值 ----
+    def chord(self, keyword: str, score: int, top_n: int, genes=None) -> bytes:
+        if genes:
+            rows = self.meta.index(self.resolve(genes))
+            rows = rows[rows >= 0][:top_n]
+            keyword = "custom"
+        else:
+            rows = self.meta.find(keyword)[:top_n]
+        if len(rows) == 0:
+            raise ValueError(f"未匹配到任何蛋白：{', '.join(genes) if genes else keyword}")
+        sub_links, names = chord_batch.chord_links(self.meta, self.edges.ids, self.csr, rows, score)
+        chord = self.pic7.build_chord(sub_links, names, keyword)
+        return self._render_to_string(".html", lambda path: self.pic7.hv.save(chord, path))
+
+    # ---- 聚合弦图：关键词匹配的全部蛋白按组聚合；expand 指定组名时展开该组 ----
+    def grouped_chord(self, keyword: str, by: str, score: int, expand: str = None) -> bytes:
+        q = chord_groups.GroupedQuery(self.meta, self.edges, self.csr, keyword, by, score)
+        if expand:
+            sub_links, names = q.expand_group(expand)
+            chord = self.pic7.build_chord(sub_links, names, expand)
+        else:
+            chord = q.chord()
+        return self._render_to_string(".html", lambda path: self.pic7.hv.save(chord, path))
+
+    # ---- 社区网络：cutoff（LCC -> 最稠密 k-core -> Louvain -> Pyvis）----
+    def community(self, cutoff: int, max_nodes: int) -> bytes:
+        csr = string_net.csr_at(self.edges, cutoff)
+        _, label = connected_components(string_net.to_scipy(csr), directed=False)
+        present = csr.degree() > 0
+        lcc_label = np.bincount(label[present]).argmax()
+        lcc = np.nonzero(present & (label == lcc_label))[0]
+
+        src, dst, sc = string_net.induced_edges(csr, lcc)
+        core = kcore.core_numbers(csr)
+        if len(lcc) > max_nodes:
+            sub = string_net.build_csr(csr.n_nodes, src, dst, sc)
+            keep = kcore.densest_core_nodes(sub, core, max_nodes)
+            src, dst, sc = string_net.induced_edges(sub, keep)
+        H = string_net.to_networkx(self.edges.ids, src, dst, sc)
+
+        part = self.pic3.louvain_partition(H, self.pic3.RANDOM_SEED)
+        core_of = {str(self.edges.ids[i]): int(core[i]) for i in np.unique(np.concatenate([src, dst]))}
+        views = (self.meta.view("symbol"), self.meta.view("full"), self.meta.view("desc"))
+
+        def write(path):
+            stem = path[:-len(".html")]
+            self.pic3.export_pyvis(H, part, *views, path, stem + ".csv", stem + ".gexf",
+                                   core=core_of, cutoff=cutoff)
+            for ext in (".csv", ".gexf"):
+                os.remove(stem + ext)
+        return self._render_to_string(".html", write)
+
+    # ---- 自我网络：基因 + 每跳阈值 + 节点预算 ----
+    def ego(self, genes, hop_scores, max_nodes: int, neighbor_edges: bool) -> bytes:
+        alias_index = self.aliases if os.path.exists(self.aliases_path) else None
+        centers = ego_network.center_nodes(genes, self.edges.ids, self.meta, alias_index)
+        if len(centers) == 0:
+            raise ValueError(f"网络中找不到：{', '.join(genes)}")
+        ego = ego_network.ego_network(self.csr, centers, hop_scores, max_nodes, neighbor_edges)
+        title = f"Ego network of {', '.join(genes)} | hop scores {'/'.join(map(str, hop_scores))}"
+
+        def write(path):
+            stem = path[:-len(".html")]
+            ego_network.export_ego_pyvis(ego, self.edges.ids, self.meta, path, title)
+            for ext in (".csv", ".gexf"):
+                os.remove(stem + ext)
+        return self._render_to_string(".html", write)
+
+    # ---- 富集 ----
+    def enrichment(self, proteins, category: str) -> bytes:
+        res = enrichment.enrich(self.terms, self.resolve(proteins), category=category or None)
+        return res.to_json(orient="records", force_ascii=False).encode("utf-8")
+
+
+# -----------------------------
+# 3) HTTP 路由
+# -----------------------------
+def _names(value) -> list:
+    """查询参数（逗号/空白分隔的字符串）或 JSON 列表 -> 名称列表"""
+    return aliases.split_names(value) if isinstance(value, str) else [str(v) for v in value]
+
+
+def make_handler(state: AnalysisState, cache: LRUCache):
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: bytes, ctype: str):
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, code: int, msg: str):
+            self._send(code, json.dumps({"error": msg}, ensure_ascii=False).encode("utf-8"),
+                       "application/json; charset=utf-8")
+
+        def _dispatch(self, route: str, q: dict):
+            if route == "/status":
+                body = json.dumps({
+                    "nodes": int(state.edges.n_nodes), "edges": int(len(state.edges.src)),
+                    "cached": len(cache), "hits": cache.hits, "misses": cache.misses,
+                }).encode("utf-8")
+                return self._send(200, body, "application/json")
+
+            if route == "/chord":
+                keyword = q.get("keyword", "ribosomal")
+                genes = _names(q.get("genes", []))
+                score = int(q.get("score", 400))
+                top_n = int(q.get("top_n", 30))
+                key = ("chord", keyword.lower(), tuple(genes), score, top_n)
+                body = cache.get_or_compute(key, lambda: state.chord(keyword, score, top_n, genes))
+                return self._send(200, body, "text/html; charset=utf-8")
+
+            if route == "/chord_groups":
+                keyword = q.get("keyword", "ribosomal")
+                by = q.get("by", chord_groups.GROUP_BY)
+                score = int(q.get("score", 400))
+                expand = q.get("expand") or None
+                key = ("chord_groups", keyword.lower(), by, score, expand)
+                body = cache.get_or_compute(key, lambda: state.grouped_chord(keyword, by, score, expand))
+                return self._send(200, body, "text/html; charset=utf-8")
+
+            if route == "/community":
+                cutoff = int(q.get("cutoff", 900))
+                max_nodes = int(q.get("max_nodes", 1000))
+                key = ("community", cutoff, max_nodes)
+                body = cache.get_or_compute(key, lambda: state.community(cutoff, max_nodes))
+                return self._send(200, body, "text/html; charset=utf-8")
+
+            if route == "/ego":
+                genes = _names(q.get("gene", ego_network.CENTER))
+                hop_scores = tuple(int(x) for x in _names(q.get("scores", "700,700")))
+                max_nodes = int(q.get("max_nodes", ego_network.MAX_NODES))
+                neighbor_edges = q.get("neighbor_edges", "1") not in ("0", "false")
+                key = ("ego", tuple(genes), hop_scores, max_nodes, neighbor_edges)
+                body = cache.get_or_compute(key, lambda: state.ego(genes, hop_scores, max_nodes, neighbor_edges))
+                return self._send(200, body, "text/html; charset=utf-8")
+
+            if route == "/enrichment":
+                proteins = _names(q.get("proteins", []))
+                category = q.get("category", "Process")
+                key = ("enrichment", tuple(sorted(set(proteins))), category)
+                body = cache.get_or_compute(key, lambda: state.enrichment(proteins, category))
+                return self._send(200, body, "application/json; charset=utf-8")
+
+            if route == "/resolve":
+                res = state.aliases.resolve(_names(q.get("names", [])), q.get("ambiguous", "best"))
+                body = res.to_json(orient="records", force_ascii=False).encode("utf-8")
+                return self._send(200, body, "application/json; charset=utf-8")
+
+            return self._error(404, f"unknown route {route}")
+
+        def _handle(self, q: dict):
+            try:
+                self._dispatch(urlparse(self.path).path, q)
+            except (ValueError, KeyError) as e:
+                self._error(400, str(e))
+            except Exception as e:   # 服务常驻：单个请求失败不影响进程
+                self._error(500, f"{type(e).__name__}: {e}")
+
+        def do_GET(self):
+            q = {k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+            self._handle(q)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                q = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError as e:
+                return self._error(400, f"invalid JSON: {e}")
+            self._handle(q)
+
+        def log_message(self, fmt, *args):
+            print(f"[REQ] {self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STRING 网络常驻分析服务")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--data-dir", default=string_net.DATA_DIR)
+    parser.add_argument("--taxon", default=string_net.TAXON)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    args = parser.parse_args()
+
+    state = AnalysisState(args.data_dir, args.taxon)
+    cache = LRUCache(args.cache_size)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state, cache))
+    print(f"[INFO] Serving on http://{args.host}:{args.port}  (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+离线仪表盘构建（懒加载 + 压缩数据块）
+
+index.html 里每张交互图都是独立 HTML：各自从 CDN 拉 Plotly / Bokeh / vis-network，并各带一份数据。
+这里把已生成的图表"拆包"：
+- JS 库只复制一次到 dashboard/lib/（来自本机已安装的 plotly / bokeh / panel / pyvis 包）
+- 每张图的数据（Plotly data+layout、Pyvis nodes/edges/options、Bokeh docs_json）
+  gzip + base64 后写成 dashboard/data/<key>.js；以 <script> 注入加载，file:// 下也能用
+- 面板进入视口（IntersectionObserver）时才加载所需库与数据块，浏览器端 DecompressionStream 解压
+- PNG 与密度图瓦片原样复制，同样在进入视口时才设置 src
+
+用法：先运行各 pic 脚本 / density_map.py，再 python code/build_dashboard.py，
+打开 figures/dashboard/index.html（无需网络）
+"""
+
+import os
+import re
+import json
+import gzip
+import base64
+import shutil
+
+import string_net
+import pic3
+
+SEARCH_DIRS = [
+    os.path.join(string_net.ROOT_DIR, "figures"),
+    os.path.join(string_net.ROOT_DIR, "Visualization Assets"),
+    os.path.join(string_net.ROOT_DIR, "code"),       # pic1 / pic5 的 PNG 保存在运行目录
+]
+OUT_DIR = os.path.join(string_net.ROOT_DIR, "figures", "dashboard")
+
+# 图3 的描述跟随 pic3 的选点方式（超出绘图上限时如何取子图）
+PLOT_SELECTION_DESC = {
+    "degree": f"最大连通子图中度最高的 {pic3.MAX_NODES_TO_PLOT} 个节点",
+    "kcore": f"最稠密 k-core（至多 {pic3.MAX_NODES_TO_PLOT} 个节点）",
+}
+
+# 面板注册表：kind 决定解析方式与所需 JS 库；files 为候选文件名（按顺序取第一个存在的）
+PANELS = [
+    {"key": "degree", "kind": "image", "files": ["pic1.png", "degree_distribution_loglog.png"],
+     "title": "图1：网络拓扑分析 - 度分布",
+     "desc": "对数坐标下的度分布与离散幂律 MLE 拟合，揭示网络的无标度特性。"},
+    {"key": "community", "kind": "pyvis", "files": ["fig3_community_network_th900.html"],
+     "title": "图3：社区网络可视化",
+     "desc": f"高置信度（≥900）网络{PLOT_SELECTION_DESC[pic3.PLOT_SELECTION]}上的 Louvain 社区；橙色节点为 hub 蛋白。"},
+    {"key": "evidence", "kind": "plotly", "files": ["fig4_evidence_share_th700.html"],
+     "title": "图4：证据通道贡献分析",
+     "desc": "各证据通道（实验、数据库、共表达、文本挖掘等）对高置信度相互作用的贡献占比。"},
+    {"key": "radar", "kind": "plotly", "files": ["fig4_evidence_radar_keyproteins_th700.html"],
+     "title": "图5：关键蛋白证据雷达图",
+     "desc": "枢纽蛋白在各证据通道上的平均得分轮廓。"},
+    {"key": "enrichment", "kind": "image", "files": ["pic5.png", "local_enrichment_corrected.png"],
+     "title": "图6：功能富集分析",
+     "desc": "核心蛋白集合的 GO Process 超几何富集结果。"},
+    {"key": "chord", "kind": "bokeh", "files": ["subnetwork_chord_ribosomal.html"],
+     "title": "图7：核糖体蛋白弦图",
+     "desc": "关键词子网络内部相互作用；弦颜色表示 combined_score。"},
+    {"key": "subnetwork", "kind": "image", "files": ["pic7.png"],
+     "title": "图7b：特定功能子网络",
+     "desc": "核糖体蛋白子网络的静态渲染。"},
+    {"key": "density", "kind": "tiles", "files": ["network_tiles_th400"],
+     "title": "图8：全网络密度图",
+     "desc": "阈值 400 全网络栅格化密度图（社区着色，边密度对数缩放）；滚轮缩放、拖拽平移。"},
+]
+
+# kind -> 需要的库（lib/ 下的文件名，按加载顺序）
+KIND_LIBS = {
+    "plotly": ["plotly.min.js"],
+    "pyvis": ["vis-network.min.js"],
+    "bokeh": ["bokeh.min.js", "bokeh-gl.min.js", "bokeh-widgets.min.js", "bokeh-tables.min.js", "panel.min.js"],
+}
+
+
+# -----------------------------
+# 1) 本地 JS 库
+# -----------------------------
+def _lib_sources() -> dict:
+    """lib 文件名 -> 生成函数（返回 bytes）；只在用到时才 import 对应包"""
+    def plotly_js():
+        from plotly.offline import get_plotlyjs
+        return get_plotlyjs().encode("utf-8")
+
+    def pkg_file(pkg: str, *parts):
+        def read():
+            mod = __import__(pkg)
+            with open(os.path.join(os.path.dirname(mod.__file__), *parts), "rb") as f:
+                return f.read()
+        return read
+
+    def bokeh_file(name: str):
+        def read():
+            from bokeh.util.paths import bokehjs_path
+            with open(os.path.join(bokehjs_path(), "js", name), "rb") as f:
+                return f.read()
+        return read
+
+    src = {
+        "plotly.min.js": plotly_js,
+        "vis-network.min.js": pkg_file("pyvis", "templates", "lib", "vis-9.1.2", "vis-network.min.js"),
+        "vis-network.css": pkg_file("pyvis", "templates", "lib", "vis-9.1.2", "vis-network.css"),
+        "panel.min.js": pkg_file("panel", "dist", "panel.min.js"),
+    }
+    for name in KIND_LIBS["bokeh"][:4]:
+        src[name] = bokeh_file(name)
+    return src
+
+
+def copy_libs(kinds, lib_dir: str) -> list:
+    os.makedirs(lib_dir, exist_ok=True)
+    sources = _lib_sources()
+    need = [name for k in kinds for name in KIND_LIBS.get(k, [])]
+    if "pyvis" in kinds:
+        need.append("vis-network.css")
+    written = []
+    for name in dict.fromkeys(need):
+        try:
+            data = sources[name]()
+        except (ImportError, OSError) as e:
+            print(f"[WARN] 无法复制 {name}: {e}")
+            continue
+        with open(os.path.join(lib_dir, name), "wb") as f:
+            f.write(data)
+        written.append(name)
+    return written
+
+
+# -----------------------------
+# 2) 从已生成的 HTML 中提取图表数据
+# -----------------------------
+_decoder = json.JSONDecoder()
+
+
+def _json_after(text: str, marker: str, start: int = 0):
+    """返回 marker 之后第一个 JSON 值及其结束位置"""
+    i = text.index(marker, start) + len(marker)
+    while text[i] in " \t\r\n,":
+        i += 1
+    return _decoder.raw_decode(text, i)
+
+
+def extract_plotly(html: str) -> dict:
+    _, end = _json_after(html, "Plotly.newPlot(")          # div id
+    data, end = _json_after(html, "", end)
+    layout, end = _json_after(html, "", end)
+    config, _ = _json_after(html, "", end)
+    return {"data": data, "layout": layout, "config": config}
+
+
+def extract_pyvis(html: str) -> dict:
+    nodes, _ = _json_after(html, "nodes = new vis.DataSet(")
+    edges, _ = _json_after(html, "edges = new vis.DataSet(")
+    options, _ = _json_after(html, "var options = ")
+    return {"nodes": nodes, "edges": edges, "options": options}
+
+
+def extract_bokeh(html: str) -> dict:
+    m = re.search(r'<script type="application/json" id="[^"]+">\s*(.*?)\s*</script>', html, re.S)
+    docs_json = json.loads(m.group(1))
+    render_items, _ = _json_after(html, "render_items = ")
+    return {"docs_json": docs_json, "render_items": render_items}
+
+
+def _check_bokeh_version(payload: dict, path: str):
+    """docs_json 与本地 BokehJS 版本不一致时渲染可能失败：提示用当前环境重跑 pic7"""
+    import bokeh
+    versions = {doc.get("version") for doc in payload["docs_json"].values()}
+    if versions != {bokeh.__version__}:
+        print(f"[WARN] {os.path.basename(path)} 由 Bokeh {', '.join(sorted(map(str, versions)))} 生成，"
+              f"本地为 {bokeh.__version__}；建议先重新运行 pic7.py")
+
+
+EXTRACTORS = {"plotly": extract_plotly, "pyvis": extract_pyvis, "bokeh": extract_bokeh}
+
+
+def write_chunk(key: str, payload: dict, data_dir: str) -> int:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    b64 = base64.b64encode(gzip.compress(raw, compresslevel=9)).decode("ascii")
+    path = os.path.join(data_dir, f"{key}.js")
+    with open(path, "w", encoding="ascii") as f:
+        f.write(f'window.__dashChunk("{key}","{b64}");\n')
+    return os.path.getsize(path)
+
+
+def find_source(files) -> str:
+    for d in SEARCH_DIRS:
+        for name in files:
+            path = os.path.join(d, name)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+# -----------------------------
+# 3) 页面模板
+# -----------------------------
+PAGE_HTML = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>蛋白质相互作用网络可视化分析（离线仪表盘）</title>
+__CSS_LINKS__
+<style>
+  body { margin: 0; background: #f8f9fa; font-family: Arial, sans-serif; line-height: 1.6; color: #2c3e50; }
+  .header { background: linear-gradient(135deg, #2c3e50 0%, #3498db 100%); color: white; padding: 2rem 1rem; text-align: center; }
+  .header h1 { margin: 0; font-size: 2.2rem; }
+  .container { max-width: 1200px; margin: 0 auto; padding: 1rem; }
+  .panel { background: white; border-radius: 8px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); padding: 1.5rem; margin: 1.5rem 0; }
+  .section-title { border-bottom: 2px solid #3498db; padding-bottom: 0.5rem; margin-top: 0; }
+  .viz { position: relative; min-height: 700px; display: flex; align-items: center; justify-content: center; }
+  .viz > .root { width: 100%; height: 700px; }
+  .viz img { max-width: 100%; height: auto; border-radius: 4px; }
+  .viz iframe { width: 100%; height: 700px; border: none; }
+  .viz .status { position: absolute; color: #7f8c8d; font-size: 0.9rem; }
+  footer { background: #2c3e50; color: white; padding: 1.5rem 0; margin-top: 2rem; text-align: center; }
+</style>
+</head>
+<body>
+<header class="header">
+  <h1>蛋白质相互作用网络可视化分析</h1>
+  <p>基于STRING数据库的小鼠蛋白质相互作用网络多层次分析 · 离线版（图表进入视口时按需加载）</p>
+</header>
+<div class="container">
+__PANELS__
+</div>
+<footer>
+  <p style="margin:0">基于STRING数据库 v12.0 | 小鼠 (Mus musculus) | Taxon ID: 10090</p>
+</footer>
+<script>
+(function () {
+  var PANELS = __MANIFEST__;
+  var scripts = {}, chunks = {};
+
+  function loadScript(src) {
+    if (!scripts[src]) {
+      scripts[src] = new Promise(function (resolve, reject) {
+        var s = document.createElement('script');
+        s.src = src; s.onload = resolve;
+        s.onerror = function () { reject(new Error('failed to load ' + src)); };
+        document.head.appendChild(s);
+      });
+    }
+    return scripts[src];
+  }
+
+  function loadLibs(libs) {   // 按顺序加载（bokeh 扩展依赖 bokeh.min.js）
+    return libs.reduce(function (p, name) {
+      return p.then(function () { return loadScript('lib/' + name); });
+    }, Promise.resolve());
+  }
+
+  window.__dashChunk = function (key, b64) { chunks[key](b64); };
+
+  function loadChunk(key) {
+    var got = new Promise(function (resolve) { chunks[key] = resolve; });
+    return loadScript('data/' + key + '.js').then(function () { return got; }).then(function (b64) {
+      var bin = atob(b64), bytes = new Uint8Array(bin.length);
+      for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+      var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+      return new Response(stream).text();
+    }).then(JSON.parse);
+  }
+
+  var RENDER = {
+    image: function (p, el) { var img = document.createElement('img'); img.src = p.src; img.alt = p.title; el.replaceWith(img); },
+    tiles: function (p, el) { var f = document.createElement('iframe'); f.src = p.src; el.replaceWith(f); },
+    plotly: function (p, el, d) {
+      return Plotly.newPlot(el, d.data, d.layout, Object.assign({}, d.config, { responsive: true }));
+    },
+    pyvis: function (p, el, d) {
+      new vis.Network(el, { nodes: new vis.DataSet(d.nodes), edges: new vis.DataSet(d.edges) }, d.options);
+    },
+    bokeh: function (p, el, d) {
+      var item = d.render_items[0], roots = {};
+      item.root_ids.forEach(function (r) { roots[r] = el.id; });
+      item.roots = roots;
+      return Bokeh.embed.embed_items(d.docs_json, [item]);
+    }
+  };
+
+  function show(p) {
+    var box = document.getElementById('viz-' + p.key), el = box.querySelector('.root');
+    var status = box.querySelector('.status');
+    var ready = p.chunk ? Promise.all([loadLibs(p.libs), loadChunk(p.key)]) : Promise.resolve([]);
+    ready.then(function (r) { return RENDER[p.kind](p, el, r[1]); })
+      .then(function () { if (status) status.remove(); })
+      .catch(function (e) { if (status) status.textContent = '加载失败：' + e.message; });
+  }
+
+  var io = new IntersectionObserver(function (entries) {
+    entries.forEach(function (e) {
+      if (!e.isIntersecting) return;
+      io.unobserve(e.target);
+      show(PANELS[e.target.dataset.idx]);
+    });
+  }, { rootMargin: '300px 0px' });
+  PANELS.forEach(function (p, i) {
+    var box = document.getElementById('viz-' + p.key);
+    box.dataset.idx = i;
+    io.observe(box);
+  });
+})();
+</script>
+</body>
+</html>
+"""
+
+PANEL_HTML = """  <div class="panel">
+    <h3 class="section-title">{title}</h3>
+    <p>{desc}</p>
+    <div class="viz" id="viz-{key}"><div class="root" id="root-{key}"></div><span class="status">加载中…</span></div>
+  </div>"""
+
+
+# -----------------------------
+# 4) 构建
+# -----------------------------
+def build(out_dir: str = OUT_DIR, panels=PANELS) -> list:
+    from html import escape
+
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    data_dir = os.path.join(out_dir, "data")
+    os.makedirs(data_dir)
+
+    manifest, blocks, report = [], [], []
+    for p in panels:
+        path = find_source(p["files"])
+        if path is None:
+            print(f"[WARN] 跳过 {p['key']}：找不到 {p['files']}")
+            continue
+
+        entry = {"key": p["key"], "kind": p["kind"], "title": p["title"],
+                 "libs": KIND_LIBS.get(p["kind"], []), "chunk": p["kind"] in EXTRACTORS}
+        if p["kind"] == "image":
+            name = f"{p['key']}{os.path.splitext(path)[1]}"
+            shutil.copyfile(path, os.path.join(data_dir, name))
+            entry["src"] = f"data/{name}"
+            size = os.path.getsize(path)
+        elif p["kind"] == "tiles":
+            dst = os.path.join(out_dir, "tiles", p["key"])
+            shutil.copytree(path, dst)
+            entry["src"] = f"tiles/{p['key']}/viewer.html"
+            size = sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(dst) for f in fs)
+        else:
+            with open(path, encoding="utf-8") as f:
+                html = f.read()
+            try:
+                payload = EXTRACTORS[p["kind"]](html)
+            except (ValueError, AttributeError) as e:
+                print(f"[WARN] 跳过 {p['key']}：无法解析 {path}（{e}）")
+                continue
+            if p["kind"] == "bokeh":
+                _check_bokeh_version(payload, path)
+            size = write_chunk(p["key"], payload, data_dir)
+
+        manifest.append(entry)
+        blocks.append(PANEL_HTML.format(key=p["key"], title=escape(p["title"]), desc=escape(p["desc"])))
+        report.append((p["key"], p["kind"], size, path))
+
+    kinds = {e["kind"] for e in manifest}
+    libs = copy_libs(kinds, os.path.join(out_dir, "lib"))
+    for e in manifest:                     # 复制失败的库不写进清单，页面不去加载不存在的文件
+        e["libs"] = [name for name in e["libs"] if name in libs]
+    css = '<link rel="stylesheet" href="lib/vis-network.css">' if "vis-network.css" in libs else ""
+    page = (PAGE_HTML.replace("__CSS_LINKS__", css)
+            .replace("__PANELS__", "\n".join(blocks))
+            .replace("__MANIFEST__", json.dumps(manifest, ensure_ascii=False)))
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page)
+
+    for name in libs:
+        report.append((name, "lib", os.path.getsize(os.path.join(out_dir, "lib", name)), ""))
+    return report
+
+
+def main():
+    report = build()
+    for key, kind, size, src in report:
+        print(f"[INFO] {key:28s} {kind:7s} {size / 1e6:7.2f} MB  {os.path.basename(src)}")
+    print("\n[DONE]")
+    print("Dashboard:", os.path.join(OUT_DIR, "index.html"))
+
+
+if __name__ == "__main__":
+    main()
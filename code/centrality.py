@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+中心性指标（用于 hub 排名，可替代单纯的度）
+
+- degree      ：度中心性 deg / (n-1)，与 nx.degree_centrality 一致
+- pagerank    ：稀疏幂迭代（收敛判据同 networkx：L1 差 < n·tol）
+- eigenvector ：最大特征向量（scipy eigsh），L2 归一化
+- betweenness ：k 个随机枢轴（pivot）的 Brandes 近似（Brandes & Pich 2007），
+                每个枢轴一次按层向量化 BFS，枢轴分块交给进程池；
+                同时给出标准误（由各枢轴贡献的样本方差估计）
+
+所有结果均为长度 n_nodes 的数组；当前阈值下的孤立节点（度 0）记 0，
+归一化中的 n 只计非孤立节点（与从边表构建的 networkx 图一致）。
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+from scipy.sparse.linalg import eigsh
+
+import string_net
+
+METRICS = ("degree", "pagerank", "eigenvector", "betweenness")
+
+PAGERANK_ALPHA = 0.85
+BETWEENNESS_PIVOTS = 256     # 近似介数的枢轴数（误差约按 1/sqrt(k) 下降）
+PIVOT_CHUNK = 16             # 每个进程任务处理的枢轴数
+
+
+class Betweenness(NamedTuple):
+    value: np.ndarray    # 归一化介数估计
+    stderr: np.ndarray   # 估计的标准误（95% 置信区间约 ±1.96·stderr）
+    pivots: int
+
+
+def _active_submatrix(csr: string_net.Csr, weight: str = None):
+    active = np.nonzero(csr.degree() > 0)[0]
+    A = string_net.to_scipy(csr, weight)[active][:, active]
+    return active, A.tocsr()
+
+
+# -----------------------------
+# 1) 度 / PageRank / 特征向量
+# -----------------------------
+def degree_centrality(csr: string_net.Csr) -> np.ndarray:
+    deg = csr.degree().astype(np.float64)
+    n = int((deg > 0).sum())
+    return deg / (n - 1) if n > 1 else np.zeros_like(deg)
+
+
+def pagerank(csr: string_net.Csr, alpha: float = PAGERANK_ALPHA, weight: str = None,
+             tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    """
+    weight=None：无权；weight="score"：按 combined_score 加权转移
+    对称图中非孤立节点都有出边，无需处理悬挂节点
+    """
+    active, A = _active_submatrix(csr, weight)
+    n = len(active)
+    out = np.zeros(csr.n_nodes)
+    if n == 0:
+        return out
+
+    inv_strength = 1.0 / np.asarray(A.sum(axis=1)).ravel()
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        x_new = alpha * (A @ (x * inv_strength)) + (1.0 - alpha) / n   # A 对称：Aᵀ = A
+        err = np.abs(x_new - x).sum()
+        x = x_new
+        if err < n * tol:
+            break
+    else:
+        print(f"[WARN] PageRank 未在 {max_iter} 次迭代内收敛（err={err:.2e}）")
+
+    out[active] = x
+    return out
+
+
+def eigenvector_centrality(csr: string_net.Csr, weight: str = None) -> np.ndarray:
+    active, A = _active_submatrix(csr, weight)
+    out = np.zeros(csr.n_nodes)
+    if len(active) < 3:
+        return out
+    _, vec = eigsh(A.astype(np.float64), k=1, which="LA")
+    v = np.abs(vec[:, 0])
+    out[active] = v / np.linalg.norm(v)
+    return out
+
+
+# -----------------------------
+# 2) 近似介数：单源 Brandes（按层向量化）
+# -----------------------------
+def _single_source_dependency(csr: string_net.Csr, s: int) -> np.ndarray:
+    n = csr.n_nodes
+    dist = np.full(n, -1, dtype=np.int32)
+    sigma = np.zeros(n)
+    dist[s] = 0
+    sigma[s] = 1.0
+
+    frontier = np.array([s], dtype=np.int64)
+    level_pairs = []   # 每层的最短路 DAG 边 (v -> w)
+    d = 0
+    while len(frontier):
+        v, w, _ = string_net.expand(csr, frontier)
+        unseen = dist[w] == -1
+        dist[w[unseen]] = d + 1
+        on_path = dist[w] == d + 1
+        v, w = v[on_path], w[on_path]
+        sigma += np.bincount(w, weights=sigma[v], minlength=n)
+        level_pairs.append((v, w))
+        frontier = np.unique(w)
+        d += 1
+
+    delta = np.zeros(n)
+    for v, w in reversed(level_pairs):
+        delta += np.bincount(v, weights=sigma[v] / sigma[w] * (1.0 + delta[w]), minlength=n)
+    delta[s] = 0.0
+    return delta
+
+
+def _pivot_chunk(pivots):
+    """返回该批枢轴的 (Σδ, Σδ²)"""
+    csr = string_net.worker_state()
+    acc = np.zeros(csr.n_nodes)
+    acc2 = np.zeros(csr.n_nodes)
+    for s in pivots:
+        delta = _single_source_dependency(csr, int(s))
+        acc += delta
+        acc2 += delta * delta
+    return acc, acc2
+
+
+def approx_betweenness(csr: string_net.Csr, n_pivots: int = BETWEENNESS_PIVOTS, seed: int = 42,
+                       n_jobs: int = None) -> Betweenness:
+    """
+    与 nx.betweenness_centrality(G, k=n_pivots, normalized=True) 同一尺度：
+    b(v) ≈ n/k · Σ_pivot δ_s(v) / ((n-1)(n-2))
+    """
+    active = np.nonzero(csr.degree() > 0)[0]
+    n = len(active)
+    if n < 3:
+        return Betweenness(np.zeros(csr.n_nodes), np.zeros(csr.n_nodes), 0)
+
+    k = min(int(n_pivots), n)
+    rng = np.random.default_rng(seed)
+    pivots = rng.choice(active, size=k, replace=False)
+    chunks = [pivots[i:i + PIVOT_CHUNK] for i in range(0, k, PIVOT_CHUNK)]
+
+    parts = string_net.parallel_map(_pivot_chunk, chunks, n_jobs, string_net.Csr, tuple(csr))
+
+    total = sum(p[0] for p in parts)
+    total2 = sum(p[1] for p in parts)
+    mean = total / k
+    var = np.maximum(total2 / k - mean * mean, 0.0) * k / max(k - 1, 1)
+    scale = n / ((n - 1) * (n - 2))
+    # 无放回抽样的有限总体修正
+    fpc = (n - k) / (n - 1) if n > 1 else 0.0
+    return Betweenness(
+        value=mean * scale,
+        stderr=np.sqrt(var / k * fpc) * scale,
+        pivots=k,
+    )
+
+
+# -----------------------------
+# 3) 统一入口：按指标打分 / 取 Top hubs
+# -----------------------------
+def centrality(csr: string_net.Csr, metric: str = "degree", **kwargs) -> np.ndarray:
+    if metric == "degree":
+        return degree_centrality(csr)
+    if metric == "pagerank":
+        return pagerank(csr, **kwargs)
+    if metric == "eigenvector":
+        return eigenvector_centrality(csr, **kwargs)
+    if metric == "betweenness":
+        return approx_betweenness(csr, **kwargs).value
+    raise ValueError(f"未知的中心性指标: {metric}（可选：{', '.join(METRICS)}）")
+
+
+def top_hubs(csr: string_net.Csr, k: int, metric: str = "degree", **kwargs):
+    """返回 (节点下标, 得分)，按得分降序；同分按度再按编号打破平局"""
+    values = centrality(csr, metric, **kwargs)
+    order = np.lexsort((np.arange(len(values)), -csr.degree(), -values))[:k]
+    return order, values[order]
+
+
+def graph_top_hubs(G, k: int, metric: str = "degree", **kwargs) -> list:
+    """networkx 图版本：返回节点名列表（用于已有 nx 子图的调用点）"""
+    nodes, csr = string_net.graph_to_csr(G)
+    order, _ = top_hubs(csr, k, metric, **kwargs)
+    return [nodes[i] for i in order]
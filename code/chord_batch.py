@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量弦图：一次渲染多个关键词 / 多个社区的弦图（进程池）
+
+- 主进程只做一次准备：全分数 CSR 写入缓存目录（npy），各 worker 以 mmap 打开；
+  边表与蛋白元数据存储同样 mmap 共享，操作系统页缓存只保留一份
+- 每个 worker 启动时初始化一次 HoloViews（hv.extension('bokeh')），之后逐个任务只做
+  选点 -> 诱导子图 -> 弦图 -> 保存 HTML
+- 任务：("keyword", 关键词) 取注释含关键词的前 TOP_N 个蛋白（同 pic7）；
+        ("community", 社区编号) 取 community_assignments 中该社区度最高的 TOP_N 个蛋白
+- 输出：figures/chords/chord_<kind>_<key>.html 与 manifest.csv（每个任务一行：节点数、边数、耗时、状态）
+
+用法：python code/chord_batch.py
+"""
+
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+import string_net
+import protein_meta
+
+KEYWORDS = ["ribosomal", "proteasome", "kinase", "mitochondrial", "histone", "collagen",
+            "olfactory receptor", "ubiquitin", "transporter", "zinc finger"]
+COMMUNITY_CSV = os.path.join(string_net.ROOT_DIR, "outputs", "community_assignments_th900.csv")
+TOP_N = 30
+SCORE_MIN = 400
+
+OUT_DIR = os.path.join(string_net.ROOT_DIR, "figures", "chords")
+
+
+# -----------------------------
+# 1) 共享（mmap）的全分数 CSR
+# -----------------------------
+def shared_csr(links_path: str = string_net.LINKS_GZ, cache_dir: str = string_net.CACHE_DIR) -> str:
+    """全分数 CSR 写入缓存（links 更新后重建），返回目录"""
+    out_dir = os.path.join(string_net.cache_dir_for(links_path, cache_dir), "csr_full")
+    if not string_net.cache_is_fresh(links_path, out_dir):
+        edges = string_net.load_edges(links_path, cache_dir)
+        csr = string_net.build_csr(edges.n_nodes, edges.src, edges.dst, edges.score)
+        os.makedirs(out_dir, exist_ok=True)
+        for k in string_net.Csr._fields:
+            np.save(os.path.join(out_dir, f"{k}.npy"), getattr(csr, k))
+        string_net.write_stamp(links_path, out_dir)
+    return out_dir
+
+
+def open_csr(out_dir: str) -> string_net.Csr:
+    return string_net.Csr(*[np.load(os.path.join(out_dir, f"{k}.npy"), mmap_mode="r")
+                            for k in string_net.Csr._fields])
+
+
+# -----------------------------
+# 2) 选点与弦图输入（常驻服务 /chord 同样使用）
+# -----------------------------
+def chord_links(meta: protein_meta.ProteinMeta, ids: np.ndarray, csr: string_net.Csr,
+                rows: np.ndarray, score: int):
+    """meta 行号 -> (弦图连边 DataFrame, 节点名称)；连边为这些蛋白间 score >= 阈值的诱导子图"""
+    pids = meta.ids[rows]
+    names = meta.symbols[meta.symbol_code[rows]]
+    nodes = string_net.node_index(ids, pids)
+    src, dst, sc = string_net.induced_edges(csr, nodes[nodes >= 0], score)
+    name_of = dict(zip(pids.tolist(), names.tolist()))
+    sub_links = pd.DataFrame({
+        "source": [name_of[p] for p in ids[src]],
+        "target": [name_of[p] for p in ids[dst]],
+        "combined_score": sc.astype(int),
+    })
+    return sub_links, names
+
+
+def community_rows(meta: protein_meta.ProteinMeta, assign: pd.DataFrame, community: int, top_n: int) -> np.ndarray:
+    members = assign[assign["community"] == community].sort_values("degree", ascending=False, kind="stable")
+    rows = meta.index(members["protein_id"].astype(str).to_numpy())
+    return rows[rows >= 0][:top_n]
+
+
+# -----------------------------
+# 3) 进程池 worker
+# -----------------------------
+def _setup_worker(csr_dir: str, ids_path: str, info_path: str, out_dir: str) -> dict:
+    import pic7
+    pic7.init_engine()
+    return dict(
+        csr=open_csr(csr_dir),
+        ids=np.load(ids_path, mmap_mode="r"),
+        meta=protein_meta.load_meta(info_path),
+        pic7=pic7,
+        out_dir=out_dir,
+    )
+
+
+def _slug(text) -> str:
+    return re.sub(r"[^0-9A-Za-z_-]+", "_", str(text)).strip("_") or "empty"
+
+
+def render_task(task):
+    """task = (kind, key, rows 或 None, top_n, score)；返回 manifest 的一行"""
+    kind, key, rows, top_n, score = task
+    w = string_net.worker_state()
+    t0 = time.time()
+    out_html = os.path.join(w["out_dir"], f"chord_{kind}_{_slug(key)}.html")
+    row = {"kind": kind, "key": key, "file": os.path.relpath(out_html, w["out_dir"]),
+           "n_nodes": 0, "n_edges": 0, "seconds": 0.0, "status": "ok"}
+    try:
+        if rows is None:
+            rows = w["meta"].find(key)[:top_n]
+        if len(rows) == 0:
+            raise ValueError(f"未匹配到任何蛋白：{key}")
+        sub_links, names = chord_links(w["meta"], w["ids"], w["csr"], np.asarray(rows), score)
+        chord = w["pic7"].build_chord(sub_links, names, str(key))
+        w["pic7"].hv.save(chord, out_html)
+        row.update(n_nodes=len(names), n_edges=len(sub_links))
+    except Exception as e:          # 单个任务失败不影响整批
+        row.update(file="", status=f"{type(e).__name__}: {e}")
+    row["seconds"] = round(time.time() - t0, 3)
+    return row
+
+
+def render_batch(keywords=(), communities=(), assign: pd.DataFrame = None, top_n: int = TOP_N,
+                 score: int = SCORE_MIN, out_dir: str = OUT_DIR, n_jobs: int = None,
+                 links_path: str = string_net.LINKS_GZ,
+                 info_path: str = protein_meta.INFO_GZ) -> pd.DataFrame:
+    """返回 manifest（同时写出 out_dir/manifest.csv）"""
+    os.makedirs(out_dir, exist_ok=True)
+    csr_dir = shared_csr(links_path)
+    string_net.load_edges(links_path)
+    ids_path = os.path.join(string_net.cache_dir_for(links_path), "ids.npy")
+    meta = protein_meta.load_meta(info_path)          # 主进程先建好缓存，worker 只需 mmap
+
+    tasks = [("keyword", kw, None, top_n, score) for kw in keywords]
+    if len(communities):
+        if assign is None:
+            raise ValueError("按社区渲染需要 community_assignments 表")
+        tasks += [("community", int(c), community_rows(meta, assign, int(c), top_n), top_n, score)
+                  for c in communities]
+
+    rows = string_net.parallel_map(render_task, tasks, n_jobs, _setup_worker,
+                                   (csr_dir, ids_path, info_path, out_dir))
+
+    manifest = pd.DataFrame(rows, columns=["kind", "key", "file", "n_nodes", "n_edges", "seconds", "status"])
+    manifest.to_csv(os.path.join(out_dir, "manifest.csv"), index=False, encoding="utf-8-sig")
+    return manifest
+
+
+def main():
+    if not string_net.require_files(string_net.LINKS_GZ, protein_meta.INFO_GZ):
+        return
+
+    assign, communities = None, []
+    if os.path.exists(COMMUNITY_CSV):
+        assign = pd.read_csv(COMMUNITY_CSV, encoding="utf-8-sig")
+        communities = sorted(assign["community"].unique())
+        print(f"[INFO] {len(communities)} communities from {COMMUNITY_CSV}")
+
+    t0 = time.time()
+    manifest = render_batch(KEYWORDS, communities, assign)
+    ok = manifest["status"] == "ok"
+    print(f"[INFO] Rendered {int(ok.sum())}/{len(manifest)} chord diagrams in {time.time() - t0:.1f}s")
+    if not ok.all():
+        print(manifest.loc[~ok, ["kind", "key", "status"]].to_string(index=False))
+
+    print("\n[DONE]")
+    print("Output  :", OUT_DIR)
+    print("Manifest:", os.path.join(OUT_DIR, "manifest.csv"))
+
+
+if __name__ == "__main__":
+    main()
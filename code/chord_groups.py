@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+聚合弦图：关键词匹配到成百上千个蛋白时，按组画弦图（组 = 圆弧），可按需展开某一组
+
+- 分组方式 by=：
+    prefix     ：基因家族前缀（symbol 开头的字母段，如 Rpl13 -> Rpl、Mrpl10 -> Mrpl）
+    annotation ：注释第一句去掉编号类词（如 "60S ribosomal protein L13" -> "60S ribosomal protein"）
+    community  ：全网络在 score 阈值下的标签传播社区（density_map.label_propagation，与 pic3 无关，无需先跑 pic3）
+- 组 × 组权重矩阵一次稀疏乘积得到：W = Mᵀ · A · M（A 为匹配蛋白间的 combined_score/1000 邻接，
+  M 为 蛋白 × 组 的 0/1 隶属矩阵）；同时得到连边数矩阵
+- 组数超过 MAX_GROUPS 时，成员最少的组并入 "other"
+- 展开：expand_group 返回某一组的成员级弦图输入（成员过多时取组内度最高的 TOP_N 个）
+
+用法：python code/chord_groups.py
+"""
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import string_net
+import protein_meta
+
+KEYWORD = "ribosomal"
+GROUP_BY = "prefix"
+GROUP_MODES = ("prefix", "annotation", "community")
+SCORE_MIN = 400
+MAX_GROUPS = 20
+TOP_N = 30
+OTHER = "other"
+
+OUT_DIR = os.path.join(string_net.ROOT_DIR, "figures", "chords")
+
+
+# -----------------------------
+# 1) 分组
+# -----------------------------
+def family_prefix(symbol: str) -> str:
+    m = re.match(r"[A-Za-z]+", str(symbol))
+    return m.group(0) if m else str(symbol)
+
+
+def annotation_head(annotation: str) -> str:
+    head = str(annotation).split(";")[0].replace(",", " ")
+    tokens = head.split()
+    kept = tokens[:1] + [t for t in tokens[1:] if not re.search(r"\d", t) and len(t) > 1]
+    return " ".join(kept) if kept else "unannotated"
+
+
+def group_labels(meta: protein_meta.ProteinMeta, rows: np.ndarray, by: str = GROUP_BY,
+                 community: np.ndarray = None) -> np.ndarray:
+    """
+    rows：meta 行号；返回每个蛋白的组名（str）
+    community：by="community" 时，与 rows 对齐的社区编号（-1 表示不在网络中）
+    """
+    if by not in GROUP_MODES:
+        raise ValueError(f"未知的分组方式: {by}（可选：{', '.join(GROUP_MODES)}）")
+    if by == "prefix":
+        return np.array([family_prefix(s) for s in meta.symbols[meta.symbol_code[rows]]], dtype=object)
+    if by == "annotation":
+        return np.array([annotation_head(meta.annotation(p, "")) for p in meta.ids[rows]], dtype=object)
+    return np.array([f"C{c}" if c >= 0 else OTHER for c in community], dtype=object)
+
+
+def cap_groups(labels: np.ndarray, max_groups: int = MAX_GROUPS) -> np.ndarray:
+    """只保留成员最多的 max_groups - 1 组，其余并入 OTHER"""
+    counts = pd.Series(labels).value_counts()
+    if len(counts) <= max_groups:
+        return labels
+    keep = set(counts.index[:max_groups - 1])
+    return np.array([g if g in keep else OTHER for g in labels], dtype=object)
+
+
+# -----------------------------
+# 2) 组 × 组 矩阵（一次稀疏乘积）
+# -----------------------------
+def group_matrix(csr: string_net.Csr, nodes: np.ndarray, labels: np.ndarray, score: int):
+    """
+    nodes：边表节点下标（与 labels 对齐，-1 表示不在网络中，忽略）
+    返回 (组名, 组大小, 权重矩阵, 连边数矩阵)；对角线为组内（每条边计一次）
+    """
+    groups, code = np.unique(labels.astype(str), return_inverse=True)
+    size = np.bincount(code, minlength=len(groups))
+    ok = nodes >= 0
+    nodes, code = nodes[ok], code[ok]
+
+    src, dst, sc = string_net.induced_edges(csr, nodes, score)
+    local = np.full(csr.n_nodes, -1, dtype=np.int64)
+    local[nodes] = np.arange(len(nodes))
+    k = len(nodes)
+    A = sparse.csr_matrix((sc.astype(np.float64) / 1000.0, (local[src], local[dst])), shape=(k, k))
+    A = A + A.T
+    M = sparse.csr_matrix((np.ones(k), (np.arange(k), code)), shape=(k, len(groups)))
+
+    W = (M.T @ A @ M).toarray()
+    C = (M.T @ (A > 0).astype(np.float64) @ M).toarray()
+    np.fill_diagonal(W, np.diag(W) / 2)
+    np.fill_diagonal(C, np.diag(C) / 2)
+    return groups, size, W, C.astype(np.int64)
+
+
+def group_links(groups: np.ndarray, size: np.ndarray, W: np.ndarray, C: np.ndarray):
+    """-> (组间连边 DataFrame, 组节点 DataFrame)，供 hv.Chord 使用"""
+    i, j = np.triu_indices(len(groups), k=1)
+    keep = C[i, j] > 0
+    links = pd.DataFrame({
+        "source": groups[i[keep]],
+        "target": groups[j[keep]],
+        "weight": W[i[keep], j[keep]],
+        "n_edges": C[i[keep], j[keep]],
+    })
+    nodes = pd.DataFrame({
+        "index": groups,
+        "label": [f"{g} ({n})" for g, n in zip(groups, size)],
+        "size": size,
+        "internal_edges": np.diag(C),
+    })
+    return links, nodes
+
+
+def build_group_chord(links: pd.DataFrame, nodes: pd.DataFrame, title: str):
+    import holoviews as hv
+    from holoviews import opts
+    chord = hv.Chord((links, hv.Dataset(nodes, "index")), vdims=["weight", "n_edges"])
+    return chord.opts(opts.Chord(
+        labels="label", node_color="index", edge_color="source", cmap="Category20", edge_cmap="Category20",
+        edge_alpha=0.6, width=850, height=850, title=title, tools=["hover"],
+    ))
+
+
+# -----------------------------
+# 3) 端到端：关键词 -> 组弦图 / 展开某组
+# -----------------------------
+class GroupedQuery:
+    """一次关键词查询的分组结果；expand_group 复用同一份选点"""
+
+    def __init__(self, meta: protein_meta.ProteinMeta, edges: string_net.EdgeTable, csr: string_net.Csr,
+                 keyword: str, by: str = GROUP_BY, score: int = SCORE_MIN, max_groups: int = MAX_GROUPS,
+                 community: np.ndarray = None):
+        """
+        csr：全分数（或不低于 score 的）CSR；community：by="community" 时的全网络标签（按边表节点下标）
+        """
+        self.meta, self.edges, self.csr, self.score = meta, edges, csr, score
+        self.keyword, self.by = keyword, by
+        self.rows = meta.find(keyword)
+        if len(self.rows) == 0:
+            raise ValueError(f"未匹配到任何蛋白：{keyword}")
+        self.nodes = string_net.node_index(edges.ids, meta.ids[self.rows])
+        comm = None
+        if by == "community":
+            if community is None:
+                import density_map
+                community = density_map.label_propagation(string_net.csr_at(edges, score))
+            comm = np.where(self.nodes >= 0, community[np.maximum(self.nodes, 0)], -1)
+        self.labels = cap_groups(group_labels(meta, self.rows, by, comm), max_groups)
+        self.groups, self.size, self.W, self.C = group_matrix(csr, self.nodes, self.labels, score)
+
+    def table(self) -> pd.DataFrame:
+        """组汇总：组名、成员数、组内边数、组间边数、示例成员"""
+        symbols = self.meta.symbols[self.meta.symbol_code[self.rows]]
+        examples = pd.Series(symbols).groupby(self.labels).apply(lambda s: ", ".join(s.iloc[:5]))
+        return pd.DataFrame({
+            "group": self.groups,
+            "size": self.size,
+            "internal_edges": np.diag(self.C),
+            "external_edges": self.C.sum(axis=1) - np.diag(self.C),
+            "examples": examples.reindex(self.groups).to_numpy(),
+        }).sort_values("size", ascending=False, kind="stable").reset_index(drop=True)
+
+    def chord(self):
+        links, nodes = group_links(self.groups, self.size, self.W, self.C)
+        title = f"'{self.keyword}': {len(self.rows)} proteins in {len(self.groups)} groups (by {self.by}, score>={self.score})"
+        return build_group_chord(links, nodes, title)
+
+    def expand_group(self, group: str, top_n: int = TOP_N):
+        """组内成员级弦图输入：(连边 DataFrame, 节点名称)；成员多于 top_n 时取组内度最高者"""
+        import chord_batch
+        member = self.labels == group
+        if not member.any():
+            raise ValueError(f"没有该组：{group}（可选：{', '.join(self.groups)}）")
+        rows, nodes = self.rows[member], self.nodes[member]
+        if len(rows) > top_n:
+            src, dst, _ = string_net.induced_edges(self.csr, nodes[nodes >= 0], self.score)
+            local_deg = np.zeros(self.csr.n_nodes, dtype=np.int64)
+            np.add.at(local_deg, np.concatenate([src, dst]), 1)
+            order = np.argsort(-np.where(nodes >= 0, local_deg[np.maximum(nodes, 0)], -1), kind="stable")
+            rows = rows[order[:top_n]]
+        return chord_batch.chord_links(self.meta, self.edges.ids, self.csr, rows, self.score)
+
+
+def main():
+    if not string_net.require_files(string_net.LINKS_GZ, protein_meta.INFO_GZ):
+        return
+
+    import pic7
+    pic7.init_engine()
+
+    edges = string_net.load_edges()
+    csr = string_net.csr_at(edges, SCORE_MIN)
+    meta = protein_meta.load_meta()
+
+    q = GroupedQuery(meta, edges, csr, KEYWORD, GROUP_BY, SCORE_MIN)
+    table = q.table()
+    print(f"[INFO] '{KEYWORD}': {len(q.rows)} proteins -> {len(q.groups)} groups (by {GROUP_BY})")
+    print(table.head(20).to_string(index=False))
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    stem = os.path.join(OUT_DIR, f"chord_groups_{KEYWORD}_{GROUP_BY}")
+    pic7.hv.save(q.chord(), stem + ".html")
+    table.to_csv(stem + ".csv", index=False, encoding="utf-8-sig")
+
+    # 展开成员最多的一组作为示例（其余组可在常驻服务中 /chord_groups?expand=<组名> 按需展开）
+    top = table["group"].iloc[0]
+    sub_links, names = q.expand_group(top)
+    pic7.hv.save(pic7.build_chord(sub_links, names, top), f"{stem}_{top}.html")
+
+    print("\n[DONE]")
+    print("HTML :", stem + ".html")
+    print("CSV  :", stem + ".csv")
+
+
+if __name__ == "__main__":
+    main()
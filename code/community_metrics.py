@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+社区质量指标（整套划分一次计算，全部为 CSR 上的 bincount）
+
+对每个社区 c（m = 总边数，vol(c) = 成员度之和）：
+- size / internal_edges / cut_edges（一端在 c 内、一端在 c 外的边）
+- density      = internal_edges / (size·(size-1)/2)
+- conductance  = cut_edges / min(vol(c), 2m - vol(c))
+- modularity   = internal_edges/m - (vol(c)/2m)²（各社区之和即划分的 Newman 模块度）
+- mean_score   = 社区内部边 combined_score 的均值
+- hub          = 社区内部度最高的成员（并列时取编号最小者）
+
+未分配社区的节点记标签 -1：它们与社区之间的边计入 cut_edges，自身不产生行。
+"""
+
+import numpy as np
+import pandas as pd
+
+import string_net
+
+
+def community_metrics(csr: string_net.Csr, labels: np.ndarray, weight: str = None) -> pd.DataFrame:
+    """
+    labels：长度 n_nodes 的社区编号（-1 表示不属于任何社区）
+    weight=None -> 按边计数的模块度；weight="score" -> combined_score/1000 加权模块度
+    返回按 community 排序的 DataFrame，hub 列为节点下标
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    n = csr.n_nodes
+    k = int(labels.max()) + 1 if len(labels) and labels.max() >= 0 else 0
+
+    rows = np.repeat(np.arange(n), csr.degree())
+    lab_r, lab_c = labels[rows], labels[csr.indices]
+    mine = lab_r >= 0
+    same = mine & (lab_r == lab_c)
+    cut = mine & ~same
+
+    member = labels >= 0
+    size = np.bincount(labels[member], minlength=k)
+    # CSR 中每条无向边出现两次：内部边按社区计数后除以 2；割边从社区一侧各计一次
+    internal = np.bincount(lab_r[same], minlength=k) // 2
+    cut_edges = np.bincount(lab_r[cut], minlength=k)
+    score_sum = np.bincount(lab_r[same], weights=csr.score[same].astype(np.float64), minlength=k) / 2
+
+    w = np.ones(len(csr.indices)) if weight is None else csr.score.astype(np.float64) / 1000.0
+    two_m = w.sum()
+    strength = np.bincount(rows, weights=w, minlength=n)
+    vol = np.bincount(labels[member], weights=strength[member], minlength=k)
+    w_in = np.bincount(lab_r[same], weights=w[same], minlength=k)      # = 2 × 内部权重
+    deg_vol = np.bincount(labels[member], weights=csr.degree()[member], minlength=k)
+    m_edges = len(csr.indices) // 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pairs = size * (size - 1) / 2
+        density = np.where(pairs > 0, internal / pairs, 0.0)
+        denom = np.minimum(deg_vol, 2 * m_edges - deg_vol)
+        conductance = np.where(denom > 0, cut_edges / denom, 0.0)
+        modularity = (w_in / two_m - (vol / two_m) ** 2) if two_m > 0 else np.zeros(k)
+        mean_score = np.where(internal > 0, score_sum / internal, np.nan)
+
+    # 社区内部度最高的成员：按 (社区, -内部度, 编号) 排序后取每组第一个
+    in_deg = np.bincount(rows[same], minlength=n)
+    nodes = np.nonzero(member)[0]
+    order = np.lexsort((nodes, -in_deg[nodes], labels[nodes]))
+    first = np.r_[True, labels[nodes[order]][1:] != labels[nodes[order]][:-1]]
+    hub = np.full(k, -1, dtype=np.int64)
+    hub_deg = np.zeros(k, dtype=np.int64)
+    hub[labels[nodes[order][first]]] = nodes[order][first]
+    hub_deg[labels[nodes[order][first]]] = in_deg[nodes[order][first]]
+
+    out = pd.DataFrame({
+        "community": np.arange(k),
+        "size": size,
+        "internal_edges": internal,
+        "cut_edges": cut_edges,
+        "density": density,
+        "conductance": conductance,
+        "modularity": modularity,
+        "mean_score": mean_score,
+        "hub": hub,
+        "hub_internal_degree": hub_deg,
+    })
+    return out[out["size"] > 0].reset_index(drop=True)
+
+
+def metrics_at(edges: string_net.EdgeTable, cutoff: int, labels: np.ndarray, weight: str = None) -> pd.DataFrame:
+    return community_metrics(string_net.csr_at(edges, cutoff), labels, weight)
+
+
+# -----------------------------
+# networkx 图 + {节点: 社区} 字典的便捷接口（pic3 的调用点）
+# -----------------------------
+def graph_community_metrics(G, part: dict, id2symbol=None, weight: str = None) -> pd.DataFrame:
+    """hub 列换成 protein_id；提供 id2symbol 时附加 hub_symbol 列"""
+    nodes, csr = string_net.graph_to_csr(G)
+    labels = np.array([part.get(v, -1) for v in nodes], dtype=np.int64)
+    out = community_metrics(csr, labels, weight)
+    out["hub"] = [nodes[i] for i in out["hub"]]
+    if id2symbol is not None:
+        out.insert(out.columns.get_loc("hub") + 1, "hub_symbol", [id2symbol.get(p, p) for p in out["hub"]])
+    return out
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+度-阈值剖面：每个蛋白在任意整数 cutoff（0-1000）下的度，一次构建、之后任意阈值即查
+
+- 构建：CSR 按节点分块，每块对 (节点, score) 做 np.bincount 得到分数直方图，
+  沿 score 反向累加 -> 该节点在每个 cutoff 下的度（score >= cutoff 的边数）
+- 存储为稀疏阶梯函数：只在节点实际出现过的 score 处记一个台阶
+    offset.npy ：int64，长度 n+1；节点 i 的台阶 = [offset[i], offset[i+1])
+    step_score ：uint16，台阶位置（节点内升序）
+    step_degree：int32，score >= step_score 的边数（节点内降序）
+  cutoff = c 时节点 i 的度 = 第一个 step_score >= c 的台阶的 step_degree（没有则为 0）
+- 查询：全部节点在某个 cutoff 下的度 = 对各节点台阶段做一次向量化二分（约 log2(1001) 轮），
+  Top-k hub、名次轨迹、单点查询都不再重建图
+- 首次构建后写入 outputs/cache/<links 文件名>/degree_profile/，之后 mmap 加载
+
+用法：python code/degree_profile.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import string_net
+
+MAX_SCORE = 1000
+BLOCK_NODES = 4096           # 每块节点数：直方图 BLOCK_NODES × 1001 个计数
+PROFILE_ARRAYS = ("offset", "step_score", "step_degree")
+
+TOP_K = 20
+TRAJECTORY_CUTOFFS = list(range(150, 1001, 50))
+OUT_CSV = os.path.join(string_net.ROOT_DIR, "outputs", "hub_rank_trajectories.csv")
+
+
+# -----------------------------
+# 1) 构建：分块直方图 + 反向累加
+# -----------------------------
+def build_profile(csr: string_net.Csr, block: int = BLOCK_NODES):
+    """全分数 CSR -> (offset, step_score, step_degree)"""
+    n = csr.n_nodes
+    width = MAX_SCORE + 1
+    offset = np.zeros(n + 1, dtype=np.int64)
+    scores, degrees = [np.empty(0, dtype=np.uint16)], [np.empty(0, dtype=np.int32)]
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        lo, hi = csr.indptr[start], csr.indptr[stop]
+        rows = np.repeat(np.arange(stop - start), np.diff(csr.indptr[start:stop + 1]))
+        hist = np.bincount(rows * width + csr.score[lo:hi], minlength=(stop - start) * width)
+        hist = hist.reshape(stop - start, width)
+        cum = np.cumsum(hist[:, ::-1], axis=1)[:, ::-1]       # cum[i, c] = 度(cutoff = c)
+        node, score = np.nonzero(hist)                         # 行优先：节点内 score 升序
+        scores.append(score.astype(np.uint16))
+        degrees.append(cum[node, score].astype(np.int32))
+        offset[start + 1:stop + 1] = np.count_nonzero(hist, axis=1)
+    np.cumsum(offset, out=offset)
+    return offset, np.concatenate(scores), np.concatenate(degrees)
+
+
+# -----------------------------
+# 2) 查询
+# -----------------------------
+class DegreeProfile:
+    """mmap 打开的度-阈值阶梯函数（节点编号与 string_net 边表一致）"""
+
+    def __init__(self, out_dir: str, ids: np.ndarray):
+        for k in PROFILE_ARRAYS:
+            setattr(self, k, np.load(os.path.join(out_dir, f"{k}.npy"), mmap_mode="r"))
+        self.ids = ids
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.offset) - 1
+
+    def degree_at(self, cutoff: int, nodes: np.ndarray = None) -> np.ndarray:
+        """score >= cutoff 的度；nodes=None 时返回全部节点"""
+        nodes = np.arange(self.n_nodes) if nodes is None else np.asarray(nodes, dtype=np.int64)
+        lo, hi = self.offset[nodes].copy(), self.offset[nodes + 1]
+        end = hi.copy()
+        # 向量化二分：各节点段内第一个 step_score >= cutoff 的位置
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            below = active & (self.step_score[np.minimum(mid, len(self.step_score) - 1)] < cutoff)
+            lo = np.where(below, mid + 1, lo)
+            hi = np.where(active & ~below, mid, hi)
+        found = lo < end
+        out = np.zeros(len(nodes), dtype=np.int64)
+        out[found] = self.step_degree[lo[found]]
+        return out
+
+    def top_hubs(self, cutoff: int, k: int = TOP_K):
+        """返回 (节点下标, 度)，度降序，同度按编号（与 centrality.top_hubs 的 degree 排名一致）"""
+        deg = self.degree_at(cutoff)
+        k = min(k, len(deg))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        cand = np.argpartition(-deg, k - 1)[:k]
+        kth = deg[cand].min()
+        cand = np.nonzero(deg >= kth)[0]                      # 带上与第 k 名同度的全部节点，再稳定排序
+        order = cand[np.lexsort((cand, -deg[cand]))][:k]
+        return order, deg[order]
+
+    def top_hub_ids(self, cutoff: int, k: int = TOP_K) -> list:
+        order, _ = self.top_hubs(cutoff, k)
+        return self.ids[order].astype(str).tolist()
+
+    def rank_at(self, cutoff: int) -> np.ndarray:
+        """竞赛名次（1 = 度最高；同度同名次）；度为 0 的节点也有名次"""
+        deg = self.degree_at(cutoff)
+        sorted_desc = np.sort(deg)[::-1]
+        return np.searchsorted(-sorted_desc, -deg, side="left") + 1
+
+    def trajectory(self, nodes, cutoffs=TRAJECTORY_CUTOFFS) -> pd.DataFrame:
+        """nodes 在各 cutoff 下的度与名次（长表：protein_id, cutoff, degree, rank）"""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        frames = []
+        for c in cutoffs:
+            rank = self.rank_at(c)
+            frames.append(pd.DataFrame({
+                "protein_id": self.ids[nodes].astype(str),
+                "cutoff": c,
+                "degree": self.degree_at(c, nodes),
+                "rank": rank[nodes],
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def steps(self, node: int):
+        """单个节点的阶梯函数：(score 台阶, 对应的度)"""
+        a, b = self.offset[node], self.offset[node + 1]
+        return np.asarray(self.step_score[a:b]), np.asarray(self.step_degree[a:b])
+
+
+def load_profile(links_path: str = string_net.LINKS_GZ, cache_dir: str = string_net.CACHE_DIR) -> DegreeProfile:
+    edges = string_net.load_edges(links_path, cache_dir)
+    out_dir = os.path.join(string_net.cache_dir_for(links_path, cache_dir), "degree_profile")
+    if not string_net.cache_is_fresh(links_path, out_dir):
+        print(f"[INFO] Building degree profile from {links_path} ...")
+        csr = string_net.build_csr(edges.n_nodes, edges.src, edges.dst, edges.score)
+        os.makedirs(out_dir, exist_ok=True)
+        for k, arr in zip(PROFILE_ARRAYS, build_profile(csr)):
+            np.save(os.path.join(out_dir, f"{k}.npy"), arr)
+        string_net.write_stamp(links_path, out_dir)
+    return DegreeProfile(out_dir, edges.ids)
+
+
+def main():
+    import time
+
+    if not string_net.require_files(string_net.LINKS_GZ):
+        return
+
+    t0 = time.time()
+    prof = load_profile()
+    print(f"[INFO] Degree profile: nodes={prof.n_nodes}, steps={len(prof.step_score)} ({time.time() - t0:.2f}s)")
+
+    hubs = set()
+    for cutoff in (400, 700, 900):
+        t0 = time.perf_counter()
+        order, deg = prof.top_hubs(cutoff, TOP_K)
+        ms = (time.perf_counter() - t0) * 1000
+        hubs.update(order.tolist())
+        print(f"[INFO] cutoff={cutoff}: top {TOP_K} hubs in {ms:.2f} ms -> "
+              + ", ".join(f"{p}({d})" for p, d in zip(prof.ids[order[:5]], deg[:5])) + " ...")
+
+    traj = prof.trajectory(sorted(hubs))
+    os.makedirs(os.path.dirname(OUT_CSV), exist_ok=True)
+    traj.to_csv(OUT_CSV, index=False, encoding="utf-8-sig")
+
+    print("\n[DONE]")
+    print("CSV :", OUT_CSV)
+
+
+if __name__ == "__main__":
+    main()
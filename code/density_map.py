@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+全网络密度图（静态栅格 + 可缩放瓦片金字塔）
+
+Pyvis 最多只能画约 1000 个节点；这里把阈值网络的"全部"节点与边栅格化：
+1) 社区：稀疏加权标签传播（numpy 向量化，半同步更新）；也可传入已有划分
+2) 布局：先对"社区超节点"做力导向布局，再把节点放到所属社区中心附近整体细化；
+   斥力用网格密度场的梯度近似（直方图 + 高斯平滑，O(N + 网格)），引力沿边用 bincount 累加
+3) 栅格化：节点按社区颜色累加 RGB、边按像素采样累加密度（对数缩放），datashader 风格
+4) 金字塔：只在最高层栅格化一次，低层由 2×2 块求和得到（密度精确聚合），
+   切成 256px PNG 瓦片 {z}/{x}/{y}.png，并生成零依赖的缩放/拖拽查看页 viewer.html
+
+用法：python code/density_map.py
+"""
+
+import os
+import json
+
+import numpy as np
+from scipy import ndimage
+
+import string_net
+
+# -----------------------------
+# 0) 参数与统一 UI 配色
+# -----------------------------
+SCORE_CUTOFF = 400
+MAX_ZOOM = 3                 # 最高层边长 = 256 * 2^MAX_ZOOM 像素（3 -> 2048px）
+TILE = 256
+LAYOUT_ITERS = 80
+LPA_ITERS = 100
+RANDOM_SEED = 42
+MAX_EDGE_SAMPLES = 4096      # 单条边最多采样点数（超长边截断采样密度）
+
+OUT_DIR = os.path.join(string_net.ROOT_DIR, "figures", f"network_tiles_th{SCORE_CUTOFF}")
+
+BG_COLOR = (248, 249, 250)       # #F8F9FA
+EDGE_RGB = (44, 62, 80)          # #2C3E50
+TABLEAU10 = ["#4C78A8", "#F58518", "#E45756", "#72B7B2", "#54A24B",
+             "#EECA3B", "#B279A2", "#FF9DA6", "#9D755D", "#BAB0AC"]   # plotly qualitative.T10
+OTHER_RGB = (52, 152, 219)       # 小社区统一用 #3498DB
+
+
+# -----------------------------
+# 1) 标签传播社区
+# -----------------------------
+def label_propagation(csr: string_net.Csr, iters: int = LPA_ITERS, seed: int = RANDOM_SEED) -> np.ndarray:
+    """
+    每轮随机选 80% 的节点，取其邻居中按 combined_score 加权最多的标签（随机打破平局）；
+    变化节点少于 0.1% 时提前停止
+    返回标签数组（度 0 的节点为 -1），标签重编号为按社区大小降序的 0..K-1
+    """
+    rng = np.random.default_rng(seed)
+    n = csr.n_nodes
+    labels = np.arange(n, dtype=np.int64)
+    rows = np.repeat(np.arange(n), csr.degree())
+    w = csr.score.astype(np.float64)
+
+    for _ in range(iters):
+        nb = labels[csr.indices]
+        # (节点, 邻居标签) 分组求权重和
+        key = rows * n + nb
+        order = np.argsort(key, kind="stable")
+        key_s = key[order]
+        starts = np.flatnonzero(np.r_[True, key_s[1:] != key_s[:-1]])
+        wsum = np.add.reduceat(w[order], starts) + rng.random(len(starts)) * 1e-3
+        node = key_s[starts] // n
+        lab = key_s[starts] % n
+        # 每个节点取权重最大的标签
+        best = np.lexsort((-wsum, node))
+        first = np.r_[True, node[best][1:] != node[best][:-1]]
+        cand_node, cand_lab = node[best][first], lab[best][first]
+
+        update = rng.random(len(cand_node)) < 0.8
+        changed = np.count_nonzero(labels[cand_node[update]] != cand_lab[update])
+        labels[cand_node[update]] = cand_lab[update]
+        if changed <= n // 1000:
+            break
+
+    present = csr.degree() > 0
+    out = np.full(n, -1, dtype=np.int64)
+    uniq, inv, cnt = np.unique(labels[present], return_inverse=True, return_counts=True)
+    rank = np.empty(len(uniq), dtype=np.int64)
+    rank[np.argsort(-cnt, kind="stable")] = np.arange(len(uniq))
+    out[present] = rank[inv]
+    return out
+
+
+# -----------------------------
+# 2) 布局：网格密度场斥力 + 边引力
+# -----------------------------
+def _force_layout(pos, src, dst, w, mass, iters, grid=128, seed=RANDOM_SEED):
+    """
+    每轮：引力 = 指向加权邻居质心的位移（Laplacian 平滑）；
+    斥力 = 平滑密度场的负梯度（网格固定覆盖 [-3, 3]²）；
+    之后把坐标重新居中并缩放到 RMS 半径 1，避免整体漂移/塌缩
+    """
+    rng = np.random.default_rng(seed)
+    n = len(pos)
+    pos = _normalize(pos.copy())
+    wsum = np.bincount(src, weights=w, minlength=n) + np.bincount(dst, weights=w, minlength=n)
+    has_nb = wsum > 0
+    cell_size = 6.0 / grid
+    temp = 1.0
+    for _ in range(iters):
+        cell = np.clip(((pos + 3.0) / cell_size).astype(np.int64), 0, grid - 1)
+        dens = np.bincount(cell[:, 0] * grid + cell[:, 1], weights=mass, minlength=grid * grid)
+        dens = ndimage.gaussian_filter(dens.reshape(grid, grid), sigma=grid / 48)
+        gx, gy = np.gradient(dens / (dens.max() + 1e-12))
+        rep = -np.stack([gx[cell[:, 0], cell[:, 1]], gy[cell[:, 0], cell[:, 1]]], axis=1)
+
+        d = pos[dst] - pos[src]
+        att = np.zeros_like(pos)
+        for ax in (0, 1):
+            att[:, ax] = np.bincount(src, weights=d[:, ax] * w, minlength=n) \
+                - np.bincount(dst, weights=d[:, ax] * w, minlength=n)
+        att[has_nb] /= wsum[has_nb, None]
+
+        disp = 0.5 * att + 6.0 * cell_size * rep * grid / 8
+        norm = np.linalg.norm(disp, axis=1, keepdims=True) + 1e-12
+        step = np.minimum(norm, 0.3 * temp) / norm
+        pos = _normalize(pos + disp * step + rng.normal(scale=1e-3 * temp, size=pos.shape))
+        temp = max(temp * 0.97, 0.05)
+    return pos
+
+
+def _normalize(pos):
+    pos = pos - pos.mean(axis=0)
+    return pos / (np.sqrt((pos ** 2).sum(axis=1).mean()) + 1e-12)
+
+
+def layout(csr: string_net.Csr, labels: np.ndarray, iters: int = LAYOUT_ITERS,
+           seed: int = RANDOM_SEED) -> np.ndarray:
+    """返回 (n, 2) 坐标，归一化到 [0.02, 0.98]；度 0 的节点为 NaN"""
+    rng = np.random.default_rng(seed)
+    present = labels >= 0
+    src_all = np.repeat(np.arange(csr.n_nodes), csr.degree())
+    dst_all = csr.indices.astype(np.int64)
+    one_way = src_all < dst_all
+    src, dst = src_all[one_way], dst_all[one_way]
+    w = csr.score[one_way].astype(np.float64) / 1000.0
+
+    # 粗层：社区超节点（质量 = 社区大小，边权 = 社区间边权和）
+    k = int(labels.max()) + 1 if present.any() else 0
+    size = np.bincount(labels[present], minlength=k).astype(np.float64)
+    cs, cd = labels[src], labels[dst]
+    inter = cs != cd
+    key = np.minimum(cs, cd)[inter] * k + np.maximum(cs, cd)[inter]
+    uk, inv = np.unique(key, return_inverse=True)
+    cw = np.bincount(inv, weights=w[inter])
+    coarse = rng.normal(size=(k, 2))
+    coarse = _force_layout(coarse, uk // k, uk % k, cw / (cw.max() if len(cw) else 1.0),
+                           np.sqrt(size), iters, seed=seed)
+
+    # 细层：节点 = 社区中心 + 与社区规模相称的抖动，再整体细化
+    span = np.ptp(coarse, axis=0).max() if k > 1 else 1.0
+    radius = span * 0.5 * np.sqrt(size / size.sum())
+    pos = np.full((csr.n_nodes, 2), np.nan)
+    idx = np.nonzero(present)[0]
+    pos[idx] = coarse[labels[idx]] + rng.normal(size=(len(idx), 2)) * radius[labels[idx], None]
+    pos[idx] = _force_layout(pos[idx], np.searchsorted(idx, src), np.searchsorted(idx, dst), w,
+                             np.ones(len(idx)), max(iters // 2, 1), grid=512, seed=seed)
+
+    lo, hi = np.nanmin(pos, axis=0), np.nanmax(pos, axis=0)
+    scale = (hi - lo).max() or 1.0
+    pos = (pos - lo) / scale
+    pos += (1.0 - (hi - lo) / scale) / 2.0   # 居中
+    return 0.02 + 0.96 * pos
+
+
+# -----------------------------
+# 3) 栅格化（最高层一次）
+# -----------------------------
+def _hex_rgb(h: str):
+    h = h.lstrip("#")
+    return tuple(int(h[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def community_colors(labels: np.ndarray) -> np.ndarray:
+    """前 10 大社区用 Tableau10，其余统一为主蓝色"""
+    k = int(labels.max()) + 1 if (labels >= 0).any() else 0
+    rgb = np.tile(np.array(OTHER_RGB, dtype=np.float64), (k, 1))
+    for i, h in enumerate(TABLEAU10[:k]):
+        rgb[i] = _hex_rgb(h)
+    return rgb
+
+
+def rasterize(pos, src, dst, labels, size: int, chunk_samples: int = 4_000_000):
+    """
+    返回密度网格（float32，形状 size×size）：
+    edge（边经过的像素计数）、node（节点计数）、r/g/b（节点颜色累加）
+    chunk_samples：每块采样点总数上限（按边的采样点数累计分块，峰值内存与边长无关）
+    """
+    present = labels >= 0
+    px = np.zeros((len(pos), 2), dtype=np.int64)
+    px[present] = np.clip((pos[present] * size).astype(np.int64), 0, size - 1)
+    flat = px[:, 1] * size + px[:, 0]    # 行 = y，列 = x
+
+    grids = {}
+    nodes = np.nonzero(present)[0]
+    grids["node"] = np.bincount(flat[nodes], minlength=size * size).astype(np.float32)
+    rgb = community_colors(labels)[labels[nodes]]
+    for c, name in enumerate("rgb"):
+        grids[name] = np.bincount(flat[nodes], weights=rgb[:, c], minlength=size * size).astype(np.float32)
+
+    edge = np.zeros(size * size, dtype=np.float32)
+    length_all = np.minimum(np.abs(px[dst] - px[src]).max(axis=1) + 1, MAX_EDGE_SAMPLES)
+    total = np.cumsum(length_all)
+    s = 0
+    while s < len(src):
+        done = total[s - 1] if s else 0
+        e = max(int(np.searchsorted(total, done + chunk_samples, side="right")), s + 1)
+        a, b = px[src[s:e]], px[dst[s:e]]
+        length = length_all[s:e]
+        offs = np.cumsum(length) - length
+        t = (np.arange(length.sum()) - np.repeat(offs, length)) / np.repeat(np.maximum(length - 1, 1), length)
+        a_r, b_r = np.repeat(a, length, axis=0), np.repeat(b, length, axis=0)
+        pts = np.rint(a_r + (b_r - a_r) * t[:, None]).astype(np.int64)
+        edge += np.bincount(pts[:, 1] * size + pts[:, 0], minlength=size * size).astype(np.float32)
+        s = e
+    grids["edge"] = edge
+    return {k: v.reshape(size, size) for k, v in grids.items()}
+
+
+def downsample(grids: dict, factor: int) -> dict:
+    """块求和：密度在各层精确聚合"""
+    if factor == 1:
+        return grids
+    out = {}
+    for k, g in grids.items():
+        s = g.shape[0] // factor
+        out[k] = g.reshape(s, factor, s, factor).sum(axis=(1, 3))
+    return out
+
+
+def compose(grids: dict, edge_max: float, node_max: float) -> np.ndarray:
+    """对数缩放的边密度底图 + 社区着色节点层 -> RGB uint8"""
+    bg = np.array(BG_COLOR, dtype=np.float32)
+    a_e = (np.log1p(grids["edge"]) / np.log1p(max(edge_max, 1.0)))[..., None] * 0.6
+    img = bg * (1 - a_e) + np.array(EDGE_RGB, dtype=np.float32) * a_e
+
+    cnt = grids["node"]
+    has = cnt > 0
+    node_rgb = np.stack([grids[c] for c in "rgb"], axis=-1) / np.maximum(cnt, 1)[..., None]
+    a_n = np.where(has, 0.45 + 0.55 * np.log1p(cnt) / np.log1p(max(node_max, 1.0)), 0.0)[..., None]
+    img = img * (1 - a_n) + node_rgb * a_n
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+# -----------------------------
+# 4) 瓦片金字塔 + 查看页
+# -----------------------------
+def write_pyramid(grids: dict, out_dir: str, max_zoom: int = MAX_ZOOM) -> int:
+    import matplotlib.image as mpimg
+    n_tiles = 0
+    for z in range(max_zoom + 1):
+        g = downsample(grids, 2 ** (max_zoom - z))
+        # 每层按本层最大值归一化，缩放时对比度保持一致
+        img = compose(g, float(g["edge"].max()), float(g["node"].max()))
+        for ty in range(2 ** z):
+            for tx in range(2 ** z):
+                win = (slice(ty * TILE, (ty + 1) * TILE), slice(tx * TILE, (tx + 1) * TILE))
+                if g["edge"][win].max() == 0 and g["node"][win].max() == 0:
+                    continue   # 空瓦片不写，查看页直接显示背景色
+                path = os.path.join(out_dir, str(z), str(tx), f"{ty}.png")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                mpimg.imsave(path, img[win])
+                n_tiles += 1
+        if z == max_zoom:
+            mpimg.imsave(os.path.join(out_dir, "overview.png"), img)
+    return n_tiles
+
+
+VIEWER_HTML = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="UTF-8">
+<title>Full Network Density Map | cutoff=__CUTOFF__</title>
+<style>
+  html, body { margin: 0; height: 100%; background: #F8F9FA; font-family: Arial, sans-serif; color: #2C3E50; }
+  #map { position: absolute; inset: 0; overflow: hidden; cursor: grab; background: #F8F9FA; }
+  #map img { position: absolute; image-rendering: pixelated; user-select: none; -webkit-user-drag: none; }
+  #info { position: absolute; left: 12px; top: 10px; background: rgba(248,249,250,0.85);
+          padding: 6px 10px; border-radius: 4px; font-size: 13px; pointer-events: none; }
+</style>
+</head>
+<body>
+<div id="map"></div>
+<div id="info"><b>Full network</b> (cutoff=__CUTOFF__): __NODES__ nodes, __EDGES__ edges &middot; 滚轮缩放 / 拖拽平移</div>
+<script>
+(function () {
+  var META = __META__;
+  var map = document.getElementById('map'), tiles = {};
+  var view = { s: 1, x: 0, y: 0 };   // s: 屏幕像素 / 世界单位（世界 = 256 × 256）
+
+  function fit() {
+    var w = map.clientWidth, h = map.clientHeight;
+    view.s = Math.min(w, h) / META.tile;
+    view.x = (w - META.tile * view.s) / 2;
+    view.y = (h - META.tile * view.s) / 2;
+  }
+
+  function render() {
+    var z = Math.max(0, Math.min(META.maxZoom, Math.ceil(Math.log2(view.s))));
+    var n = 1 << z, size = META.tile * view.s / n;
+    var w = map.clientWidth, h = map.clientHeight, keep = {};
+    var x0 = Math.max(0, Math.floor(-view.x / size)), x1 = Math.min(n - 1, Math.floor((w - view.x) / size));
+    var y0 = Math.max(0, Math.floor(-view.y / size)), y1 = Math.min(n - 1, Math.floor((h - view.y) / size));
+    for (var tx = x0; tx <= x1; tx++) {
+      for (var ty = y0; ty <= y1; ty++) {
+        var key = z + '/' + tx + '/' + ty, img = tiles[key];
+        if (!img) {
+          img = document.createElement('img');
+          img.onerror = function () { this.style.visibility = 'hidden'; };
+          img.src = key + '.png';
+          map.appendChild(img);
+          tiles[key] = img;
+        }
+        img.style.left = (view.x + tx * size) + 'px';
+        img.style.top = (view.y + ty * size) + 'px';
+        img.style.width = img.style.height = (size + 0.5) + 'px';
+        keep[key] = true;
+      }
+    }
+    for (var k in tiles) {
+      if (!keep[k]) { map.removeChild(tiles[k]); delete tiles[k]; }
+    }
+  }
+
+  map.addEventListener('wheel', function (e) {
+    e.preventDefault();
+    var r = map.getBoundingClientRect(), mx = e.clientX - r.left, my = e.clientY - r.top;
+    var f = Math.exp(-e.deltaY * 0.0015);
+    var s = Math.max(0.5, Math.min(view.s * f, (1 << META.maxZoom) * 4));
+    f = s / view.s;
+    view.x = mx - (mx - view.x) * f;
+    view.y = my - (my - view.y) * f;
+    view.s = s;
+    render();
+  }, { passive: false });
+
+  var drag = null;
+  map.addEventListener('mousedown', function (e) { drag = { x: e.clientX, y: e.clientY }; map.style.cursor = 'grabbing'; });
+  window.addEventListener('mouseup', function () { drag = null; map.style.cursor = 'grab'; });
+  window.addEventListener('mousemove', function (e) {
+    if (!drag) return;
+    view.x += e.clientX - drag.x; view.y += e.clientY - drag.y;
+    drag = { x: e.clientX, y: e.clientY };
+    render();
+  });
+  map.addEventListener('dblclick', function () { fit(); render(); });
+  window.addEventListener('resize', render);
+  fit();
+  render();
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def write_viewer(out_dir: str, cutoff: int, n_nodes: int, n_edges: int, max_zoom: int = MAX_ZOOM):
+    meta = {"tile": TILE, "maxZoom": max_zoom, "cutoff": cutoff, "nodes": n_nodes, "edges": n_edges}
+    html = (VIEWER_HTML.replace("__META__", json.dumps(meta))
+            .replace("__CUTOFF__", str(cutoff))
+            .replace("__NODES__", f"{n_nodes:,}")
+            .replace("__EDGES__", f"{n_edges:,}"))
+    with open(os.path.join(out_dir, "viewer.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+    with open(os.path.join(out_dir, "tiles.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def render_density_map(edges: string_net.EdgeTable, cutoff: int, out_dir: str,
+                       labels: np.ndarray = None, max_zoom: int = MAX_ZOOM) -> dict:
+    """整条流水线；labels 可传入已有社区划分（长度 n_nodes，-1 表示不绘制）"""
+    csr = string_net.csr_at(edges, cutoff)
+    if labels is None:
+        print("[INFO] Label propagation ...")
+        labels = label_propagation(csr)
+    else:
+        labels = np.where(csr.degree() > 0, labels, -1)
+
+    print("[INFO] Layout ...")
+    pos = layout(csr, labels)
+
+    print("[INFO] Rasterizing ...")
+    src, dst, _ = string_net.edges_at(edges, cutoff)
+    grids = rasterize(pos, src, dst, labels, TILE * 2 ** max_zoom)
+
+    os.makedirs(out_dir, exist_ok=True)
+    n_tiles = write_pyramid(grids, out_dir, max_zoom)
+    n_nodes = int((labels >= 0).sum())
+    write_viewer(out_dir, cutoff, n_nodes, len(src), max_zoom)
+    np.save(os.path.join(out_dir, "positions.npy"), pos.astype(np.float32))
+    return {"nodes": n_nodes, "edges": len(src), "communities": int(labels.max()) + 1, "tiles": n_tiles}
+
+
+def main():
+    if not string_net.require_files(string_net.LINKS_GZ):
+        return
+
+    edges = string_net.load_edges()
+    stats = render_density_map(edges, SCORE_CUTOFF, OUT_DIR)
+    print(f"[INFO] nodes={stats['nodes']}, edges={stats['edges']}, "
+          f"communities={stats['communities']}, tiles={stats['tiles']}")
+
+    print("\n[DONE]")
+    print("Viewer  :", os.path.join(OUT_DIR, "viewer.html"))
+    print("Overview:", os.path.join(OUT_DIR, "overview.png"))
+
+
+if __name__ == "__main__":
+    main()
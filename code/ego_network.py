@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+自我网络（ego network）：某个蛋白在 score 阈值下的 k 跳邻域，直接在全分数 CSR 上逐层展开
+
+- hop_scores：每一跳各自的 combined_score 阈值，如 (700, 700) = 两跳、每跳 >= 700；
+  (900, 400) = 第一跳只走高置信边、第二跳放宽
+- 节点强度 = 从中心出发的最强路径上的最弱边（瓶颈分数，取所有路径的最大值）
+- max_nodes：节点预算。逐跳收集，超出预算时本跳按强度降序截断（并列按节点编号），
+  被截掉的节点不再向外展开 —— 大 hub 的第二跳也只展开保留下来的邻居
+- 边：默认只含相邻两跳之间满足该跳阈值的边；neighbor_edges=True 时再加入保留节点之间
+  score >= neighbor_score 的其余边（同一跳邻居之间的边）
+- 每次调用只触及中心附近的 CSR 行（string_net.expand 向量化），hub 的邻域也在毫秒级返回
+
+export_ego_pyvis 复用 pic3.export_pyvis 的样式：按跳数（hop）着色，tooltip / CSV / GEXF 另附瓶颈强度（strength）。
+
+用法：python code/ego_network.py
+"""
+
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+import string_net
+import protein_meta
+
+CENTER = "Trp53"
+HOP_SCORES = (700, 700)
+MAX_NODES = 200
+NEIGHBOR_EDGES = True
+
+OUT_DIR = os.path.join(string_net.ROOT_DIR, "figures", "ego")
+
+
+class EgoNetwork(NamedTuple):
+    """节点按 (跳数, 强度降序) 排列，中心在最前；边每条一次（src < dst），均为边表节点下标"""
+    nodes: np.ndarray       # int64
+    hop: np.ndarray         # int8，中心为 0
+    strength: np.ndarray    # uint16，瓶颈分数（中心记 1000）
+    src: np.ndarray
+    dst: np.ndarray
+    score: np.ndarray       # uint16
+
+
+# -----------------------------
+# 1) 逐跳展开
+# -----------------------------
+def ego_network(csr: string_net.Csr, center, hop_scores=HOP_SCORES, max_nodes: int = MAX_NODES,
+                neighbor_edges: bool = NEIGHBOR_EDGES, neighbor_score: int = None) -> EgoNetwork:
+    """
+    center：一个或多个节点下标（多个时作为共同中心）
+    neighbor_score：邻居间边的阈值，默认取 hop_scores 的最大值
+    """
+    centers = np.unique(np.atleast_1d(np.asarray(center, dtype=np.int64)))
+    if len(centers) == 0 or (centers < 0).any() or (centers >= csr.n_nodes).any():
+        raise ValueError(f"中心节点不在网络中：{center}")
+    max_nodes = max(int(max_nodes), len(centers))
+
+    seen = np.zeros(csr.n_nodes, dtype=bool)
+    seen[centers] = True
+    nodes, hops, strength = [centers], [np.zeros(len(centers), dtype=np.int8)], [np.full(len(centers), 1000, np.uint16)]
+    layer_src, layer_dst, layer_score = [], [], []
+    frontier, frontier_strength = centers, np.full(len(centers), 1000, dtype=np.uint16)
+    budget = max_nodes - len(centers)
+
+    for h, cutoff in enumerate(hop_scores, start=1):
+        if budget <= 0 or len(frontier) == 0:
+            break
+        v, w, pos = string_net.expand(csr, frontier)
+        sc = csr.score[pos]
+        ok = (sc >= cutoff) & ~seen[w]
+        v, w, sc = v[ok], w[ok], sc[ok]
+        if len(w) == 0:
+            break
+        # 经由前一跳节点 v 到达 w 的瓶颈分数
+        via = np.minimum(sc, frontier_strength[np.searchsorted(frontier, v)])
+        new, inv = np.unique(w, return_inverse=True)
+        best = np.zeros(len(new), dtype=np.uint16)
+        np.maximum.at(best, inv, via)
+        if len(new) > budget:
+            order = np.lexsort((new, -best.astype(np.int32)))[:budget]
+            order.sort()                       # 保持 new 的升序（后续 searchsorted 需要）
+            new, best = new[order], best[order]
+        seen[new] = True
+        budget -= len(new)
+
+        kept = np.zeros(csr.n_nodes, dtype=bool)
+        kept[new] = True
+        e = kept[w]
+        layer_src.append(v[e])
+        layer_dst.append(w[e])
+        layer_score.append(sc[e])
+
+        rank = np.lexsort((new, -best.astype(np.int32)))
+        nodes.append(new[rank])
+        hops.append(np.full(len(new), h, dtype=np.int8))
+        strength.append(best[rank])
+        frontier, frontier_strength = new, best
+
+    nodes, hops, strength = np.concatenate(nodes), np.concatenate(hops), np.concatenate(strength)
+
+    src = np.concatenate(layer_src) if layer_src else np.empty(0, dtype=np.int64)
+    dst = np.concatenate(layer_dst) if layer_dst else np.empty(0, dtype=np.int64)
+    score = np.concatenate(layer_score) if layer_score else np.empty(0, dtype=np.uint16)
+    if neighbor_edges and len(nodes) > 1:
+        threshold = max(hop_scores) if neighbor_score is None else neighbor_score
+        s2, d2, sc2 = string_net.induced_edges(csr, nodes, threshold)
+        src, dst, score = np.concatenate([src, s2]), np.concatenate([dst, d2]), np.concatenate([score, sc2])
+
+    lo, hi = np.minimum(src, dst).astype(np.int64), np.maximum(src, dst).astype(np.int64)
+    _, first = np.unique(lo * csr.n_nodes + hi, return_index=True)
+    order = first[np.argsort(-score[first].astype(np.int32), kind="stable")]
+    return EgoNetwork(nodes.astype(np.int64), hops, strength, lo[order], hi[order], score[order].astype(np.uint16))
+
+
+# -----------------------------
+# 2) 名称 -> 中心节点；networkx / Pyvis 出口
+# -----------------------------
+def center_nodes(names, ids: np.ndarray, meta: protein_meta.ProteinMeta = None, alias_index=None) -> np.ndarray:
+    """基因 symbol / 外部 ID / protein_id -> 边表节点下标（有别名索引时经别名解析，否则按 symbol 精确匹配）"""
+    names = [str(n) for n in np.atleast_1d(names)]
+    if alias_index is not None:
+        pids = alias_index.resolve_ids(names)
+    else:
+        pids = list(names)
+        if meta is not None:
+            sym = meta.symbols[meta.symbol_code[:]]
+            upper = np.char.upper(sym.astype(str))
+            for n in names:
+                pids += list(meta.ids[np.nonzero(upper == n.upper())[0]])
+    idx = string_net.node_index(ids, pids)
+    return np.unique(idx[idx >= 0])
+
+
+def ego_graph(ego: EgoNetwork, ids: np.ndarray):
+    """-> networkx 图（边属性 score / weight，节点属性 hop / strength）"""
+    G = string_net.to_networkx(ids, ego.src, ego.dst, ego.score)
+    for n, h, s in zip(ids[ego.nodes].tolist(), ego.hop.tolist(), ego.strength.tolist()):
+        G.add_node(str(n), hop=int(h), strength=int(s))
+    return G
+
+
+def export_ego_pyvis(ego: EgoNetwork, ids: np.ndarray, meta: protein_meta.ProteinMeta, out_html: str,
+                     title: str = None):
+    """pic3.export_pyvis 样式的 HTML（按跳数着色，附瓶颈强度），同时写出同名 .csv / .gexf"""
+    import pic3
+    G = ego_graph(ego, ids)
+    hop = {n: d["hop"] for n, d in G.nodes(data=True)}
+    strength = {n: d["strength"] for n, d in G.nodes(data=True)}
+    stem = os.path.splitext(out_html)[0]
+    pic3.export_pyvis(G, hop, meta.view("symbol"), meta.view("full"), meta.view("desc"),
+                      out_html, stem + ".csv", stem + ".gexf",
+                      cutoff=min(ego.score) if len(ego.score) else 0, title=title,
+                      group_label="hop", node_attrs={"strength": strength})
+    return G
+
+
+def main():
+    if not string_net.require_files(string_net.LINKS_GZ, protein_meta.INFO_GZ):
+        return
+
+    edges = string_net.load_edges()
+    csr = string_net.build_csr(edges.n_nodes, edges.src, edges.dst, edges.score)
+    meta = protein_meta.load_meta()
+    alias_index = None
+    import aliases
+    if os.path.exists(aliases.ALIASES_GZ):
+        alias_index = aliases.load_aliases()
+
+    centers = center_nodes([CENTER], edges.ids, meta, alias_index)
+    if len(centers) == 0:
+        print(f"[WARN] 网络中找不到 {CENTER}")
+        return
+
+    t0 = time.perf_counter()
+    ego = ego_network(csr, centers, HOP_SCORES, MAX_NODES, NEIGHBOR_EDGES)
+    ms = (time.perf_counter() - t0) * 1000
+    counts = np.bincount(ego.hop, minlength=len(HOP_SCORES) + 1)
+    print(f"[INFO] {CENTER}: degree={int(csr.degree()[centers].sum())}, hop scores={HOP_SCORES}, "
+          f"nodes per hop={counts.tolist()}, edges={len(ego.src)} ({ms:.1f} ms)")
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    out_html = os.path.join(OUT_DIR, f"ego_{CENTER}_{'_'.join(map(str, HOP_SCORES))}.html")
+    title = f"Ego network of {CENTER} | hop scores {'/'.join(map(str, HOP_SCORES))} | max {MAX_NODES} nodes"
+    export_ego_pyvis(ego, edges.ids, meta, out_html, title)
+
+    print("\n[DONE]")
+    print("HTML :", out_html)
+
+
+if __name__ == "__main__":
+    main()
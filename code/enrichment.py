@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+功能富集（超几何检验）的紧凑术语存储
+
+- 一次性把 protein.enrichment.terms 编码为整数 (蛋白, 术语) 对并缓存（mmap）
+- 载入时构建 术语 × 蛋白 的稀疏隶属矩阵；一次稀疏矩阵-向量乘法得到所有术语的命中数
+- 统计口径与 pic5.py 一致：背景 = 文件中出现的全部蛋白；k >= 3；Gene_Ratio = k / 术语大小
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.stats import hypergeom
+
+import string_net
+
+TERMS_GZ = string_net.taxon_file("enrichment.terms")
+
+TERM_ARRAYS = ("proteins", "prot_code", "term_code", "term_ids", "term_desc", "term_cat")
+
+MIN_COUNT = 3
+
+
+# -----------------------------
+# 1) 构建 / 载入
+# -----------------------------
+def build_store(terms_path: str, out_dir: str):
+    df = pd.read_csv(terms_path, sep="\t", compression="gzip")
+    id_col = df.columns[0]   # 通常是 #string_protein_id
+
+    prot_code, proteins = pd.factorize(df[id_col].astype(str), sort=True)
+    term_code, term_ids = pd.factorize(df["term"].astype(str), sort=True)
+    first = pd.Series(np.arange(len(df))).groupby(term_code).first().to_numpy()
+
+    arrays = {
+        "proteins": np.asarray(proteins, dtype=str),
+        "prot_code": prot_code.astype(np.int32),
+        "term_code": term_code.astype(np.int32),
+        "term_ids": np.asarray(term_ids, dtype=str),
+        "term_desc": df["description"].astype(str).to_numpy(dtype=str)[first],
+        "term_cat": df["category"].astype(str).to_numpy(dtype=str)[first],
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    for k in TERM_ARRAYS:
+        np.save(os.path.join(out_dir, f"{k}.npy"), arrays[k])
+    string_net.write_stamp(terms_path, out_dir)
+
+
+class TermStore:
+    def __init__(self, out_dir: str):
+        for k in TERM_ARRAYS:
+            setattr(self, k, np.load(os.path.join(out_dir, f"{k}.npy"), mmap_mode="r"))
+        n_terms, n_prot = len(self.term_ids), len(self.proteins)
+        # 去重后的 0/1 隶属矩阵（同一蛋白在同一术语下重复出现只计一次）
+        M = sparse.csr_matrix(
+            (np.ones(len(self.term_code), dtype=np.int32), (self.term_code, self.prot_code)),
+            shape=(n_terms, n_prot),
+        )
+        M.data[:] = 1
+        self.membership = M
+        self.term_size = np.asarray(M.sum(axis=1)).ravel()
+
+    @property
+    def n_background(self) -> int:
+        return len(self.proteins)
+
+    def index(self, pids) -> np.ndarray:
+        """protein_id -> 背景中的下标；不在背景中记 -1"""
+        pids = np.asarray(pids, dtype=str)
+        if len(pids) == 0:
+            return np.zeros(0, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.proteins, pids), len(self.proteins) - 1)
+        return np.where(self.proteins[pos] == pids, pos, -1)
+
+
+def load_terms(terms_path: str = TERMS_GZ, cache_dir: str = string_net.CACHE_DIR) -> TermStore:
+    out_dir = string_net.cache_dir_for(terms_path, cache_dir)
+    if not string_net.cache_is_fresh(terms_path, out_dir):
+        print(f"[INFO] Building enrichment term store from {terms_path} ...")
+        build_store(terms_path, out_dir)
+    return TermStore(out_dir)
+
+
+# -----------------------------
+# 2) 富集检验
+# -----------------------------
+def enrich(store: TermStore, protein_ids, category: str = "Process",
+           min_count: int = MIN_COUNT) -> pd.DataFrame:
+    """
+    返回列：Term, term_id, Category, Count, Term_Size, P-value, Gene_Ratio（按 P 值升序）
+    category：对术语类别做子串匹配（None 表示不过滤）
+    """
+    idx = np.unique(store.index(protein_ids))
+    idx = idx[idx >= 0]
+    hit = np.zeros(store.n_background)
+    hit[idx] = 1.0
+    k = (store.membership @ hit).astype(np.int64)
+
+    keep = k >= min_count
+    if category:
+        keep &= pd.Series(store.term_cat).str.contains(category, na=False).to_numpy()
+    t = np.nonzero(keep)[0]
+
+    M, N = store.n_background, len(idx)
+    n = store.term_size[t]
+    p = hypergeom.sf(k[t] - 1, M, n, N)
+    out = pd.DataFrame({
+        "Term": store.term_desc[t],
+        "term_id": store.term_ids[t],
+        "Category": store.term_cat[t],
+        "Count": k[t],
+        "Term_Size": n,
+        "P-value": p,
+        "Gene_Ratio": k[t] / n,
+    })
+    return out.sort_values("P-value", kind="stable").reset_index(drop=True)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+流式网络导出（GEXF / GraphML / Cytoscape.js JSON / Parquet 边表）
+
+nx.write_gexf 会先在内存里建完整 XML 树；这里直接从节点/边数组按块拼接文本写出：
+- 节点：ids + 任意列属性（dict: 列名 -> 数组），属性类型按 dtype 推断
+- 边：src/dst 为节点下标，score 为 combined_score（GEXF/GraphML 同时写 weight = score/1000，与 string_net.to_networkx 一致）
+- 内存只与块大小（EDGE_CHUNK）相关；路径以 .gz 结尾时直接 gzip 压缩写出
+
+用法：python code/graph_export.py   # 导出 cutoff=400 全网络到 outputs/export/
+"""
+
+import os
+import gzip
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+import string_net
+
+SCORE_CUTOFF = 400
+EDGE_CHUNK = 200_000
+FORMATS = ("gexf", "graphml", "cyjs", "parquet")
+OUT_DIR = os.path.join(string_net.ROOT_DIR, "outputs", "export")
+
+
+# -----------------------------
+# 1) 通用工具
+# -----------------------------
+def _open(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    return open(path, "w", encoding="utf-8")
+
+
+def _attr_type(values) -> str:
+    kind = np.asarray(values).dtype.kind
+    if kind in "iu":
+        return "integer"
+    if kind == "f":
+        return "double"
+    if kind == "b":
+        return "boolean"
+    return "string"
+
+
+def _columns(node_attrs: dict):
+    """(名称, 类型, python 列表)；一次 tolist，避免逐元素取 numpy 标量"""
+    return [(k, _attr_type(v), np.asarray(v).tolist()) for k, v in (node_attrs or {}).items()]
+
+
+def _fmt(value, kind: str) -> str:
+    if kind == "boolean":
+        return "true" if value else "false"
+    return escape(str(value), {'"': "&quot;"}) if kind == "string" else repr(value)
+
+
+def _text(value, kind: str) -> str:
+    return escape(str(value)) if kind == "string" else _fmt(value, kind)
+
+
+def graph_arrays(G, attrs=("symbol", "community", "degree", "core", "annotation")):
+    """networkx 图 -> (ids, src, dst, score, node_attrs)；缺失的节点属性列整列跳过"""
+    ids = np.asarray([str(n) for n in G.nodes()])
+    pos = {n: i for i, n in enumerate(G.nodes())}
+    src = np.fromiter((pos[u] for u, _ in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    dst = np.fromiter((pos[v] for _, v in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    score = np.fromiter((d.get("score", d.get("weight", 1)) for _, _, d in G.edges(data=True)),
+                        dtype=np.float64, count=G.number_of_edges())
+    if np.all(score == np.round(score)):
+        score = score.astype(np.int64)
+    node_attrs = {}
+    for a in attrs:
+        col = [G.nodes[n].get(a) for n in G.nodes()]
+        if all(v is not None for v in col):
+            node_attrs[a] = np.asarray(col)
+    return ids, src, dst, score, node_attrs
+
+
+# -----------------------------
+# 2) GEXF 1.2
+# -----------------------------
+def write_gexf(path: str, ids, src, dst, score, node_attrs: dict = None, chunk: int = EDGE_CHUNK):
+    cols = _columns(node_attrs)
+    ids = np.asarray(ids).tolist()
+    score_kind = _attr_type(score)
+    with _open(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n'
+                '  <graph defaultedgetype="undirected" mode="static">\n'
+                '    <attributes class="node" mode="static">\n')
+        for j, (name, kind, _) in enumerate(cols):
+            f.write(f'      <attribute id="{j}" title={quoteattr(name)} type="{kind}" />\n')
+        f.write('    </attributes>\n'
+                '    <attributes class="edge" mode="static">\n'
+                f'      <attribute id="score" title="score" type="{score_kind}" />\n'
+                '    </attributes>\n'
+                '    <nodes>\n')
+        for s in range(0, len(ids), chunk):
+            lines = []
+            for i in range(s, min(s + chunk, len(ids))):
+                label = cols[0][2][i] if cols and cols[0][0] == "symbol" else ids[i]
+                vals = "".join(f'<attvalue for="{j}" value="{_fmt(c[2][i], c[1])}" />'
+                               for j, c in enumerate(cols))
+                lines.append(f'      <node id={quoteattr(ids[i])} label={quoteattr(str(label))}>'
+                             f'<attvalues>{vals}</attvalues></node>\n')
+            f.write("".join(lines))
+        f.write('    </nodes>\n'
+                '    <edges>\n')
+        for s in range(0, len(src), chunk):
+            e = range(s, min(s + chunk, len(src)))
+            a, b, w = (np.asarray(x[s:s + chunk]).tolist() for x in (src, dst, score))
+            f.write("".join(
+                f'      <edge id="{k}" source={quoteattr(ids[u])} target={quoteattr(ids[v])} weight="{x / 1000}">'
+                f'<attvalues><attvalue for="score" value="{x}" /></attvalues></edge>\n'
+                for k, u, v, x in zip(e, a, b, w)))
+        f.write('    </edges>\n'
+                '  </graph>\n'
+                '</gexf>\n')
+
+
+# -----------------------------
+# 3) GraphML
+# -----------------------------
+def write_graphml(path: str, ids, src, dst, score, node_attrs: dict = None, chunk: int = EDGE_CHUNK):
+    cols = _columns(node_attrs)
+    ids = np.asarray(ids).tolist()
+    gml_type = {"integer": "long", "double": "double", "boolean": "boolean", "string": "string"}
+    score_kind = gml_type[_attr_type(score)]
+    with _open(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for j, (name, kind, _) in enumerate(cols):
+            f.write(f'  <key id="d{j}" for="node" attr.name={quoteattr(name)} attr.type="{gml_type[kind]}" />\n')
+        f.write(f'  <key id="score" for="edge" attr.name="score" attr.type="{score_kind}" />\n'
+                '  <key id="weight" for="edge" attr.name="weight" attr.type="double" />\n'
+                '  <graph edgedefault="undirected">\n')
+        for s in range(0, len(ids), chunk):
+            lines = []
+            for i in range(s, min(s + chunk, len(ids))):
+                vals = "".join(f'<data key="d{j}">{_text(c[2][i], c[1])}</data>' for j, c in enumerate(cols))
+                lines.append(f'    <node id={quoteattr(ids[i])}>{vals}</node>\n')
+            f.write("".join(lines))
+        for s in range(0, len(src), chunk):
+            a, b, w = (np.asarray(x[s:s + chunk]).tolist() for x in (src, dst, score))
+            f.write("".join(
+                f'    <edge source={quoteattr(ids[u])} target={quoteattr(ids[v])}>'
+                f'<data key="score">{x}</data><data key="weight">{x / 1000}</data></edge>\n'
+                for u, v, x in zip(a, b, w)))
+        f.write('  </graph>\n'
+                '</graphml>\n')
+
+
+# -----------------------------
+# 4) Cytoscape.js JSON（elements 格式，Cytoscape 桌面版可直接导入）
+# -----------------------------
+def write_cytoscape_json(path: str, ids, src, dst, score, node_attrs: dict = None,
+                         chunk: int = EDGE_CHUNK):
+    cols = _columns(node_attrs)
+    ids = np.asarray(ids).tolist()
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    with _open(path) as f:
+        f.write('{"elements":{"nodes":[\n')
+        for s in range(0, len(ids), chunk):
+            f.write(",\n".join(
+                dumps({"data": {"id": ids[i], "name": cols[0][2][i] if cols and cols[0][0] == "symbol" else ids[i],
+                                **{name: vals[i] for name, _, vals in cols}}})
+                for i in range(s, min(s + chunk, len(ids)))))
+            f.write(",\n" if s + chunk < len(ids) else "\n")
+        f.write('],"edges":[\n')
+        for s in range(0, len(src), chunk):
+            a, b, w = (np.asarray(x[s:s + chunk]).tolist() for x in (src, dst, score))
+            f.write(",\n".join(
+                f'{{"data":{{"id":"e{s + k}","source":{dumps(ids[u])},"target":{dumps(ids[v])},"score":{x}}}}}'
+                for k, (u, v, x) in enumerate(zip(a, b, w))))
+            f.write(",\n" if s + chunk < len(src) else "\n")
+        f.write(']}}\n')
+
+
+# -----------------------------
+# 5) Parquet 边表（pyarrow，按行组流式写出）
+# -----------------------------
+def write_parquet_edges(path: str, ids, src, dst, score, chunk: int = EDGE_CHUNK):
+    """列：protein1, protein2, combined_score；protein 列以字典编码（类别）存储"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    ids = pa.array(np.asarray(ids, dtype=str))
+    schema = pa.schema([
+        ("protein1", pa.dictionary(pa.int32(), pa.string())),
+        ("protein2", pa.dictionary(pa.int32(), pa.string())),
+        ("combined_score", pa.from_numpy_dtype(np.asarray(score[:0]).dtype)),
+    ])
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for s in range(0, len(src), chunk):
+            batch = pa.record_batch([
+                pa.DictionaryArray.from_arrays(pa.array(np.asarray(src[s:s + chunk], dtype=np.int32)), ids),
+                pa.DictionaryArray.from_arrays(pa.array(np.asarray(dst[s:s + chunk], dtype=np.int32)), ids),
+                pa.array(np.asarray(score[s:s + chunk])),
+            ], schema=schema)
+            writer.write_batch(batch)
+
+
+# -----------------------------
+# 6) 全网络导出
+# -----------------------------
+def export_network(edges: string_net.EdgeTable, cutoff: int, out_dir: str = OUT_DIR,
+                   formats=FORMATS, meta=None) -> dict:
+    """
+    导出 cutoff 阈值下的全网络（只保留至少有一条边的节点）
+    meta：protein_meta.ProteinMeta（可选），用于写入 symbol / annotation 节点属性
+    """
+    src, dst, score = string_net.edges_at(edges, cutoff)
+    deg = string_net.degrees(edges.n_nodes, src, dst)
+    keep = np.nonzero(deg > 0)[0]
+    remap = np.full(edges.n_nodes, -1, dtype=np.int64)
+    remap[keep] = np.arange(len(keep))
+    ids = edges.ids[keep]
+    src, dst = remap[src], remap[dst]
+
+    node_attrs = {}
+    if meta is not None:
+        node_attrs["symbol"] = meta.symbols_of(ids).astype(str)
+    node_attrs["degree"] = deg[keep]
+
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"string_network_th{cutoff}")
+    written = {}
+    for fmt in formats:
+        if fmt == "gexf":
+            path = stem + ".gexf.gz"
+            write_gexf(path, ids, src, dst, score, node_attrs)
+        elif fmt == "graphml":
+            path = stem + ".graphml.gz"
+            write_graphml(path, ids, src, dst, score, node_attrs)
+        elif fmt == "cyjs":
+            path = stem + ".cyjs.gz"
+            write_cytoscape_json(path, ids, src, dst, score, node_attrs)
+        elif fmt == "parquet":
+            path = stem + ".edges.parquet"
+            write_parquet_edges(path, ids, src, dst, score)
+        else:
+            raise ValueError(f"未知导出格式：{fmt}（可选 {FORMATS}）")
+        written[fmt] = path
+    return written
+
+
+def main():
+    if not string_net.require_files(string_net.LINKS_GZ):
+        return
+
+    import time
+    import protein_meta
+
+    edges = string_net.load_edges()
+    meta = protein_meta.load_meta() if os.path.exists(protein_meta.INFO_GZ) else None
+    for fmt in FORMATS:
+        t0 = time.time()
+        path = export_network(edges, SCORE_CUTOFF, formats=(fmt,), meta=meta)[fmt]
+        print(f"[INFO] {fmt:8s} {time.time() - t0:6.2f}s  {os.path.getsize(path) / 1e6:8.1f} MB  {path}")
+
+    print("\n[DONE]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+保度重连零模型（double-edge swap）与网络统计量的显著性
+
+- 重连：每批随机抽取不相交的边对 (a-b, c-d)，交换为 (a-d, c-b) 或 (a-c, b-d)；
+  自环、与现有边重复、批内互相重复的交换整对拒绝。度序列严格保持，
+  默认每条边平均被交换 SWAPS_PER_EDGE 次
+- 统计量（观测网络与每个随机网络用同一方法计算）：
+    modularity       ：社区划分的 Newman 模块度（无权）；划分默认用向量化标签传播，
+                       COMMUNITY_METHOD="louvain" 时用 python-louvain（更准但慢一个数量级）
+    avg_clustering   ：平均局部聚类系数
+    transitivity     ：全局传递性
+    lcc_size         ：最大连通分量节点数
+    keyword_density  ：关键词蛋白集合内部的边密度（可选）
+- 随机网络分块交给进程池；每块一个 SeedSequence 子种子，结果可复现
+- 报告 z = (观测 - 零模型均值) / 零模型标准差，以及经验单侧 p 值
+
+用法：python code/null_models.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.sparse.csgraph import connected_components
+
+import string_net
+import clustering
+import community_metrics
+import density_map
+
+SCORE_CUTOFF = 700
+N_RANDOM = 1000
+SWAPS_PER_EDGE = 10
+BATCH_FRAC = 0.2          # 每批尝试交换的边对数 = BATCH_FRAC · m / 2
+RANDOM_CHUNK = 10         # 每个进程任务生成的随机网络数
+KEYWORD = "ribosomal"
+LPA_ITERS = 30
+COMMUNITY_METHOD = "lpa"  # "lpa" / "louvain"
+
+STATS = ("modularity", "avg_clustering", "transitivity", "lcc_size", "keyword_density")
+
+
+# -----------------------------
+# 1) 批量 double-edge swap
+# -----------------------------
+def _keys(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.minimum(a, b) * n + np.maximum(a, b)
+
+
+def _contains(sorted_keys: np.ndarray, q: np.ndarray) -> np.ndarray:
+    pos = np.minimum(np.searchsorted(sorted_keys, q), len(sorted_keys) - 1)
+    return sorted_keys[pos] == q
+
+
+def rewire(n: int, src: np.ndarray, dst: np.ndarray, rng: np.random.Generator,
+           swaps_per_edge: float = SWAPS_PER_EDGE, batch_frac: float = BATCH_FRAC):
+    """返回重连后的 (src, dst)（src < dst）；度序列与输入一致"""
+    s = np.asarray(src, dtype=np.int64).copy()
+    d = np.asarray(dst, dtype=np.int64).copy()
+    m = len(s)
+    if m < 2:
+        return s, d
+    target = int(swaps_per_edge * m)
+    per_batch = max(1, min(int(batch_frac * m / 2), m // 2))
+    keys = np.sort(_keys(n, s, d))
+
+    done, stalled = 0, 0
+    while done < target and stalled < 20:
+        b = min(per_batch, target - done)
+        pick = rng.choice(m, size=2 * b, replace=False)
+        i, j = pick[:b], pick[b:]
+        a, bb, c, dd = s[i], d[i], s[j], d[j]
+        flip = rng.random(b) < 0.5
+        c, dd = np.where(flip, dd, c), np.where(flip, c, dd)
+
+        # 新边 (a, dd) 与 (c, bb)
+        k1, k2 = _keys(n, a, dd), _keys(n, c, bb)
+        ok = (a != dd) & (c != bb) & (k1 != k2) & ~_contains(keys, k1) & ~_contains(keys, k2)
+        # 批内重复：同一条新边被多对生成时全部拒绝
+        cand = np.concatenate([k1[ok], k2[ok]])
+        uniq, cnt = np.unique(cand, return_counts=True)
+        dup = uniq[cnt > 1]
+        if len(dup):
+            ok &= ~np.isin(k1, dup) & ~np.isin(k2, dup)
+
+        acc = int(ok.sum())
+        stalled = stalled + 1 if acc == 0 else 0
+        s[i[ok]], d[i[ok]] = a[ok], dd[ok]
+        s[j[ok]], d[j[ok]] = c[ok], bb[ok]
+        keys = np.sort(_keys(n, s, d))
+        done += acc
+
+    return np.minimum(s, d), np.maximum(s, d)
+
+
+# -----------------------------
+# 2) 统计量
+# -----------------------------
+def _partition(csr: string_net.Csr, method: str, seed: int) -> np.ndarray:
+    if method == "lpa":
+        return density_map.label_propagation(csr, iters=LPA_ITERS, seed=seed)
+    if method == "louvain":
+        import community as community_louvain  # python-louvain
+        src = np.repeat(np.arange(csr.n_nodes), csr.degree())
+        keep = src < csr.indices
+        G = string_net.to_networkx(np.arange(csr.n_nodes), src[keep], csr.indices[keep], csr.score[keep])
+        part = community_louvain.best_partition(G, random_state=seed)
+        labels = np.full(csr.n_nodes, -1, dtype=np.int64)
+        labels[np.array(list(part), dtype=np.int64)] = list(part.values())
+        return labels
+    raise ValueError(f"未知的社区划分方法: {method}（可选：lpa / louvain）")
+
+
+def network_stats(n: int, src: np.ndarray, dst: np.ndarray, keyword_nodes: np.ndarray = None,
+                  seed: int = 42, method: str = COMMUNITY_METHOD) -> dict:
+    score = np.full(len(src), 1000, dtype=np.uint16)
+    csr = string_net.build_csr(n, src, dst, score)
+
+    labels = _partition(csr, method, seed)
+    q = float(community_metrics.community_metrics(csr, labels)["modularity"].sum())
+
+    cl = clustering.clustering(n, src, dst)
+
+    present = csr.degree() > 0
+    _, comp = connected_components(string_net.to_scipy(csr), directed=False)
+    lcc = int(np.bincount(comp[present]).max()) if present.any() else 0
+
+    out = {
+        "modularity": q,
+        "avg_clustering": float(cl.average),
+        "transitivity": float(cl.transitivity),
+        "lcc_size": lcc,
+    }
+    if keyword_nodes is not None and len(keyword_nodes) > 1:
+        inside = np.zeros(n, dtype=bool)
+        inside[keyword_nodes] = True
+        k = len(keyword_nodes)
+        out["keyword_density"] = float((inside[src] & inside[dst]).sum() / (k * (k - 1) / 2))
+    return out
+
+
+def _random_chunk(args):
+    n, src, dst, keyword_nodes, count, seed_seq, swaps_per_edge, method = args
+    rng = np.random.default_rng(seed_seq)
+    rows = []
+    for _ in range(count):
+        rs, rd = rewire(n, src, dst, rng, swaps_per_edge)
+        rows.append(network_stats(n, rs, rd, keyword_nodes, int(rng.integers(2 ** 31)), method))
+    return rows
+
+
+# -----------------------------
+# 3) 零模型集合与 z 分数
+# -----------------------------
+def null_ensemble(n: int, src: np.ndarray, dst: np.ndarray, keyword_nodes: np.ndarray = None,
+                  n_random: int = N_RANDOM, swaps_per_edge: float = SWAPS_PER_EDGE,
+                  seed: int = 42, n_jobs: int = None, method: str = COMMUNITY_METHOD) -> pd.DataFrame:
+    """每行一个随机网络的统计量"""
+    sizes = [RANDOM_CHUNK] * (n_random // RANDOM_CHUNK)
+    if n_random % RANDOM_CHUNK:
+        sizes.append(n_random % RANDOM_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(n, src, dst, keyword_nodes, c, ss, swaps_per_edge, method) for c, ss in zip(sizes, seeds)]
+
+    parts = string_net.parallel_map(_random_chunk, tasks, n_jobs)
+    return pd.DataFrame([row for part in parts for row in part])
+
+
+def significance(observed: dict, null: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for stat in STATS:
+        if stat not in observed or stat not in null:
+            continue
+        x = null[stat].to_numpy(np.float64)
+        mu, sd = x.mean(), x.std(ddof=1) if len(x) > 1 else 0.0
+        obs = observed[stat]
+        rows.append({
+            "statistic": stat,
+            "observed": obs,
+            "null_mean": mu,
+            "null_std": sd,
+            "z": (obs - mu) / sd if sd > 0 else np.nan,
+            # 经验 p 值（加一修正）：上侧 P(null >= obs)、下侧 P(null <= obs)
+            "p_upper": (1 + np.sum(x >= obs)) / (len(x) + 1),
+            "p_lower": (1 + np.sum(x <= obs)) / (len(x) + 1),
+        })
+    return pd.DataFrame(rows)
+
+
+def null_model_test(edges: string_net.EdgeTable, cutoff: int, keyword_pids=None,
+                    n_random: int = N_RANDOM, seed: int = 42, n_jobs: int = None,
+                    method: str = COMMUNITY_METHOD):
+    """返回 (显著性表, 零模型明细)"""
+    src, dst, _ = string_net.edges_at(edges, cutoff)
+    src, dst = src.astype(np.int64), dst.astype(np.int64)
+    kw = None
+    if keyword_pids is not None:
+        kw = string_net.node_index(edges.ids, keyword_pids)
+        kw = np.unique(kw[kw >= 0])
+    observed = network_stats(edges.n_nodes, src, dst, kw, seed, method)
+    null = null_ensemble(edges.n_nodes, src, dst, kw, n_random, seed=seed, n_jobs=n_jobs, method=method)
+    return significance(observed, null), null
+
+
+def main():
+    if not string_net.require_files(string_net.LINKS_GZ):
+        return
+
+    import time
+    import protein_meta
+
+    edges = string_net.load_edges()
+    keyword_pids = None
+    if os.path.exists(protein_meta.INFO_GZ):
+        meta = protein_meta.load_meta()
+        keyword_pids = meta.ids[meta.find(KEYWORD)]
+        print(f"[INFO] Keyword '{KEYWORD}': {len(keyword_pids)} proteins")
+
+    t0 = time.time()
+    table, null = null_model_test(edges, SCORE_CUTOFF, keyword_pids, N_RANDOM)
+    print(f"[INFO] {N_RANDOM} randomizations in {time.time() - t0:.1f}s")
+    print(table.to_string(index=False))
+
+    out_dir = os.path.join(string_net.ROOT_DIR, "outputs")
+    os.makedirs(out_dir, exist_ok=True)
+    table.to_csv(os.path.join(out_dir, f"null_model_significance_th{SCORE_CUTOFF}.csv"), index=False)
+    null.to_csv(os.path.join(out_dir, f"null_model_samples_th{SCORE_CUTOFF}.csv"), index=False)
+    print("\n[DONE]")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,82 @@
-import pandas as pd
-import networkx as nx
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
+
+import string_net
+import degree_dist
 
 # --- 1. 数据加载与预处理 ---
-# 读取 STRING 数据，注意：STRING 文件以空格分隔
-file_path = '10090.protein.links.v12.0.txt.gz'
-df = pd.read_csv(file_path, sep=' ')
+# 读取 STRING 数据（首次运行解析 gz 并缓存为 numpy 边表，之后 mmap 秒级加载）
+file_path = os.path.join(string_net.DATA_DIR, '10090.protein.links.v12.0.txt.gz')
 
 # 筛选高置信度相互作用 (Score > 700)，以保证网络具有生物学意义
-# STRING 的 score 扩大了 1000 倍，所以 700 代表 0.7
-df_filtered = df[df['combined_score'] > 700]
-
-# 构建无向图
-G = nx.from_pandas_edgelist(df_filtered, 'protein1', 'protein2')
-
-# --- 2. 计算度分布 ---
-degrees = [val for (node, val) in G.degree()]
-degree_counts = pd.Series(degrees).value_counts().sort_index()
-
-x = degree_counts.index.values # 度数 k
-y = degree_counts.values       # 频率 P(k)
-
-# --- 3. 视觉风格配置 ---
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'Roboto']
-bg_color = '#F8F9FA'
-main_blue = '#3498DB'
-dark_teal = '#2C3E50'
-
-fig, ax = plt.subplots(figsize=(8, 6), facecolor=bg_color)
-ax.set_facecolor(bg_color)
-
-# --- 4. 绘制 Log-Log 散点图 ---
-# 使用对数坐标
-ax.loglog(x, y, 'o', color=dark_teal, markersize=5, alpha=0.6, label='Observed Data')
-
-# --- 5. 拟合幂律分布 (Linear Regression on Log-Log scale) ---
-# 过滤掉 log(0) 的情况
-mask = (x > 0) & (y > 0)
-log_x = np.log10(x[mask])
-log_y = np.log10(y[mask])
-slope, intercept, r_value, p_value, std_err = stats.linregress(log_x, log_y)
-
-# 绘制拟合线
-ax.plot(x[mask], 10**intercept * x[mask]**slope, color=main_blue,
-        linestyle='--', linewidth=2, label=f'Power-law Fit ($\gamma$ = {abs(slope):.2f})')
-
-# --- 6. 遵循 UI 规范的格式化 ---
-# 标题：加粗，字号比标签大 2pt
-ax.set_title('Global Network Topology: Degree Distribution',
-             fontsize=16, fontweight='bold', pad=20)
-
-# 轴标签：数学符号斜体
-ax.set_xlabel('Degree ($k$)', fontsize=14)
-ax.set_ylabel('Frequency ($P(k)$)', fontsize=14)
-
-# 文本说明：P 值斜体
-stats_text = f'$R^2$ = {r_value**2:.3f}\n$P_{{value}}$ < 0.05'
-ax.text(0.05, 0.05, stats_text, transform=ax.transAxes,
-        fontsize=12, verticalalignment='bottom', bbox=dict(boxstyle='round', facecolor='white', alpha=0.5))
-
-# 布局优化：10% Padding
-plt.tight_layout(pad=3.0)
-
-# 移除冗余边框
-sns.despine()
-
-# 保存并展示
-plt.savefig('degree_distribution_loglog.png', dpi=300, facecolor=bg_color)
-plt.show()
\ No newline at end of file
+# STRING 的 score 扩大了 1000 倍，所以 700 代表 0.7（整数分数，> 700 即 >= 701）
+SCORE_CUTOFF = 701
+N_BOOT = 1000  # 拟合优度 bootstrap 的合成样本数（多进程并行）
+
+
+def main():
+    edges = string_net.load_edges(file_path)
+
+    # --- 2. 计算度分布 ---
+    # 度 = 边端点的 bincount（无需构建 networkx 图）
+    k = string_net.degrees_at(edges, SCORE_CUTOFF)
+    k = k[k > 0]
+    x, y = np.unique(k, return_counts=True)  # 度数 k 与频数 P(k)
+
+    # --- 3. 视觉风格配置 ---
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'Roboto']
+    bg_color = '#F8F9FA'
+    main_blue = '#3498DB'
+    dark_teal = '#2C3E50'
+
+    fig, ax = plt.subplots(figsize=(8, 6), facecolor=bg_color)
+    ax.set_facecolor(bg_color)
+
+    # --- 4. 绘制 Log-Log 散点图 ---
+    # 使用对数坐标
+    ax.loglog(x, y, 'o', color=dark_teal, markersize=5, alpha=0.6, label='Observed Data')
+
+    # --- 5. 拟合幂律分布（离散 MLE + KS 选 x_min，替代 log-log 最小二乘）---
+    fit = degree_dist.fit_power_law(k)
+    p_value, _ = degree_dist.bootstrap_pvalue(k, fit, n_boot=N_BOOT)
+
+    # 绘制拟合线：尾部期望频数 n_tail * P(k)
+    x_tail = x[x >= fit.xmin]
+    ax.plot(x_tail, fit.n_tail * degree_dist.pmf(x_tail, fit.alpha, fit.xmin), color=main_blue,
+            linestyle='--', linewidth=2, label=f'Power-law Fit ($\\gamma$ = {fit.alpha:.2f})')
+    ax.axvline(fit.xmin, color='grey', linestyle=':', linewidth=1, label=f'$k_{{min}}$ = {fit.xmin}')
+    ax.legend(frameon=False)
+
+    # --- 6. 遵循 UI 规范的格式化 ---
+    # 标题：加粗，字号比标签大 2pt
+    ax.set_title('Global Network Topology: Degree Distribution',
+                 fontsize=16, fontweight='bold', pad=20)
+
+    # 轴标签：数学符号斜体
+    ax.set_xlabel('Degree ($k$)', fontsize=14)
+    ax.set_ylabel('Frequency ($P(k)$)', fontsize=14)
+
+    # 文本说明：P 值斜体（bootstrap KS 检验，p > 0.1 时不拒绝幂律假设）
+    stats_text = (f'$\\gamma$ = {fit.alpha:.2f} $\\pm$ {fit.sigma:.2f}\n'
+                  f'$KS$ = {fit.ks:.3f} ($n_{{tail}}$ = {fit.n_tail})\n'
+                  f'$P_{{value}}$ = {p_value:.2f}')
+    ax.text(0.05, 0.05, stats_text, transform=ax.transAxes,
+            fontsize=12, verticalalignment='bottom', bbox=dict(boxstyle='round', facecolor='white', alpha=0.5))
+
+    # 布局优化：10% Padding
+    plt.tight_layout(pad=3.0)
+
+    # 移除冗余边框
+    sns.despine()
+
+    # 保存并展示
+    plt.savefig('degree_distribution_loglog.png', dpi=300, facecolor=bg_color)
+    plt.show()
+
+
+# bootstrap 使用进程池：Windows 下必须有 __main__ 保护
+if __name__ == "__main__":
+    main()
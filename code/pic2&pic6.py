@@ -1,8 +1,14 @@
+import sys
+
 import pandas as pd
-import networkx as nx
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+import string_net
+import protein_meta
+import clustering
+import centrality
+
 # ==========================================
 # 1. UI/UX 全局视觉规范配置
 # ==========================================
@@ -12,6 +18,15 @@ COLOR_HIGHLIGHT = "#F39C12"  # Orange/Gold
 COLOR_BG = "#FFFFFF"  # 纯白背景
 FONT_FAMILY = "Arial, Roboto, sans-serif"
 
+# 关键节点排名指标：degree / pagerank / eigenvector / betweenness（见 centrality.py）
+HUB_METRIC = "degree"
+HUB_METRIC_LABEL = {
+    "degree": "Degree Centrality",
+    "pagerank": "PageRank",
+    "eigenvector": "Eigenvector Centrality",
+    "betweenness": "Betweenness Centrality (sampled)",
+}
+
 
 def apply_layout_style(fig, title_text, x_title, y_title):
     """应用统一的图表布局样式"""
@@ -42,66 +57,38 @@ def apply_layout_style(fig, title_text, x_title, y_title):
 
 
 # ==========================================
-# 2. 数据读取与清洗 (指定绝对路径)
+# 2. 数据读取（string_net 稀疏边表缓存 + protein_meta 名称映射）
 # ==========================================
 print("--- 阶段 1: 数据加载 ---")
 
-# 定义文件路径 (使用 r"" 防止转义字符报错)
-path_info = r"C:\Users\lxr\Desktop\10090.protein.info.v12.0.txt.gz"
-path_links = r"C:\Users\lxr\Desktop\10090.protein.links.v12.0.txt.gz"
-
-try:
-    # A. 读取 ID 映射文件 (Info)
-    print(f"正在读取映射表: {path_info} ...")
-    df_info = pd.read_csv(
-        path_info,
-        sep='\t',
-        compression='gzip',
-        usecols=['#string_protein_id', 'preferred_name']
-    )
-    # 构建字典
-    id_to_name = dict(zip(df_info['#string_protein_id'], df_info['preferred_name']))
-
-    # B. 读取网络连边文件 (Links)
-    print(f"正在读取连边数据: {path_links} ...")
-    df_links = pd.read_csv(
-        path_links,
-        sep=' ',
-        compression='gzip'
-    )
-
-    # C. 数据融合与清洗
-    print("正在清洗与映射数据...")
-    # 过滤 (保留 score >= 400)
-    df_clean = df_links[df_links['combined_score'] >= 400].copy()
+if not string_net.require_files(string_net.LINKS_GZ, protein_meta.INFO_GZ):
+    sys.exit(1)
 
-    # 将 ID 替换为基因名
-    df_clean['node1'] = df_clean['protein1'].map(id_to_name).fillna(df_clean['protein1'])
-    df_clean['node2'] = df_clean['protein2'].map(id_to_name).fillna(df_clean['protein2'])
+# A. ID -> 基因名（mmap 元数据，dict 式 .get 接口）
+print(f"正在读取映射表: {protein_meta.INFO_GZ} ...")
+id_to_name = protein_meta.load_meta().view("symbol")
 
-    # 提取最终 DataFrame
-    df = df_clean[['node1', 'node2', 'combined_score']]
-    print(f" 数据准备完毕! 包含 {len(df)} 条连边")
-
-except FileNotFoundError as e:
-    print(f"\n 错误: 找不到文件。请检查路径是否正确：\n{e.filename}")
-    exit()
-except Exception as e:
-    print(f"\n 读取错误: {e}")
-    print("如果文件其实已经解压了(不是.gz)，请去掉代码里的 compression='gzip' 参数。")
-    exit()
+# B. 连边：全分数边表只解析一次，之后走缓存；各阈值直接在边表上切片
+print(f"正在读取连边数据: {string_net.LINKS_GZ} ...")
+edges = string_net.load_edges()
+print(f" 数据准备完毕! score >= 400 的连边 {string_net.n_edges_at(edges, 400)} 条")
 
 # ==========================================
 # 3. 分析方向 2: 关键节点识别 (Lollipop Chart)
 # ==========================================
 print("\n--- 阶段 2: 生成关键节点图 (Top 20 Hubs) ---")
 
-G = nx.from_pandas_edgelist(df, 'node1', 'node2')
-degree_dict = nx.degree_centrality(G)
+# 稀疏边表 + CSR 计算中心性（介数为枢轴抽样近似，避免数小时的精确计算）
+csr_400 = string_net.csr_at(edges, 400)
+# 本脚本为平铺脚本（无 __main__ 保护），介数在当前进程内计算，避免 Windows 下子进程重复执行脚本
+hub_kwargs = {"n_jobs": 1} if HUB_METRIC == "betweenness" else {}
+hub_idx, hub_score = centrality.top_hubs(csr_400, 20, HUB_METRIC, **hub_kwargs)
 
 # 获取 Top 20
-top20_df = pd.DataFrame(list(degree_dict.items()), columns=['Protein', 'Degree']) \
-    .sort_values('Degree', ascending=True).tail(20)
+top20_df = pd.DataFrame({
+    'Protein': [id_to_name.get(p, p) for p in edges.ids[hub_idx]],
+    'Degree': hub_score,
+}).sort_values('Degree', ascending=True).reset_index(drop=True)
 
 fig_hub = go.Figure()
 
@@ -122,7 +109,7 @@ fig_hub.add_trace(go.Scatter(
     x=top20_df['Degree'][:-3], y=top20_df['Protein'][:-3],
     mode='markers', name='Key Proteins',
     marker=dict(color=COLOR_MAIN_LIGHT, size=12),
-    hovertemplate="<b>%{y}</b><br>Degree: %{x:.4f}<extra></extra>"
+    hovertemplate="<b>%{y}</b><br>Score: %{x:.4f}<extra></extra>"
 ))
 
 # 核心 Top 3
@@ -130,17 +117,19 @@ fig_hub.add_trace(go.Scatter(
     x=top20_df['Degree'][-3:], y=top20_df['Protein'][-3:],
     mode='markers', name='Top 3 Hubs',
     marker=dict(color=COLOR_HIGHLIGHT, size=16, line=dict(color='black', width=1)),
-    hovertemplate="<b>%{y}</b><br>Degree: %{x:.4f}<br>Rank: Top 3<extra></extra>"
+    hovertemplate="<b>%{y}</b><br>Score: %{x:.4f}<br>Rank: Top 3<extra></extra>"
 ))
 
-apply_layout_style(fig_hub, "Top 20 Hub Proteins (Degree Centrality)", "Degree Centrality Score", "")
+metric_label = HUB_METRIC_LABEL[HUB_METRIC]
+apply_layout_style(fig_hub, f"Top 20 Hub Proteins ({metric_label})", f"{metric_label} Score", "")
 
 # 【修改点3】调整横坐标间距
-fig_hub.update_xaxes(
-    rangemode="tozero",
-    tickmode='linear',  # 强制使用线性刻度
-    dtick=0.02,  # 设置刻度间隔为 0.02 (根据数据范围调整)
-)
+fig_hub.update_xaxes(rangemode="tozero")
+if HUB_METRIC == "degree":
+    fig_hub.update_xaxes(
+        tickmode='linear',  # 强制使用线性刻度
+        dtick=0.02,  # 设置刻度间隔为 0.02 (根据数据范围调整)
+    )
 fig_hub.show()
 
 # ==========================================
@@ -155,11 +144,9 @@ edge_counts = []
 
 print("正在计算不同阈值下的网络拓扑...")
 for thresh in thresholds:
-    sub_df = df[df['combined_score'] >= thresh]
-    nodes = set(sub_df['node1']).union(set(sub_df['node2']))
-
-    node_counts.append(len(nodes))
-    edge_counts.append(len(sub_df))
+    # 边表按 score 降序：边数 = 前缀长度，节点数 = 度 > 0 的蛋白数
+    node_counts.append(int((string_net.degrees_at(edges, thresh) > 0).sum()))
+    edge_counts.append(string_net.n_edges_at(edges, thresh))
 
 # 绘图 - 双轴
 fig_sens = make_subplots(specs=[[{"secondary_y": True}]])
@@ -196,4 +183,32 @@ fig_sens.update_yaxes(title_text="Number of Edges", secondary_y=True, showgrid=F
 
 fig_sens.show()
 
+# ==========================================
+# 5. 分析方向 6 补充: 聚类系数阈值敏感性
+# ==========================================
+print("\n--- 阶段 4: 计算各阈值下的聚类系数 ---")
+
+# 稀疏矩阵三角形计数（按度定向），全网络每个阈值秒级完成
+clust_df = clustering.clustering_curve(edges, thresholds)
+
+fig_clust = go.Figure()
+fig_clust.add_trace(go.Scatter(
+    x=clust_df['cutoff'], y=clust_df['avg_clustering'],
+    name="Average Clustering (平均聚类系数)",
+    mode='lines+markers',
+    line=dict(color=COLOR_MAIN_LIGHT, width=3),
+    marker=dict(size=8)
+))
+fig_clust.add_trace(go.Scatter(
+    x=clust_df['cutoff'], y=clust_df['transitivity'],
+    name="Transitivity (全局传递性)",
+    mode='lines+markers',
+    line=dict(color=COLOR_MAIN_DARK, width=3, dash='dot'),
+    marker=dict(symbol='diamond', size=8, color=COLOR_MAIN_DARK)
+))
+
+apply_layout_style(fig_clust, "Clustering Coefficient Sensitivity", "Confidence Score Threshold", "Clustering Coefficient")
+fig_clust.update_yaxes(rangemode="tozero")
+fig_clust.show()
+
 print("\n 所有图表已生成完毕！")
\ No newline at end of file
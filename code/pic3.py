@@ -22,6 +22,14 @@ import pandas as pd
 import numpy as np
 import networkx as nx
 
+import backbone
+import centrality
+import community_metrics
+import graph_export
+import kcore
+import protein_meta
+import similarity
+
 # -----------------------------
 # 0) 路径与统一 UI 参数
 # -----------------------------
@@ -31,14 +39,21 @@ LINKS_GZ = os.path.join(DATA_DIR, "10090.protein.links.v12.0.txt.gz")
 INFO_GZ  = os.path.join(DATA_DIR, "10090.protein.info.v12.0.txt.gz")
 
 SCORE_CUTOFF = 900          # 分数阈值（可改为 400/700/900）
-MAX_NODES_TO_PLOT = 1000    # 绘图节点上限（建议 1500~3000）
-TOP_HUBS = 25               # 关键蛋白数量（按度最高 Top N）-> 橙色强调
+MAX_NODES_TO_PLOT = 1000    # 绘图节点上限（建议 1500~3000；启用骨架时可提高 3~5 倍）
+PLOT_SELECTION = "degree"   # 超出上限时的选点方式："kcore"（最稠密核）/ "degree"（度 Top N）
+TOP_HUBS = 25               # 关键蛋白数量（按 HUB_METRIC 最高 Top N）-> 橙色强调
+HUB_METRIC = "degree"       # hub 排名指标：degree / pagerank / eigenvector / betweenness
 TOP_LABELS = 25             # 显示标签（label）的节点数（只给少数点打字，避免糊）
+BACKBONE_METHOD = None      # 绘制的边集合：None（全部边）/ "topk"（每节点最强 k 条）/ "disparity"（视差滤波）
+BACKBONE_K = 3              # topk 骨架每个节点保留的边数
+BACKBONE_ALPHA = 0.05       # disparity 骨架的显著性水平
+SIMILAR_TOP = 0             # tooltip 中列出的最相似蛋白数（共享相互作用伙伴的余弦相似度；0 = 关闭，不构建 kNN 索引）
 RANDOM_SEED = 42
 
 OUT_HTML = os.path.join(os.path.dirname(__file__), "..", "figures", f"fig3_community_network_th{SCORE_CUTOFF}.html")
 OUT_CSV  = os.path.join(os.path.dirname(__file__), "..", "outputs", f"community_assignments_th{SCORE_CUTOFF}.csv")
 OUT_GEXF = os.path.join(os.path.dirname(__file__), "..", "outputs", f"fig3_network_th{SCORE_CUTOFF}.gexf")
+OUT_METRICS = os.path.join(os.path.dirname(__file__), "..", "outputs", f"community_metrics_th{SCORE_CUTOFF}.csv")
 
 # 创建输出目录
 os.makedirs(os.path.dirname(OUT_HTML), exist_ok=True)
@@ -77,39 +92,17 @@ PHYSICS_OPTIONS = {
 # 1) 读取 protein.info：构建 id -> (symbol / full name / description) 映射
 # -----------------------------
 def load_info(info_path: str):
-    info = pd.read_csv(info_path, sep="\t", compression="gzip")
-
-    # --- 列名鲁棒处理 ---
-    # STRING 常见列：protein_external_id, preferred_name, annotation（描述）
-    id_col = "protein_external_id" if "protein_external_id" in info.columns else info.columns[0]
-    symbol_col = "preferred_name" if "preferred_name" in info.columns else (info.columns[1] if len(info.columns) > 1 else id_col)
-
-    # annotation/description 列兜底识别
-    desc_candidates = [c for c in info.columns if ("annot" in c.lower() or "desc" in c.lower())]
-    desc_col = desc_candidates[0] if desc_candidates else None
-
-    # 构建映射：protein_id -> symbol
-    id2symbol = dict(zip(info[id_col].astype(str), info[symbol_col].astype(str)))
-
-    # 构建映射：protein_id -> 描述（annotation）
-    if desc_col is not None:
-        id2desc = dict(zip(info[id_col].astype(str), info[desc_col].astype(str)))
-    else:
-        id2desc = {}
-
-    # "全称"在 STRING info 中通常没有独立列，annotation 往往更像"名称+功能"的综合描述
-    # 这里做一个实用约定：
-    # - full_name：优先用 annotation（若有）；否则用 symbol
-    # - function_desc：annotation（若有），否则留空
-    id2full = {}
-    for pid in id2symbol:
-        ann = id2desc.get(pid, "")
-        if isinstance(ann, str) and ann.strip():
-            id2full[pid] = ann.strip()
-        else:
-            id2full[pid] = id2symbol.get(pid, pid)
+    """
+    返回三个只读映射（与原先的三个 dict 用法相同：.get(pid, default)）
+    数据来自 protein_meta 的 mmap 元数据存储：首次运行构建一次，之后只按需读取用到的记录
 
-    return id2symbol, id2full, id2desc
+    "全称"在 STRING info 中通常没有独立列，annotation 往往更像"名称+功能"的综合描述
+    这里做一个实用约定：
+    - full_name：优先用 annotation（若有）；否则用 symbol
+    - function_desc：annotation（若有），否则留空
+    """
+    meta = protein_meta.load_meta(info_path)
+    return meta.view("symbol"), meta.view("full"), meta.view("desc")
 
 
 # -----------------------------
@@ -137,7 +130,7 @@ def build_graph(links_path: str, score_cutoff: int) -> nx.Graph:
 # -----------------------------
 # 3) 选择用于绘图的子图（避免太大/太乱）
 # -----------------------------
-def choose_plot_subgraph(G: nx.Graph, max_nodes: int) -> nx.Graph:
+def choose_plot_subgraph(G: nx.Graph, max_nodes: int, selection: str = "degree") -> nx.Graph:
     if G.number_of_nodes() == 0:
         return G
 
@@ -148,7 +141,11 @@ def choose_plot_subgraph(G: nx.Graph, max_nodes: int) -> nx.Graph:
     if H.number_of_nodes() <= max_nodes:
         return H
 
-    # 若仍过大：按度排序，取度最高的 top_nodes 构建诱导子图（Induced Subgraph）
+    # 若仍过大（kcore）：取最稠密的若干层 k-core，节点数不超过 max_nodes（无孤立点）
+    if selection == "kcore":
+        return kcore.graph_densest_core(H, max_nodes)
+
+    # 若仍过大（degree）：按度排序，取度最高的 top_nodes 构建诱导子图（Induced Subgraph）
     deg = dict(H.degree())
     top_nodes = sorted(deg, key=deg.get, reverse=True)[:max_nodes]
     H2 = H.subgraph(top_nodes).copy()
@@ -195,14 +192,27 @@ def build_comm_colors(comm_ids):
 # 6) 用 Pyvis 生成互动网络图（统一 UI/UX + Tooltip 字段齐全）
 # -----------------------------
 def export_pyvis(H: nx.Graph, part: dict, id2symbol: dict, id2full: dict, id2desc: dict,
-                 out_html: str, out_csv: str, out_gexf: str):
+                 out_html: str, out_csv: str, out_gexf: str, core: dict = None,
+                 cutoff: int = SCORE_CUTOFF, similar: dict = None, render_edges: nx.Graph = None,
+                 title: str = None, group_label: str = "community", node_attrs: dict = None):
 
     from pyvis.network import Network
     import json
 
+    # group_label：part 取值的名称（CSV / GEXF 列名与 tooltip 标签），默认为 Louvain 社区
+    # node_attrs：额外的节点属性 {列名: {节点: 值}}，按顺序写入 CSV / GEXF 与 tooltip
+    node_attrs = node_attrs or {}
+
+    # render_edges：实际绘制的边（骨架）；度、hub、CSV、GEXF 仍基于完整的 H
+    if render_edges is None:
+        render_edges = H
+
     # 计算每个节点的度（Degree）：用于 tooltip 与 hub 识别
     deg = dict(H.degree())
-    top_hubs = set(sorted(deg, key=deg.get, reverse=True)[:TOP_HUBS])
+    # k-core 核数（默认在全网络上计算；未提供时退化为绘图子图上的核数）
+    if core is None:
+        core = kcore.graph_core_numbers(H)
+    top_hubs = set(centrality.graph_top_hubs(H, TOP_HUBS, HUB_METRIC))
     top_labels = set(sorted(deg, key=deg.get, reverse=True)[:TOP_LABELS])
 
     # 获取社区编号集合，并为每个社区分配颜色
@@ -213,19 +223,24 @@ def export_pyvis(H: nx.Graph, part: dict, id2symbol: dict, id2full: dict, id2des
     assign = pd.DataFrame({
         "protein_id": list(H.nodes()),
         "symbol": [id2symbol.get(n, n) for n in H.nodes()],
-        "community": [part.get(n, -1) for n in H.nodes()],
+        group_label: [part.get(n, -1) for n in H.nodes()],
         "degree": [deg.get(n, 0) for n in H.nodes()],
+        "core": [core.get(n, 0) for n in H.nodes()],
+        **{name: [vals.get(n, 0) for n in H.nodes()] for name, vals in node_attrs.items()},
         "annotation": [id2desc.get(n, "") for n in H.nodes()],
     })
     assign.to_csv(out_csv, index=False, encoding="utf-8-sig")
 
-    # 导出 GEXF（可导入 Cytoscape/Gephi 做论文级静态排版）
-    for n in H.nodes():
-        H.nodes[n]["symbol"] = id2symbol.get(n, n)
-        H.nodes[n]["community"] = int(part.get(n, -1))
-        H.nodes[n]["degree"] = int(deg.get(n, 0))
-        H.nodes[n]["annotation"] = id2desc.get(n, "")
-    nx.write_gexf(H, out_gexf)
+    # 导出 GEXF（可导入 Cytoscape/Gephi 做论文级静态排版；流式写出，不建 XML 树）
+    ids, src, dst, score, _ = graph_export.graph_arrays(H, attrs=())
+    graph_export.write_gexf(out_gexf, ids, src, dst, score, {
+        "symbol": assign["symbol"].astype(str).to_numpy(),
+        group_label: assign[group_label].to_numpy(np.int64),
+        "degree": assign["degree"].to_numpy(np.int64),
+        "core": assign["core"].to_numpy(np.int64),
+        **{name: assign[name].to_numpy() for name in node_attrs},
+        "annotation": assign["annotation"].astype(str).to_numpy(),
+    })
 
     # 创建 Pyvis 网络对象（浅色背景、统一字体）
     net = Network(
@@ -284,27 +299,36 @@ def export_pyvis(H: nx.Graph, part: dict, id2symbol: dict, id2full: dict, id2des
         # 只给少量节点显示 label，避免整体糊成一片
         label = symbol if n in top_labels else ""
 
+        # 邻域最相似的蛋白（提供 kNN 表时）
+        similar_line = f"<br><b>Similar</b>: {', '.join(similar[n])}" if similar and similar.get(n) else ""
+
+        extra_lines = "".join(f"<b>{name.capitalize()}</b>: {vals.get(n, 0)}<br>"
+                              for name, vals in node_attrs.items())
+
         # Tooltip：必须包含 Symbol、全称、功能描述、Degree（再附带社区编号）
-        title = (
+        node_title = (
             f"<div style='font-family:Arial;color:{TEXT_COLOR};line-height:1.35;'>"
             f"<b>Symbol</b>: {symbol}<br>"
             f"<b>Full name</b>: {full_name}<br>"
             f"<b>Function</b>: {desc if desc else full_name}<br>"
             f"<b>Degree</b>: {degree}<br>"
-            f"<b>Community</b>: {comm}"
+            f"<b>k-core</b>: {core.get(n, 0)}<br>"
+            f"{extra_lines}"
+            f"<b>{group_label.capitalize()}</b>: {comm}"
+            f"{similar_line}"
             f"</div>"
         )
 
         net.add_node(
             n,
             label=label,
-            title=title,
+            title=node_title,
             color=color,
             size=size
         )
 
     # 添加边：悬停显示 combined_score
-    for u, v, data in H.edges(data=True):
+    for u, v, data in render_edges.edges(data=True):
         score = data.get("score", None)
         etitle = (
             f"<div style='font-family:Arial;color:{TEXT_COLOR};'>"
@@ -314,10 +338,11 @@ def export_pyvis(H: nx.Graph, part: dict, id2symbol: dict, id2full: dict, id2des
         net.add_edge(u, v, title=etitle, value=data.get("weight", 0.5))
 
     # 设置页面标题区（标题加粗，比正文大 2pt；并说明高亮规则）
+    heading = title or f"Figure 3. Community Network (STRING 10090) | cutoff={cutoff}"
     net.heading = (
         f"<h2 style='font-family:Arial;color:{TEXT_COLOR};"
         f"font-weight:700;margin:20px 0 10px 0;'>"
-        f"Figure 3. Community Network (STRING 10090) | cutoff={SCORE_CUTOFF}"
+        f"{heading}"
         f"</h2>"
         f"<div style='font-family:Arial;color:{TEXT_COLOR};margin-bottom:12px;'>"
         f"<span style='font-weight:700;'>Highlight</span>: Top {TOP_HUBS} hubs in "
@@ -343,6 +368,10 @@ def export_pyvis(H: nx.Graph, part: dict, id2symbol: dict, id2full: dict, id2des
             )
             html = html.replace("</body>", "</div></body>", 1)
 
+        # 标题必须出现在页面中（防止被其他变量覆盖）
+        if heading not in html:
+            print(f"[WARN] 页面标题未写入 {out_html}: {heading}")
+
         with open(out_html, "w", encoding="utf-8") as f:
             f.write(html)
     except Exception:
@@ -369,8 +398,11 @@ def main():
     G = build_graph(LINKS_GZ, SCORE_CUTOFF)
     print(f"[INFO] Raw graph: nodes={G.number_of_nodes()}, edges={G.number_of_edges()}")
 
-    # 3) 选择用于绘图的子图（最大连通子图；若过大则取 top-degree 诱导子图）
-    H = choose_plot_subgraph(G, MAX_NODES_TO_PLOT)
+    # 全网络 k-core 核数（逐层批量剥离），随社区表一起导出
+    core = kcore.graph_core_numbers(G)
+
+    # 3) 选择用于绘图的子图（最大连通子图；若过大则取最稠密 k-core 或 top-degree 诱导子图）
+    H = choose_plot_subgraph(G, MAX_NODES_TO_PLOT, PLOT_SELECTION)
     print(f"[INFO] Plot graph: nodes={H.number_of_nodes()}, edges={H.number_of_edges()}")
 
     # 4) 社区检测（Louvain）
@@ -379,14 +411,33 @@ def main():
     n_comm = len(set(part.values()))
     print(f"[INFO] Communities found: {n_comm}")
 
+    # 社区质量：规模、内部/割边、密度、传导率、模块度贡献、平均分数、社区内 hub
+    metrics = community_metrics.graph_community_metrics(H, part, id2symbol, weight="score")
+    metrics.sort_values("modularity", ascending=False).to_csv(OUT_METRICS, index=False, encoding="utf-8-sig")
+    print(f"[INFO] Modularity Q = {metrics['modularity'].sum():.4f}")
+
+    # 邻域相似度 kNN（可选；首次构建后缓存为 mmap 表）：tooltip 列出最相似的蛋白
+    similar = None
+    if SIMILAR_TOP > 0:
+        knn = similarity.load_knn(LINKS_GZ, SCORE_CUTOFF, "cosine")
+        similar = {n: [id2symbol.get(p, p) for p, _ in knn.neighbors(n, SIMILAR_TOP)] for n in H.nodes()}
+
+    # 骨架（可选）：只绘制每个节点最强的伙伴边，浏览器端边数大幅减少（社区/度/导出文件仍用完整子图）
+    B = None
+    if BACKBONE_METHOD:
+        B = backbone.graph_backbone(H, BACKBONE_METHOD, BACKBONE_K, BACKBONE_ALPHA)
+        print(f"[INFO] Backbone ({BACKBONE_METHOD}): rendered edges {H.number_of_edges()} -> {B.number_of_edges()}")
+
     # 5) 导出：HTML 互动图 + CSV 社区表 + GEXF 网络文件
     print("[INFO] Exporting Pyvis HTML + CSV + GEXF ...")
-    export_pyvis(H, part, id2symbol, id2full, id2desc, OUT_HTML, OUT_CSV, OUT_GEXF)
+    export_pyvis(H, part, id2symbol, id2full, id2desc, OUT_HTML, OUT_CSV, OUT_GEXF, core, similar=similar,
+                 render_edges=B)
 
     print("\n[DONE]")
     print("HTML :", OUT_HTML)
     print("CSV  :", OUT_CSV)
     print("GEXF :", OUT_GEXF)
+    print("METRICS:", OUT_METRICS)
 
 
 if __name__ == "__main__":
@@ -26,6 +26,11 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.colors import qualitative
 
+import string_net
+import centrality
+import degree_profile
+import protein_meta
+
 # -----------------------------
 # 0) 路径与统一 UI 参数（注意：你要求的 Windows 路径）
 # -----------------------------
@@ -34,11 +39,9 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 DETAILED_GZ = os.path.join(DATA_DIR, "10090.protein.links.detailed.v12.0.txt.gz")
 INFO_GZ     = os.path.join(DATA_DIR, "10090.protein.info.v12.0.txt.gz")
 
-# 若你已经跑过方向三，会生成这个文件；脚本会优先用它来选 top hubs
-COMMUNITY_ASSIGN_CSV = os.path.join(DATA_DIR, "community_assignments_th700.csv")  # 如果 cutoff 改了，下面会自动替换
-
 SCORE_CUTOFF = 700          # 400/700/900 可调整（建议与你方向三一致）
 TOP_HUBS = 20               # "关键蛋白候选"数量（通常用于表格/强调）
+HUB_METRIC = "degree"       # 关键蛋白排名指标：degree / pagerank / eigenvector / betweenness
 RADAR_TOPN = 8              # 雷达图展示的关键蛋白数量（建议 5~10，太多会乱）
 
 # 输出
@@ -65,19 +68,9 @@ FONT_FAMILY = "Arial"
 # 1) 读取 protein.info：构建 id -> symbol/annotation
 # -----------------------------
 def load_info(info_path: str):
-    info = pd.read_csv(info_path, sep="\t", compression="gzip")
-
-    # STRING 常见列名：protein_external_id, preferred_name, annotation
-    id_col = "protein_external_id" if "protein_external_id" in info.columns else info.columns[0]
-    sym_col = "preferred_name" if "preferred_name" in info.columns else (info.columns[1] if len(info.columns) > 1 else id_col)
-
-    desc_candidates = [c for c in info.columns if ("annot" in c.lower() or "desc" in c.lower())]
-    desc_col = desc_candidates[0] if desc_candidates else None
-
-    id2symbol = dict(zip(info[id_col].astype(str), info[sym_col].astype(str)))
-    id2desc = dict(zip(info[id_col].astype(str), info[desc_col].astype(str))) if desc_col else {}
-
-    return id2symbol, id2desc
+    # mmap 元数据存储（protein_meta）：只读映射，按需读取单条记录
+    meta = protein_meta.load_meta(info_path)
+    return meta.view("symbol"), meta.view("desc")
 
 
 # -----------------------------
@@ -156,19 +149,26 @@ def summarize_evidence(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # -----------------------------
-# 4) 关键蛋白选择（优先用方向三输出；否则从边集计算度）
+# 4) 关键蛋白选择（度：查度-阈值剖面；其他指标：由边集建 CSR 计算）
 # -----------------------------
-def get_top_hubs(df_edges: pd.DataFrame, assign_csv_path: str, cutoff: int, topk: int) -> list:
+def get_top_hubs(df_edges: pd.DataFrame, cutoff: int, topk: int, metric: str = "degree") -> list:
     """
-    返回 protein_id 列表（按度从高到低）
+    返回 protein_id 列表（按 metric 从高到低）
     """
-    # 如果有方向三的 community_assignments 文件：直接用里面的 degree 排序
-    candidate_path = assign_csv_path.replace("th700", f"th{cutoff}")
-    if os.path.exists(candidate_path):
-        ass = pd.read_csv(candidate_path)
-        if "protein_id" in ass.columns and "degree" in ass.columns:
-            ass = ass.sort_values("degree", ascending=False)
-            return ass["protein_id"].astype(str).head(topk).tolist()
+    # 非度指标：由 df_edges 建 CSR 后计算（PageRank / 特征向量 / 抽样介数）
+    if metric != "degree":
+        codes, ids = pd.factorize(pd.concat([df_edges["protein1"], df_edges["protein2"]], ignore_index=True))
+        m = len(df_edges)
+        src, dst = codes[:m].astype(np.int32), codes[m:].astype(np.int32)
+        keep = src < dst   # links 文件双向各一行：保留一次
+        csr = string_net.build_csr(len(ids), src[keep], dst[keep],
+                                   df_edges["combined_score"].to_numpy(np.uint16)[keep])
+        order, _ = centrality.top_hubs(csr, topk, metric)
+        return ids[order].astype(str).tolist()
+
+    # 度：有 links 文件时查度-阈值剖面（全网络在 cutoff 下的度，首次构建后缓存，任意阈值即查）
+    if os.path.exists(string_net.LINKS_GZ):
+        return degree_profile.load_profile().top_hub_ids(cutoff, topk)
 
     # 否则：从 df_edges 统计度（无向图：端点出现次数）
     deg = pd.concat([df_edges["protein1"], df_edges["protein2"]]).value_counts()
@@ -360,8 +360,8 @@ def main():
     summary.to_csv(OUT_SUMMARY_CSV, index=False, encoding="utf-8-sig")
     print("[OK] 写出证据统计表：", OUT_SUMMARY_CSV)
 
-    # 4) 选 top hubs（优先用方向三输出；否则从 df 算）
-    hubs = get_top_hubs(df, COMMUNITY_ASSIGN_CSV, SCORE_CUTOFF, TOP_HUBS)
+    # 4) 选 top hubs（全网络在 SCORE_CUTOFF 下的排名，不依赖方向三的输出）
+    hubs = get_top_hubs(df, SCORE_CUTOFF, TOP_HUBS, HUB_METRIC)
     print(f"[INFO] Top hubs（前 {TOP_HUBS}）：", hubs[:10], "..." if len(hubs) > 10 else "")
 
     # 5) 计算关键蛋白证据画像（用于雷达图）
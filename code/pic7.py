@@ -5,34 +5,46 @@ from holoviews import opts
 import networkx as nx
 import numpy as np
 
-# --- 1. 初始化引擎 ---
-# 必须先执行这一步，否则无法生成交互图表
-hv.extension('bokeh')
-print("✅ 绘图引擎初始化成功。")
+import aliases
 
-# --- 2. 参数配置 ---
+# --- 1. 参数配置 ---
 KEYWORD = 'ribosomal'  # 搜索关键词
 TOP_N = 30  # 弦图节点数（建议20-40，太多会乱）
 SCORE_MIN = 400  # 相互作用置信度阈值
+GENES = []  # 自定义基因列表（symbol / UniProt / Ensembl ID 均可，如 ['Trp53', 'Mdm2']）；非空时代替 KEYWORD
 
-# --- 3. 加载并处理数据 ---
-print("正在读取本地数据...")
-
-# 更新数据路径
 data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-df_info = pd.read_csv(os.path.join(data_dir, '10090.protein.info.v12.0.txt.gz'), sep='\t')
-df_links = pd.read_csv(os.path.join(data_dir, '10090.protein.links.v12.0.txt.gz'), sep=' ')
+output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "figures")
+
+
+# --- 2. 初始化引擎 ---
+def init_engine():
+    # 必须先执行这一步，否则无法生成交互图表（常驻服务/批处理中只需执行一次）
+    hv.extension('bokeh')
+    print("✅ 绘图引擎初始化成功。")
+
+
+# --- 3. 筛选关键词蛋白与诱导子图连边 ---
+def select_keyword_proteins(df_info: pd.DataFrame, keyword: str, top_n: int) -> pd.DataFrame:
+    # 筛选包含关键词的蛋白 (注意您的文件列名是 'annotation')
+    matched = df_info[df_info['annotation'].str.contains(keyword, case=False, na=False)]
+    if len(matched) > top_n:
+        print(f"[WARN] '{keyword}' 匹配到 {len(matched)} 个蛋白，弦图只取前 {top_n} 个；"
+              f"全部蛋白的分组视图见 code/chord_groups.py")
+    return matched.head(top_n)
 
-# 获取 ID 列名（适配您的文件：#string_protein_id）
-id_col = df_info.columns[0]
 
-# 筛选包含关键词的蛋白 (注意您的文件列名是 'annotation')
-print(f"正在根据关键词 '{KEYWORD}' 筛选核心蛋白...")
-subset_info = df_info[df_info['annotation'].str.contains(KEYWORD, case=False, na=False)].head(TOP_N)
+def select_gene_proteins(df_info: pd.DataFrame, genes, top_n: int) -> pd.DataFrame:
+    # 经 aliases 索引解析为 protein_id，保持输入顺序
+    ids = aliases.load_aliases(os.path.join(data_dir, '10090.protein.aliases.v12.0.txt.gz')).resolve_ids(genes)
+    id_col = df_info.columns[0]
+    return df_info.set_index(id_col).reindex(ids).dropna(how='all').reset_index().head(top_n)
+
+
+def induced_links(df_links: pd.DataFrame, subset_info: pd.DataFrame, score_min: int) -> pd.DataFrame:
+    # 获取 ID 列名（适配您的文件：#string_protein_id）
+    id_col = subset_info.columns[0]
 
-if subset_info.empty:
-    print("❌ 未匹配到任何蛋白，请检查关键词或文件内容。")
-else:
     # 建立映射和 ID 集合
     id_map = dict(zip(subset_info[id_col], subset_info['preferred_name']))
     target_ids = set(subset_info[id_col])
@@ -41,18 +53,19 @@ else:
     sub_links = df_links[
         (df_links['protein1'].isin(target_ids)) &
         (df_links['protein2'].isin(target_ids)) &
-        (df_links['combined_score'] >= SCORE_MIN)
+        (df_links['combined_score'] >= score_min)
         ].copy()
 
     # ID 转为易读名称
     sub_links['source'] = sub_links['protein1'].map(id_map)
     sub_links['target'] = sub_links['protein2'].map(id_map)
+    return sub_links
 
-    # --- 4. 构建并美化弦图 ---
-    print("正在构建网络并渲染弦图...")
 
+# --- 4. 构建并美化弦图 ---
+def build_chord(sub_links: pd.DataFrame, node_names, keyword: str):
     # 定义节点数据集（确保所有筛选出的蛋白都在圆周上）
-    nodes = hv.Dataset(subset_info['preferred_name'].unique(), 'index')
+    nodes = hv.Dataset(pd.unique(pd.Series(node_names)), 'index')
     # 定义边数据集
     edges = sub_links[['source', 'target', 'combined_score']]
 
@@ -65,7 +78,7 @@ else:
         opts.Chord(
             width=800,
             height=800,
-            title=f"Interaction Subnetwork: {KEYWORD.capitalize()} Proteins",
+            title=f"Interaction Subnetwork: {keyword.capitalize()} Proteins",
 
             # 节点样式
             node_color='index',
@@ -86,11 +99,42 @@ else:
         # 这种方式设置背景色更稳健，如果还报错可删除此行
         opts.Chord(hooks=[lambda plot, element: plot.state.update(background_fill_color="#F8F9FA")])
     )
+    return chord
+
+
+def main():
+    init_engine()
+
+    # --- 加载并处理数据 ---
+    print("正在读取本地数据...")
+    df_info = pd.read_csv(os.path.join(data_dir, '10090.protein.info.v12.0.txt.gz'), sep='\t')
+    df_links = pd.read_csv(os.path.join(data_dir, '10090.protein.links.v12.0.txt.gz'), sep=' ')
+
+    if GENES:
+        label = "custom"
+        print(f"正在解析 {len(GENES)} 个基因名/外部 ID ...")
+        subset_info = select_gene_proteins(df_info, GENES, TOP_N)
+    else:
+        label = KEYWORD
+        print(f"正在根据关键词 '{KEYWORD}' 筛选核心蛋白...")
+        subset_info = select_keyword_proteins(df_info, KEYWORD, TOP_N)
+
+    if subset_info.empty:
+        print("❌ 未匹配到任何蛋白，请检查关键词或文件内容。")
+        return
+
+    sub_links = induced_links(df_links, subset_info, SCORE_MIN)
+
+    print("正在构建网络并渲染弦图...")
+    chord = build_chord(sub_links, subset_info['preferred_name'], label)
 
     # --- 5. 保存结果 ---
-    output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "figures")
     os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, f"subnetwork_chord_{KEYWORD}.html")
-    
+    output_file = os.path.join(output_dir, f"subnetwork_chord_{label}.html")
+
     hv.save(chord, output_file)
-    print(f"✨ 成功！请在文件夹中打开 [{output_file}] 查看效果。")
\ No newline at end of file
+    print(f"✨ 成功！请在文件夹中打开 [{output_file}] 查看效果。")
+
+
+if __name__ == "__main__":
+    main()
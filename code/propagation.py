@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+网络传播：带重启的随机游走（RWR），多组种子一次求解
+
+    P ← (1 - r) · W · P + r · P0
+
+- W   ：列归一化邻接（W[i, j] = A[i, j] / strength(j)），可按 combined_score 加权
+- P0  ：蛋白 × 查询 的种子矩阵，每列归一化为概率分布
+- 所有查询同时迭代（稀疏矩阵 × 稠密矩阵），按列块处理以限制内存；
+  收敛判据：每列 L1 变化均 < tol
+- 种子若是当前阈值下的孤立节点，其概率质量无法流出：视为立即重启（回到种子分布）
+
+典型用途：功能预测 / 疾病基因优先排序——把已知蛋白作种子，看网络上最"近"的其他蛋白。
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import string_net
+
+RESTART = 0.5
+TOL = 1e-8
+MAX_ITER = 200
+QUERY_BLOCK = 256      # 每块同时迭代的查询数（内存约 n_nodes × QUERY_BLOCK × 8 字节）
+TOP_K = 20
+
+
+# -----------------------------
+# 1) 种子矩阵与转移矩阵
+# -----------------------------
+def seed_matrix(ids: np.ndarray, seed_sets) -> sparse.csc_matrix:
+    """
+    seed_sets：每个查询一组 protein_id（list of list）
+    返回 n_nodes × n_queries 的 0/1 稀疏矩阵；不在网络中的 ID 忽略
+    """
+    rows, cols = [], []
+    for q, pids in enumerate(seed_sets):
+        idx = string_net.node_index(ids, list(pids))
+        idx = np.unique(idx[idx >= 0])
+        rows.append(idx)
+        cols.append(np.full(len(idx), q, dtype=np.int64))
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    return sparse.csc_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(ids), len(seed_sets)))
+
+
+def transition_matrix(csr: string_net.Csr, weight: str = "score") -> sparse.csr_matrix:
+    A = string_net.to_scipy(csr, weight)
+    strength = np.asarray(A.sum(axis=0)).ravel()
+    inv = np.divide(1.0, strength, out=np.zeros_like(strength), where=strength > 0)
+    return (A @ sparse.diags(inv)).tocsr()      # 列归一化
+
+
+# -----------------------------
+# 2) 批量 RWR
+# -----------------------------
+def rwr(csr: string_net.Csr, seeds, restart: float = RESTART, weight: str = "score",
+        tol: float = TOL, max_iter: int = MAX_ITER, block: int = QUERY_BLOCK,
+        W: sparse.csr_matrix = None) -> np.ndarray:
+    """
+    seeds：n_nodes × n_queries（稀疏或稠密，非负）；空列的结果为全 0
+    返回 n_nodes × n_queries 的稳态概率（每列和为 1）
+    W：可传入预先构建的转移矩阵（常驻服务/多次调用时复用）
+    """
+    if W is None:
+        W = transition_matrix(csr, weight)
+    seeds = sparse.csc_matrix(seeds, dtype=np.float64)
+    n, n_q = seeds.shape
+    out = np.zeros((n, n_q))
+
+    for s in range(0, n_q, block):
+        P0 = seeds[:, s:s + block].toarray()
+        total = P0.sum(axis=0)
+        nonempty = total > 0
+        P0[:, nonempty] /= total[nonempty]
+        P = P0.copy()
+        for it in range(max_iter):
+            WP = W @ P
+            leak = P0.sum(axis=0) - WP.sum(axis=0)          # 孤立种子处流失的质量
+            P_new = (1.0 - restart) * WP + (restart + (1.0 - restart) * leak) * P0
+            err = np.abs(P_new - P).sum(axis=0).max() if P.size else 0.0
+            P = P_new
+            if err < tol:
+                break
+        else:
+            print(f"[WARN] RWR 未在 {max_iter} 次迭代内收敛（err={err:.2e}）")
+        out[:, s:s + block] = P
+    return out
+
+
+# -----------------------------
+# 3) 每个查询的 Top-k
+# -----------------------------
+def top_k(scores: np.ndarray, k: int = TOP_K, exclude=None) -> tuple:
+    """
+    返回 (idx, val)，形状均为 n_queries × k，按分数降序
+    exclude：与 scores 同形状的种子矩阵（稀疏/稠密），非零位置不参与排名
+    """
+    S = scores.copy()
+    if exclude is not None:
+        ex = sparse.coo_matrix(exclude)
+        S[ex.row, ex.col] = -np.inf
+    k = min(k, S.shape[0])
+    part = np.argpartition(-S, k - 1, axis=0)[:k] if k else np.zeros((0, S.shape[1]), dtype=np.int64)
+    vals = np.take_along_axis(S, part, axis=0)
+    order = np.argsort(-vals, axis=0, kind="stable")
+    idx = np.take_along_axis(part, order, axis=0).T
+    val = np.take_along_axis(vals, order, axis=0).T
+    return idx, val
+
+
+def propagate(edges: string_net.EdgeTable, cutoff: int, seed_sets, k: int = TOP_K,
+              restart: float = RESTART, weight: str = "score", names=None,
+              include_seeds: bool = False) -> pd.DataFrame:
+    """
+    一次调用回答全部查询：返回长表 query, rank, protein_id, score（及可选 symbol）
+    names：查询名称列表（默认 0..Q-1）；include_seeds=False 时种子本身不进入排名
+    """
+    csr = string_net.csr_at(edges, cutoff)
+    seeds = seed_matrix(edges.ids, seed_sets)
+    scores = rwr(csr, seeds, restart=restart, weight=weight)
+    idx, val = top_k(scores, k, exclude=None if include_seeds else seeds)
+
+    n_q, kk = idx.shape
+    keep = np.isfinite(val) & (val > 0)
+    query = np.repeat(np.arange(n_q), kk)[keep.ravel()]
+    names = list(range(n_q)) if names is None else list(names)
+    return pd.DataFrame({
+        "query": [names[q] for q in query],
+        "rank": np.tile(np.arange(1, kk + 1), n_q)[keep.ravel()],
+        "protein_id": edges.ids[idx[keep]],
+        "score": val[keep],
+    })
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+蛋白元数据存储（替代 id2symbol / id2full / id2desc 三个完整 dict）
+
+一次性构建（解析 protein.info gz），之后以 mmap 打开：
+- ids.npy         ：按字典序排序的 protein_id（定长 str，二分查找）
+- symbol_code.npy ：int32，指向 symbols.npy 的类别编码（categorical）
+- symbols.npy     ：去重后的 symbol
+- size.npy        ：protein_size
+- ann_offset.npy  ：int64，长度 n+1；第 i 条注释 = arena[offset[i]:offset[i+1]]
+- ann_arena.npy   ：uint8，全部注释的 UTF-8 字节顺序拼接
+
+查询 N 个蛋白只读取这 N 条记录，不再为几百个 tooltip 解压整个 gz、复制长字符串。
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import string_net
+
+INFO_GZ = string_net.taxon_file("info")
+
+META_ARRAYS = ("ids", "symbol_code", "symbols", "size", "ann_offset", "ann_arena")
+
+
+# -----------------------------
+# 1) 一次性构建
+# -----------------------------
+def build_store(info_path: str, out_dir: str):
+    info = pd.read_csv(info_path, sep="\t", compression="gzip")
+
+    # --- 列名鲁棒处理（同 pic3/pic4 的 load_info）---
+    id_col = "protein_external_id" if "protein_external_id" in info.columns else info.columns[0]
+    symbol_col = "preferred_name" if "preferred_name" in info.columns else (info.columns[1] if len(info.columns) > 1 else id_col)
+    desc_candidates = [c for c in info.columns if ("annot" in c.lower() or "desc" in c.lower())]
+    desc_col = desc_candidates[0] if desc_candidates else None
+    size_col = "protein_size" if "protein_size" in info.columns else None
+
+    info = info.sort_values(id_col, kind="stable").reset_index(drop=True)
+    ids = info[id_col].astype(str).to_numpy(dtype=str)
+    codes, symbols = pd.factorize(info[symbol_col].astype(str))
+
+    ann = info[desc_col].fillna("").astype(str) if desc_col else pd.Series([""] * len(info))
+    blobs = [a.encode("utf-8") for a in ann]
+    offset = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offset[1:])
+    arena = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+
+    size = info[size_col].fillna(0).to_numpy(np.int32) if size_col else np.zeros(len(info), dtype=np.int32)
+
+    os.makedirs(out_dir, exist_ok=True)
+    arrays = {
+        "ids": ids,
+        "symbol_code": codes.astype(np.int32),
+        "symbols": np.asarray(symbols, dtype=str),
+        "size": size,
+        "ann_offset": offset,
+        "ann_arena": arena,
+    }
+    for k in META_ARRAYS:
+        np.save(os.path.join(out_dir, f"{k}.npy"), arrays[k])
+    string_net.write_stamp(info_path, out_dir)
+
+
+# -----------------------------
+# 2) 只读查询
+# -----------------------------
+class ProteinMeta:
+    """mmap 打开的元数据；所有查询按需读取单条记录"""
+
+    def __init__(self, out_dir: str):
+        for k in META_ARRAYS:
+            setattr(self, k, np.load(os.path.join(out_dir, f"{k}.npy"), mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def index(self, pids) -> np.ndarray:
+        """protein_id -> 行号；不存在记 -1"""
+        return string_net.node_index(self.ids, pids)
+
+    def find(self, keyword: str, case: bool = False) -> np.ndarray:
+        """注释包含关键词的行号（按 ID 顺序）；首次调用时解码全部注释并留在内存"""
+        if getattr(self, "_ann_all", None) is None:
+            # 偏移量是字节位置：按 UTF-8 字节切分后逐条解码
+            raw = self.ann_arena.tobytes()
+            off = self.ann_offset.tolist()
+            self._ann_all = pd.Series([raw[off[i]:off[i + 1]].decode("utf-8") for i in range(len(self))])
+        hit = self._ann_all.str.contains(keyword, case=case, regex=False, na=False)
+        return np.nonzero(hit.to_numpy())[0]
+
+    def _row(self, pid: str) -> int:
+        return int(self.index([pid])[0]) if len(self.ids) else -1
+
+    def symbol(self, pid: str, default=None):
+        i = self._row(pid)
+        return str(self.symbols[self.symbol_code[i]]) if i >= 0 else default
+
+    def annotation(self, pid: str, default=None):
+        i = self._row(pid)
+        if i < 0:
+            return default
+        return self.ann_arena[self.ann_offset[i]:self.ann_offset[i + 1]].tobytes().decode("utf-8")
+
+    def full_name(self, pid: str, default=None):
+        """STRING info 无独立"全称"列：优先 annotation，否则 symbol"""
+        i = self._row(pid)
+        if i < 0:
+            return default
+        ann = self.annotation(pid, "").strip()
+        return ann if ann else self.symbol(pid)
+
+    def symbols_of(self, pids) -> np.ndarray:
+        """批量取 symbol；缺失的保留原 ID"""
+        pids = np.asarray(pids, dtype=str)
+        idx = self.index(pids)
+        out = pids.astype(object)
+        hit = idx >= 0
+        out[hit] = self.symbols[self.symbol_code[idx[hit]]]
+        return out
+
+    def view(self, field: str) -> "MetaView":
+        return MetaView(self, field)
+
+
+class MetaView:
+    """只读 dict 接口（.get / [] / in），便于替换原有的 id2xxx 字典调用点"""
+
+    def __init__(self, meta: ProteinMeta, field: str):
+        self._get = {"symbol": meta.symbol, "full": meta.full_name, "desc": meta.annotation}[field]
+        self._meta = meta
+
+    def get(self, pid, default=None):
+        return self._get(str(pid), default)
+
+    def __getitem__(self, pid):
+        value = self._get(str(pid), None)
+        if value is None:
+            raise KeyError(pid)
+        return value
+
+    def __contains__(self, pid):
+        return self._meta._row(str(pid)) >= 0
+
+    def __len__(self):
+        return len(self._meta)
+
+
+def load_meta(info_path: str = INFO_GZ, cache_dir: str = string_net.CACHE_DIR) -> ProteinMeta:
+    out_dir = string_net.cache_dir_for(info_path, cache_dir)
+    if not string_net.cache_is_fresh(info_path, out_dir):
+        print(f"[INFO] Building protein metadata store from {info_path} ...")
+        build_store(info_path, out_dir)
+    return ProteinMeta(out_dir)
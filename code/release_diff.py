@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+STRING 版本间差异（外部排序 + 流式归并连接，内存占用固定）
+
+1) 外部排序：分块读取两个版本的 links.detailed，每行规范为 protein1 < protein2
+   （文件中每条无向边正反各出现一次，归并时去重），按 (p1, p2) 排序后写成一个有序 run（制表符分隔的 gz 文本）；
+   块大小由 MEMORY_MB 换算，整个过程内存只与块大小有关
+2) 归并：heapq.merge 把每个版本的全部 run 合成一条有序流；两条流再按 (p1, p2) 做归并连接，
+   每条边恰好访问一次：
+     added    ：只在新版本中
+     removed  ：只在旧版本中
+     rescored ：两版都有但 combined_score 不同
+   同时累加各证据通道的变化（变化边数、平均变化、平均绝对变化），
+   以及每个蛋白在 DEGREE_CUTOFF 下的新旧度（蛋白数远小于边数，字典常驻内存）
+3) 社区：新旧两份 community_assignments_th*.csv 的社区编号互不对应，
+   以蛋白所在社区的成员 Jaccard 衡量归属变化（1 - |A ∩ B| / |A ∪ B|）
+
+用法：
+    python code/release_diff.py OLD.links.detailed.txt.gz NEW.links.detailed.txt.gz \
+        --old-assign old/community_assignments_th700.csv --new-assign new/community_assignments_th700.csv
+"""
+
+import os
+import gzip
+import heapq
+import shutil
+import argparse
+import tempfile
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+import string_net
+
+CHANNELS = ("neighborhood", "fusion", "cooccurence", "coexpression",
+            "experimental", "database", "textmining")
+MEMORY_MB = 256           # 每个排序块的内存预算
+ROW_BYTES = 200           # 一行在 DataFrame 中的估计内存
+DEGREE_CUTOFF = 700
+TOP_PROTEINS = 50
+
+OUT_DIR = os.path.join(string_net.ROOT_DIR, "outputs", "release_diff")
+
+
+# -----------------------------
+# 1) 外部排序：links.detailed -> 有序 run
+# -----------------------------
+def sorted_runs(detailed_path: str, tmp_dir: str, memory_mb: int = MEMORY_MB) -> list:
+    """返回 run 文件路径列表；每行 p1 \\t p2 \\t 7 个通道 \\t combined_score，p1 < p2"""
+    chunk_rows = max(1, memory_mb * 1024 * 1024 // ROW_BYTES)
+    runs = []
+    reader = pd.read_csv(detailed_path, sep=" ", compression="gzip", chunksize=chunk_rows, dtype=str)
+    for i, df in enumerate(reader):
+        if df.shape[1] != 2 + len(CHANNELS) + 1:
+            raise ValueError(f"无法识别列名/列数：当前 df.shape={df.shape}，请检查文件是否为 STRING links.detailed。")
+        df.columns = ["protein1", "protein2", *CHANNELS, "combined_score"]
+        swap = df["protein1"] > df["protein2"]
+        df.loc[swap, ["protein1", "protein2"]] = df.loc[swap, ["protein2", "protein1"]].to_numpy()
+        df = df[df["protein1"] != df["protein2"]].sort_values(["protein1", "protein2"], kind="stable")
+        path = os.path.join(tmp_dir, f"run_{i:05d}.tsv.gz")
+        with gzip.open(path, "wt", compresslevel=1) as f:
+            df.to_csv(f, sep="\t", header=False, index=False)
+        runs.append(path)
+    return runs
+
+
+def _parse(line: str):
+    p = line.rstrip("\n").split("\t")
+    return (p[0], p[1]), np.array(p[2:], dtype=np.int32)
+
+
+def merged_stream(runs: list):
+    """按 (p1, p2) 升序逐行产出 (key, 通道+combined 数组)；同一版本内的重复边只保留第一条"""
+    files = [gzip.open(r, "rt") for r in runs]
+    try:
+        last = None
+        for key, vals in heapq.merge(*(map(_parse, f) for f in files), key=lambda t: t[0]):
+            if key != last:
+                yield key, vals
+                last = key
+    finally:
+        for f in files:
+            f.close()
+
+
+def merge_join(old_stream, new_stream):
+    """产出 (key, old_vals 或 None, new_vals 或 None)，两流均须按 key 升序"""
+    o, n = next(old_stream, None), next(new_stream, None)
+    while o is not None or n is not None:
+        if n is None or (o is not None and o[0] < n[0]):
+            yield o[0], o[1], None
+            o = next(old_stream, None)
+        elif o is None or n[0] < o[0]:
+            yield n[0], None, n[1]
+            n = next(new_stream, None)
+        else:
+            yield o[0], o[1], n[1]
+            o, n = next(old_stream, None), next(new_stream, None)
+
+
+# -----------------------------
+# 2) 边 / 通道 / 度的差异
+# -----------------------------
+def diff_edges(old_runs: list, new_runs: list, out_edges: str, degree_cutoff: int = DEGREE_CUTOFF):
+    """
+    流式写出变化边（tsv.gz：status, protein1, protein2, old_score, new_score），
+    返回 (计数 dict, 通道差异 DataFrame, 度差异 DataFrame)
+    """
+    counts = dict(added=0, removed=0, rescored=0, unchanged=0)
+    k = len(CHANNELS)
+    ch_changed = np.zeros(k, dtype=np.int64)
+    ch_sum = np.zeros(k, dtype=np.int64)
+    ch_abs = np.zeros(k, dtype=np.int64)
+    deg_old = defaultdict(int)
+    deg_new = defaultdict(int)
+
+    with gzip.open(out_edges, "wt") as out:
+        out.write("status\tprotein1\tprotein2\told_score\tnew_score\n")
+        for (p1, p2), old, new in merge_join(merged_stream(old_runs), merged_stream(new_runs)):
+            a = old if old is not None else np.zeros(k + 1, dtype=np.int32)
+            b = new if new is not None else np.zeros(k + 1, dtype=np.int32)
+            d = b[:k] - a[:k]
+            ch_changed += d != 0
+            ch_sum += d
+            ch_abs += np.abs(d)
+
+            if old is None:
+                status = "added"
+            elif new is None:
+                status = "removed"
+            elif a[k] != b[k]:
+                status = "rescored"
+            else:
+                status = "unchanged"
+            counts[status] += 1
+            if status != "unchanged":
+                out.write(f"{status}\t{p1}\t{p2}\t{a[k] if old is not None else ''}\t"
+                          f"{b[k] if new is not None else ''}\n")
+
+            if a[k] >= degree_cutoff:
+                deg_old[p1] += 1
+                deg_old[p2] += 1
+            if b[k] >= degree_cutoff:
+                deg_new[p1] += 1
+                deg_new[p2] += 1
+
+    total = max(sum(counts.values()), 1)
+    channels = pd.DataFrame({
+        "channel": CHANNELS,
+        "edges_changed": ch_changed,
+        "mean_delta": ch_sum / total,
+        "mean_abs_delta": ch_abs / total,
+    })
+    proteins = sorted(set(deg_old) | set(deg_new))
+    degree = pd.DataFrame({
+        "protein_id": proteins,
+        "degree_old": [deg_old.get(p, 0) for p in proteins],
+        "degree_new": [deg_new.get(p, 0) for p in proteins],
+    })
+    degree["degree_delta"] = degree["degree_new"] - degree["degree_old"]
+    return counts, channels, degree
+
+
+# -----------------------------
+# 3) 社区归属变化
+# -----------------------------
+def community_change(old_csv: str, new_csv: str) -> pd.DataFrame:
+    """每个蛋白：新旧社区编号、社区规模、成员 Jaccard 与 change = 1 - Jaccard（只在一版中出现记 1）"""
+    cols = ["protein_id", "community"]
+    old = pd.read_csv(old_csv, usecols=cols, encoding="utf-8-sig")
+    new = pd.read_csv(new_csv, usecols=cols, encoding="utf-8-sig")
+    df = old.merge(new, on="protein_id", how="outer", suffixes=("_old", "_new"))
+
+    both = df.dropna(subset=["community_old", "community_new"])
+    shared = both.groupby(["community_old", "community_new"]).size().rename("shared").reset_index()
+    df = df.merge(shared, on=["community_old", "community_new"], how="left")
+    df["size_old"] = df["community_old"].map(old["community"].value_counts())
+    df["size_new"] = df["community_new"].map(new["community"].value_counts())
+    df["shared"] = df["shared"].fillna(0)
+    union = df["size_old"].fillna(0) + df["size_new"].fillna(0) - df["shared"]
+    df["jaccard"] = np.where(union > 0, df["shared"] / union, 0.0)
+    df["community_change"] = 1.0 - df["jaccard"]
+    return df
+
+
+def top_changed(degree: pd.DataFrame, community: pd.DataFrame = None, topn: int = TOP_PROTEINS,
+                id2symbol=None) -> pd.DataFrame:
+    """
+    按 change = max(相对度变化, 社区归属变化) 排名；相对度变化 = |Δdegree| / max(新旧度, 1)
+    """
+    df = degree.copy()
+    if community is not None:
+        df = df.merge(community[["protein_id", "community_old", "community_new", "community_change"]],
+                      on="protein_id", how="outer")
+        df[["degree_old", "degree_new", "degree_delta"]] = df[["degree_old", "degree_new", "degree_delta"]].fillna(0)
+    df["degree_change"] = df["degree_delta"].abs() / np.maximum(df[["degree_old", "degree_new"]].max(axis=1), 1)
+    df["change"] = df[["degree_change", "community_change"]].max(axis=1) if community is not None else df["degree_change"]
+    df = df.sort_values(["change", "degree_delta"], ascending=False, kind="stable", key=lambda c: c.abs()).head(topn)
+    if id2symbol is not None:
+        df.insert(1, "symbol", [id2symbol.get(p, p) for p in df["protein_id"]])
+    return df.reset_index(drop=True)
+
+
+def release_diff(old_detailed: str, new_detailed: str, out_dir: str = OUT_DIR,
+                 old_assign: str = None, new_assign: str = None,
+                 memory_mb: int = MEMORY_MB, degree_cutoff: int = DEGREE_CUTOFF,
+                 topn: int = TOP_PROTEINS, id2symbol=None) -> dict:
+    """写出 changed_edges.tsv.gz / summary.csv / channel_deltas.csv / degree_changes.csv / top_changed_proteins.csv"""
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix="release_diff_", dir=out_dir)
+    try:
+        # 两个版本各用一半内存预算
+        for name in ("old", "new"):
+            os.makedirs(os.path.join(tmp, name))
+        old_runs = sorted_runs(old_detailed, os.path.join(tmp, "old"), memory_mb // 2)
+        new_runs = sorted_runs(new_detailed, os.path.join(tmp, "new"), memory_mb // 2)
+        print(f"[INFO] Sorted runs: old={len(old_runs)}, new={len(new_runs)}")
+        counts, channels, degree = diff_edges(old_runs, new_runs, os.path.join(out_dir, "changed_edges.tsv.gz"),
+                                              degree_cutoff)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    community = None
+    if old_assign and new_assign:
+        community = community_change(old_assign, new_assign)
+        community.to_csv(os.path.join(out_dir, "community_changes.csv"), index=False)
+
+    top = top_changed(degree, community, topn, id2symbol)
+    pd.DataFrame([counts]).to_csv(os.path.join(out_dir, "summary.csv"), index=False)
+    channels.to_csv(os.path.join(out_dir, "channel_deltas.csv"), index=False)
+    degree.to_csv(os.path.join(out_dir, f"degree_changes_th{degree_cutoff}.csv"), index=False)
+    top.to_csv(os.path.join(out_dir, "top_changed_proteins.csv"), index=False)
+    return dict(counts=counts, channels=channels, degree=degree, community=community, top=top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STRING 两个版本 links.detailed 的差异")
+    parser.add_argument("old_detailed")
+    parser.add_argument("new_detailed")
+    parser.add_argument("--old-assign", default=None, help="旧版本的 community_assignments_th*.csv")
+    parser.add_argument("--new-assign", default=None, help="新版本的 community_assignments_th*.csv")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB)
+    parser.add_argument("--cutoff", type=int, default=DEGREE_CUTOFF)
+    parser.add_argument("--top", type=int, default=TOP_PROTEINS)
+    args = parser.parse_args()
+
+    if not string_net.require_files(*(path for path in (args.old_detailed, args.new_detailed, args.old_assign, args.new_assign) if path)):
+        return
+
+    id2symbol = None
+    import protein_meta
+    if os.path.exists(protein_meta.INFO_GZ):
+        id2symbol = protein_meta.load_meta().view("symbol")
+
+    res = release_diff(args.old_detailed, args.new_detailed, args.out_dir, args.old_assign, args.new_assign,
+                       args.memory_mb, args.cutoff, args.top, id2symbol)
+
+    print("\n[DONE]")
+    print(res["counts"])
+    print(res["channels"].to_string(index=False))
+    print(res["top"].head(20).to_string(index=False))
+    print("Output:", args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
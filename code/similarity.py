@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+邻域相似度 Top-k 索引（共享相互作用伙伴，按 combined_score 加权）
+
+A 为加权邻接（w = combined_score / 1000），a_i 为第 i 行：
+- cosine      ：<a_i, a_j> / (|a_i|·|a_j|)
+- jaccard     ：加权 Jaccard（Tanimoto）<a_i, a_j> / (|a_i|² + |a_j|² - <a_i, a_j>)；无权时即普通 Jaccard
+- adamic_adar ：Σ_z w_iz·w_jz / log(deg(z))
+
+按行块计算 A[R] · M · Aᵀ（M 为 Adamic–Adar 的 1/log 度对角阵，其余为单位阵），
+每块只保留每行 Top-k 后立即丢弃其余部分；行块交给进程池。
+结果以 n × k 的 idx / val 两个 .npy 持久化（mmap 打开），不足 k 个的位置 idx = -1。
+"""
+
+import os
+
+import numpy as np
+from scipy import sparse
+
+import string_net
+
+METRICS = ("cosine", "jaccard", "adamic_adar")
+TOP_K = 20
+ROW_BLOCK = 256
+SCORE_CUTOFF = 400
+
+
+# -----------------------------
+# 1) 分块稀疏乘积 + 行内 Top-k
+# -----------------------------
+def _factors(csr: string_net.Csr, metric: str):
+    """返回 (左因子 A, 右因子 M·Aᵀ, 行范数平方)"""
+    if metric not in METRICS:
+        raise ValueError(f"未知的相似度: {metric}（可选：{', '.join(METRICS)}）")
+    A = string_net.to_scipy(csr, "score")
+    if metric == "adamic_adar":
+        deg = csr.degree().astype(np.float64)
+        inv_log = 1.0 / np.log(np.maximum(deg, 2.0))
+        right = (sparse.diags(inv_log) @ A.T).tocsr()
+    else:
+        right = A.T.tocsr()
+    sq = np.asarray(A.multiply(A).sum(axis=1)).ravel()
+    return A, right, sq
+
+
+def _block_topk(A, right, sq, metric: str, rows: np.ndarray, k: int):
+    P = (A[rows] @ right).tocoo()
+    r, c, v = P.row, P.col, P.data
+    g = rows[r]
+    keep = c != g                                     # 去掉自身
+    r, c, v, g = r[keep], c[keep], v[keep], g[keep]
+    if metric == "cosine":
+        v = v / np.sqrt(sq[g] * sq[c])
+    elif metric == "jaccard":
+        v = v / (sq[g] + sq[c] - v)
+
+    idx = np.full((len(rows), k), -1, dtype=np.int32)
+    val = np.zeros((len(rows), k), dtype=np.float32)
+    if len(v):
+        order = np.lexsort((c, -v, r))               # 行内按相似度降序，同分取编号小者
+        r, c, v = r[order], c[order], v[order]
+        starts = np.searchsorted(r, np.arange(len(rows)))
+        rank = np.arange(len(r)) - starts[r]
+        top = rank < k
+        idx[r[top], rank[top]] = c[top]
+        val[r[top], rank[top]] = v[top]
+    return idx, val
+
+
+def _setup_worker(indptr, indices, score, metric):
+    csr = string_net.Csr(indptr, indices, score)
+    return (*_factors(csr, metric), metric)
+
+
+def _row_block(args):
+    rows, k = args
+    A, right, sq, metric = string_net.worker_state()
+    return _block_topk(A, right, sq, metric, rows, k)
+
+
+def build_knn(csr: string_net.Csr, metric: str = "cosine", k: int = TOP_K,
+              block: int = ROW_BLOCK, n_jobs: int = None):
+    """返回 (idx, val)：n_nodes × k；孤立节点整行为 -1 / 0"""
+    n = csr.n_nodes
+    active = np.nonzero(csr.degree() > 0)[0]
+    blocks = [(active[i:i + block], k) for i in range(0, len(active), block)]
+
+    parts = string_net.parallel_map(_row_block, blocks, n_jobs, _setup_worker, (*csr, metric))
+
+    idx = np.full((n, k), -1, dtype=np.int32)
+    val = np.zeros((n, k), dtype=np.float32)
+    for (rows, _), (bi, bv) in zip(blocks, parts):
+        idx[rows], val[rows] = bi, bv
+    return idx, val
+
+
+# -----------------------------
+# 2) 持久化的 kNN 表
+# -----------------------------
+class KnnTable:
+    """mmap 打开的 kNN 表；ids 为边表的节点 ID（排序）"""
+
+    def __init__(self, out_dir: str, ids: np.ndarray):
+        self.ids = ids
+        self.idx = np.load(os.path.join(out_dir, "idx.npy"), mmap_mode="r")
+        self.val = np.load(os.path.join(out_dir, "val.npy"), mmap_mode="r")
+
+    @property
+    def k(self) -> int:
+        return self.idx.shape[1]
+
+    def neighbors(self, pid: str, k: int = None):
+        """返回 [(protein_id, 相似度), ...]，按相似度降序；未知 ID 返回空列表"""
+        i = int(string_net.node_index(self.ids, [pid])[0])
+        if i < 0:
+            return []
+        row, sim = self.idx[i, :k], self.val[i, :k]
+        hit = row >= 0
+        return list(zip(self.ids[row[hit]].tolist(), sim[hit].tolist()))
+
+    def neighbors_of(self, pids, k: int = None) -> dict:
+        """批量查询：{protein_id: [(protein_id, 相似度), ...]}"""
+        return {p: self.neighbors(p, k) for p in pids}
+
+
+def knn_dir(links_path: str, cutoff: int, metric: str, k: int,
+            cache_dir: str = string_net.CACHE_DIR) -> str:
+    return os.path.join(string_net.cache_dir_for(links_path, cache_dir), "knn", f"{metric}_th{cutoff}_k{k}")
+
+
+def load_knn(links_path: str = string_net.LINKS_GZ, cutoff: int = SCORE_CUTOFF, metric: str = "cosine",
+             k: int = TOP_K, cache_dir: str = string_net.CACHE_DIR, n_jobs: int = None,
+             edges: string_net.EdgeTable = None) -> KnnTable:
+    """首次调用（或 links 文件更新后）构建并缓存；之后直接 mmap 打开"""
+    if edges is None:
+        edges = string_net.load_edges(links_path, cache_dir)
+    out_dir = knn_dir(links_path, cutoff, metric, k, cache_dir)
+    if not string_net.cache_is_fresh(links_path, out_dir):
+        print(f"[INFO] Building {metric} kNN index (cutoff={cutoff}, k={k}) ...")
+        idx, val = build_knn(string_net.csr_at(edges, cutoff), metric, k, n_jobs=n_jobs)
+        os.makedirs(out_dir, exist_ok=True)
+        np.save(os.path.join(out_dir, "idx.npy"), idx)
+        np.save(os.path.join(out_dir, "val.npy"), val)
+        string_net.write_stamp(links_path, out_dir)
+    return KnnTable(out_dir, edges.ids)
+
+
+if __name__ == "__main__":
+    import time
+    for m in METRICS:
+        t0 = time.time()
+        load_knn(metric=m)
+        print(f"[INFO] {m:12s} {time.time() - t0:6.2f}s")
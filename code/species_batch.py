@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多物种批处理：对数据目录中的每个 STRING 物种（taxon）跑同一套网络统计，并汇总成一张跨物种对比表
+
+- 发现：扫描 <taxid>.protein.<kind>.v12.0.txt.gz，按 taxid 归组；有 links 文件的物种才处理，
+  links.detailed（证据通道）与 info（hub 的 symbol）可选
+- 并行：每个物种一个进程任务（大文件优先提交）；worker 启动时用 RLIMIT_AS 设内存上限
+  （MEMORY_CAP_GB，仅 Unix 生效），超限的物种记为失败而不拖垮整批；
+  max_tasks_per_child=1，每个物种结束后进程退出，内存归还系统
+- 每个物种（cutoff = CUTOFFS）：
+    topology.csv    ：节点 / 边数、平均度、最大连通分量、平均聚类系数、传递性、最大 k-core、幂律 α
+    evidence.csv    ：SUMMARY_CUTOFF 下各证据通道的非零比例与非零均值（需 links.detailed）
+    communities.csv ：SUMMARY_CUTOFF 下标签传播社区的指标（community_metrics），hub 附 symbol
+- 汇总：outputs/species/summary.csv，每个物种一行（SUMMARY_CUTOFF 下的拓扑 / 证据 / 社区统计、耗时、峰值内存、状态）
+- 各物种的边表 / 元数据缓存按文件名分目录（string_net.cache_dir_for），互不覆盖
+
+用法：python code/species_batch.py [--data-dir data] [--taxa 10090 9606] [--n-jobs 4] [--mem-gb 8]
+"""
+
+import os
+import re
+import errno
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from scipy.sparse.csgraph import connected_components
+
+import string_net
+
+SPECIES = {
+    "10090": "Mus musculus",
+    "9606": "Homo sapiens",
+    "10116": "Rattus norvegicus",
+    "7955": "Danio rerio",
+}
+FILE_RE = re.compile(r"^(\d+)\.protein\.([a-z.]+)\." + re.escape(string_net.STRING_VERSION) + r"\.txt\.gz$")
+
+CUTOFFS = [400, 700, 900]
+SUMMARY_CUTOFF = 700
+MEMORY_CAP_GB = 8           # 每个 worker 的地址空间上限；0 表示不限制
+TOP_HUB = 5                 # summary 中列出的最大社区 hub 个数
+
+OUT_DIR = os.path.join(string_net.ROOT_DIR, "outputs", "species")
+
+
+# -----------------------------
+# 1) 发现物种文件
+# -----------------------------
+def discover(data_dir: str = string_net.DATA_DIR) -> dict:
+    """-> {taxid: {kind: path}}，只保留有 links 文件的物种"""
+    found = {}
+    for name in sorted(os.listdir(data_dir)):
+        m = FILE_RE.match(name)
+        if m:
+            found.setdefault(m.group(1), {})[m.group(2)] = os.path.join(data_dir, name)
+    return {t: files for t, files in found.items() if "links" in files}
+
+
+# -----------------------------
+# 2) 单个物种的统计
+# -----------------------------
+def topology_stats(edges: string_net.EdgeTable, cutoff: int) -> dict:
+    import clustering
+    import degree_dist
+    import kcore
+
+    csr = string_net.csr_at(edges, cutoff)
+    deg = csr.degree()
+    present = deg > 0
+    _, comp = connected_components(string_net.to_scipy(csr), directed=False)
+    src, dst, _ = string_net.edges_at(edges, cutoff)
+    cl = clustering.clustering(edges.n_nodes, src, dst)
+    fit = degree_dist.fit_power_law(deg[present]) if present.sum() > 1 else None
+    return {
+        "cutoff": cutoff,
+        "nodes": int(present.sum()),
+        "edges": len(src),
+        "mean_degree": float(deg[present].mean()) if present.any() else 0.0,
+        "lcc_size": int(np.bincount(comp[present]).max()) if present.any() else 0,
+        "avg_clustering": float(cl.average),
+        "transitivity": float(cl.transitivity),
+        "max_core": int(kcore.core_numbers(csr).max()) if present.any() else 0,
+        "powerlaw_alpha": fit.alpha if fit else np.nan,
+        "powerlaw_xmin": fit.xmin if fit else np.nan,
+    }
+
+
+def evidence_stats(detailed_path: str, cutoff: int, cache_dir: str) -> pd.DataFrame:
+    import evidence_score
+    table = evidence_score.load_detailed(detailed_path, cache_dir)
+    keep = np.asarray(table.channel("combined_score")) >= cutoff
+    rows = []
+    for name in evidence_score.CHANNELS:
+        s = np.asarray(table.channel(name))[keep]
+        nz = s > 0
+        rows.append({
+            "channel": name,
+            "cutoff": cutoff,
+            "edges": int(keep.sum()),
+            "nonzero_frac": float(nz.mean()) if len(s) else 0.0,
+            "nonzero_mean": float(s[nz].mean()) if nz.any() else np.nan,
+        })
+    return pd.DataFrame(rows)
+
+
+def community_stats(edges: string_net.EdgeTable, cutoff: int, info_path: str, cache_dir: str) -> pd.DataFrame:
+    import community_metrics
+    import density_map
+
+    csr = string_net.csr_at(edges, cutoff)
+    labels = density_map.label_propagation(csr)
+    out = community_metrics.community_metrics(csr, labels)
+    out["hub"] = edges.ids[out["hub"].to_numpy()]
+    if info_path:
+        import protein_meta
+        out["hub_symbol"] = protein_meta.load_meta(info_path, cache_dir).symbols_of(out["hub"].to_numpy())
+    return out
+
+
+def _summary_row(topo: pd.DataFrame, evidence: pd.DataFrame, comm: pd.DataFrame, cutoff: int) -> dict:
+    row = topo[topo["cutoff"] == cutoff].iloc[0].drop("cutoff").to_dict()
+    row.update({
+        "n_communities": len(comm),
+        "n_communities_ge10": int((comm["size"] >= 10).sum()),
+        "modularity": float(comm["modularity"].sum()),
+        "largest_community": int(comm["size"].max()) if len(comm) else 0,
+        "largest_community_frac": float(comm["size"].max() / comm["size"].sum()) if len(comm) else 0.0,
+        "top_hubs": ", ".join(comm.sort_values("size", ascending=False)
+                              .get("hub_symbol", comm["hub"]).astype(str).iloc[:TOP_HUB]),
+    })
+    if evidence is not None:
+        for name, frac in zip(evidence["channel"], evidence["nonzero_frac"]):
+            row[f"evidence_{name}"] = frac
+    return row
+
+
+def process_taxon(taxon: str, files: dict, out_dir: str = OUT_DIR, cutoffs=CUTOFFS,
+                  summary_cutoff: int = SUMMARY_CUTOFF, cache_dir: str = string_net.CACHE_DIR) -> dict:
+    """单个物种：写出 out_dir/<taxon>/*.csv，返回 summary 的一行"""
+    t0 = time.time()
+    taxon_dir = os.path.join(out_dir, taxon)
+    os.makedirs(taxon_dir, exist_ok=True)
+
+    edges = string_net.load_edges(files["links"], cache_dir)
+    cutoffs = sorted(set(cutoffs) | {summary_cutoff})
+    topo = pd.DataFrame([topology_stats(edges, c) for c in cutoffs])
+    topo.to_csv(os.path.join(taxon_dir, "topology.csv"), index=False, encoding="utf-8-sig")
+
+    evidence = None
+    if "links.detailed" in files:
+        evidence = evidence_stats(files["links.detailed"], summary_cutoff, cache_dir)
+        evidence.to_csv(os.path.join(taxon_dir, "evidence.csv"), index=False, encoding="utf-8-sig")
+
+    comm = community_stats(edges, summary_cutoff, files.get("info"), cache_dir)
+    comm.to_csv(os.path.join(taxon_dir, "communities.csv"), index=False, encoding="utf-8-sig")
+
+    row = _summary_row(topo, evidence, comm, summary_cutoff)
+    row["seconds"] = round(time.time() - t0, 1)
+    row["peak_rss_mb"] = _peak_rss_mb()
+    return row
+
+
+# -----------------------------
+# 3) 进程池（每个 worker 设内存上限）
+# -----------------------------
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:          # Windows
+        return np.nan
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)   # Linux 下单位为 KB
+
+
+def _init_worker(mem_gb: float):
+    if not mem_gb:
+        return
+    try:
+        import resource
+    except ImportError:
+        print("[WARN] 当前平台不支持 RLIMIT_AS，内存上限未生效")
+        return
+    cap = int(mem_gb * 1024 ** 3)
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        cap = min(cap, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (cap, hard))
+
+
+def _run_task(task) -> dict:
+    taxon, files, out_dir, cutoffs, summary_cutoff, cache_dir = task
+    try:
+        row = process_taxon(taxon, files, out_dir, cutoffs, summary_cutoff, cache_dir)
+        row["status"] = "ok"
+    except (MemoryError, OSError) as e:
+        if isinstance(e, OSError) and e.errno != errno.ENOMEM:     # mmap 超限报 ENOMEM
+            row = {"status": f"{type(e).__name__}: {e}"}
+        else:
+            row = {"status": "MemoryError（超出 worker 内存上限）"}
+    except Exception as e:      # 单个物种失败不影响其他物种
+        row = {"status": f"{type(e).__name__}: {e}"}
+    return row
+
+
+def run_batch(species: dict, out_dir: str = OUT_DIR, cutoffs=CUTOFFS, summary_cutoff: int = SUMMARY_CUTOFF,
+              n_jobs: int = None, mem_gb: float = MEMORY_CAP_GB,
+              cache_dir: str = string_net.CACHE_DIR) -> pd.DataFrame:
+    """species = discover() 的结果；返回跨物种汇总表（同时写出 out_dir/summary.csv）"""
+    os.makedirs(out_dir, exist_ok=True)
+    # 大物种先提交，避免最后只剩一个长任务
+    order = sorted(species, key=lambda t: -os.path.getsize(species[t]["links"]))
+    tasks = {t: (t, species[t], out_dir, cutoffs, summary_cutoff, cache_dir) for t in order}
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    results = {}
+    if n_jobs == 1:
+        for t, task in tasks.items():
+            results[t] = _run_task(task)
+            print(f"[INFO] {t}: {results[t]['status']}")
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(mem_gb,),
+                                 max_tasks_per_child=1) as pool:
+            futures = {pool.submit(_run_task, task): t for t, task in tasks.items()}
+            for fut in as_completed(futures):
+                t = futures[fut]
+                try:
+                    results[t] = fut.result()
+                except Exception as e:      # worker 被系统杀掉（BrokenProcessPool）等
+                    results[t] = {"status": f"{type(e).__name__}: {e}"}
+                print(f"[INFO] {t}: {results[t]['status']}")
+
+    rows = [{"taxon": t, "species": SPECIES.get(t, ""), **results[t]} for t in order]
+    summary = pd.DataFrame(rows).convert_dtypes()          # 失败行为缺失值时整数列仍保持整数
+    summary = summary.sort_values("taxon", key=lambda s: s.astype(int)).reset_index(drop=True)
+    summary.to_csv(os.path.join(out_dir, "summary.csv"), index=False, encoding="utf-8-sig")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STRING 多物种批处理")
+    parser.add_argument("--data-dir", default=string_net.DATA_DIR)
+    parser.add_argument("--taxa", nargs="*", help="只处理这些 taxid（默认：目录中发现的全部）")
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--mem-gb", type=float, default=MEMORY_CAP_GB)
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"错误: 找不到目录 {args.data_dir}")
+        print("请确保已下载 STRING 数据文件到正确的数据目录中")
+        return
+    species = discover(args.data_dir)
+    if args.taxa:
+        missing = [t for t in args.taxa if t not in species]
+        if missing:
+            print(f"[WARN] 未找到这些物种的 links 文件：{', '.join(missing)}")
+        species = {t: f for t, f in species.items() if t in args.taxa}
+    if not species:
+        print(f"错误: {args.data_dir} 中没有 <taxid>.protein.links.{string_net.STRING_VERSION}.txt.gz")
+        print("请确保已下载 STRING 数据文件到正确的数据目录中")
+        return
+    for t, files in species.items():
+        print(f"[INFO] {t} ({SPECIES.get(t, 'unknown')}): {', '.join(sorted(files))}")
+
+    t0 = time.time()
+    summary = run_batch(species, args.out_dir, n_jobs=args.n_jobs, mem_gb=args.mem_gb)
+    ok = summary["status"] == "ok"
+    print(f"[INFO] {int(ok.sum())}/{len(summary)} species done in {time.time() - t0:.1f}s")
+    print(summary.to_string(index=False))
+
+    print("\n[DONE]")
+    print("Output :", args.out_dir)
+    print("Summary:", os.path.join(args.out_dir, "summary.csv"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+公共网络底座：STRING links -> 紧凑 numpy 边表（供各图脚本与分析模块复用）
+
+- 蛋白 ID 统一编码为整数下标（按 ID 字典序排序，跨脚本一致）
+- 无向边只保留一次（src < dst），去掉自环；combined_score 存为 uint16
+- 边表按 combined_score 降序排列：任意阈值 cutoff 的子网络 = 边表前缀（零拷贝切片）
+- 首次读取 gz 后写入 outputs/cache/，之后以 mmap 方式秒级加载
+"""
+
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# 0) 路径
+# -----------------------------
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "..")
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+CACHE_DIR = os.path.join(ROOT_DIR, "outputs", "cache")
+
+TAXON = "10090"                 # 小鼠
+STRING_VERSION = "v12.0"
+
+
+def taxon_file(kind: str, taxon: str = TAXON, data_dir: str = DATA_DIR) -> str:
+    """STRING 下载文件路径：<data_dir>/<taxon>.protein.<kind>.v12.0.txt.gz（kind 如 links / info / aliases）"""
+    return os.path.join(data_dir, f"{taxon}.protein.{kind}.{STRING_VERSION}.txt.gz")
+
+
+LINKS_GZ = taxon_file("links")
+
+EDGE_ARRAYS = ("ids", "src", "dst", "score")
+
+
+class EdgeTable(NamedTuple):
+    """整数编号的无向边表（按 score 降序）"""
+    ids: np.ndarray     # 蛋白 ID（str，排序后的全部节点）
+    src: np.ndarray     # int32，src < dst
+    dst: np.ndarray     # int32
+    score: np.ndarray   # uint16，combined_score（0-1000）
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.ids)
+
+
+# -----------------------------
+# 1) 读取 links gz -> EdgeTable
+# -----------------------------
+def read_links(links_path: str) -> EdgeTable:
+    df = pd.read_csv(
+        links_path,
+        sep=" ",
+        compression="gzip",
+        dtype={"combined_score": np.uint16},
+    )
+    # 标准列名一般为：protein1 protein2 combined_score
+    df.columns = ["protein1", "protein2", "combined_score"]
+
+    # 两列一起 factorize（sort=True -> 编号与 ID 字典序一致）
+    codes, ids = pd.factorize(
+        pd.concat([df["protein1"], df["protein2"]], ignore_index=True), sort=True
+    )
+    m = len(df)
+    a = codes[:m].astype(np.int32)
+    b = codes[m:].astype(np.int32)
+    score = df["combined_score"].to_numpy(np.uint16)
+
+    # 无向化：(min, max)，去自环，重复边保留最高分
+    src = np.minimum(a, b)
+    dst = np.maximum(a, b)
+    keep = src != dst
+    src, dst, score = src[keep], dst[keep], score[keep]
+
+    key = src.astype(np.int64) * len(ids) + dst
+    order = np.lexsort((-score.astype(np.int32), key))
+    key, src, dst, score = key[order], src[order], dst[order], score[order]
+    first = np.ones(len(key), dtype=bool)
+    first[1:] = key[1:] != key[:-1]
+    src, dst, score = src[first], dst[first], score[first]
+
+    # 按 score 降序（稳定排序，保证同分边顺序可复现）
+    order = np.argsort(-score.astype(np.int32), kind="stable")
+    return EdgeTable(
+        ids=np.asarray(ids, dtype=str),
+        src=src[order],
+        dst=dst[order],
+        score=score[order],
+    )
+
+
+# -----------------------------
+# 2) 带缓存的加载（npy + mmap）
+# -----------------------------
+def cache_dir_for(src_path: str, cache_dir: str = CACHE_DIR) -> str:
+    """每个源文件一个缓存子目录（以文件名去掉 .txt.gz 命名）"""
+    name = os.path.basename(src_path).replace(".txt.gz", "")
+    return os.path.join(cache_dir, name)
+
+
+def _source_stamp(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def cache_is_fresh(src_path: str, out_dir: str) -> bool:
+    """缓存目录中记录的源文件大小/修改时间与当前一致"""
+    stamp_path = os.path.join(out_dir, "source.json")
+    if not os.path.exists(stamp_path):
+        return False
+    with open(stamp_path, "r", encoding="utf-8") as f:
+        return json.load(f) == _source_stamp(src_path)
+
+
+def write_stamp(src_path: str, out_dir: str):
+    with open(os.path.join(out_dir, "source.json"), "w", encoding="utf-8") as f:
+        json.dump(_source_stamp(src_path), f)
+
+
+def load_edges(links_path: str = LINKS_GZ, cache_dir: str = CACHE_DIR,
+               mmap: bool = True) -> EdgeTable:
+    """
+    读取边表：缓存有效则直接 mmap，否则解析 gz 并写缓存。
+    源文件大小/修改时间变化会自动触发重建。
+    """
+    out_dir = cache_dir_for(links_path, cache_dir)
+    if cache_is_fresh(links_path, out_dir):
+        mode = "r" if mmap else None
+        return EdgeTable(*[
+            np.load(os.path.join(out_dir, f"{k}.npy"), mmap_mode=mode)
+            for k in EDGE_ARRAYS
+        ])
+
+    print(f"[INFO] Building edge cache from {links_path} ...")
+    edges = read_links(links_path)
+    os.makedirs(out_dir, exist_ok=True)
+    for k in EDGE_ARRAYS:
+        np.save(os.path.join(out_dir, f"{k}.npy"), getattr(edges, k))
+    write_stamp(links_path, out_dir)
+    return edges
+
+
+# -----------------------------
+# 3) 阈值切片与度
+# -----------------------------
+def n_edges_at(edges: EdgeTable, cutoff: int) -> int:
+    """score >= cutoff 的边数（边表按 score 降序，即前缀长度）"""
+    asc = edges.score[::-1]
+    return len(asc) - int(np.searchsorted(asc, int(cutoff), side="left"))
+
+
+def edges_at(edges: EdgeTable, cutoff: int):
+    """返回 score >= cutoff 的 (src, dst, score) 视图（不拷贝）"""
+    k = n_edges_at(edges, cutoff)
+    return edges.src[:k], edges.dst[:k], edges.score[:k]
+
+
+def degrees(n_nodes: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """端点 bincount 即无向度"""
+    return (np.bincount(src, minlength=n_nodes) + np.bincount(dst, minlength=n_nodes)).astype(np.int64)
+
+
+def degrees_at(edges: EdgeTable, cutoff: int) -> np.ndarray:
+    src, dst, _ = edges_at(edges, cutoff)
+    return degrees(edges.n_nodes, src, dst)
+
+
+# -----------------------------
+# 4) CSR 邻接（对称、行内邻居按编号升序）
+# -----------------------------
+class Csr(NamedTuple):
+    indptr: np.ndarray   # int64，长度 n+1
+    indices: np.ndarray  # int32，邻居编号
+    score: np.ndarray    # uint16，对应边的 combined_score
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+
+def build_csr(n_nodes: int, src: np.ndarray, dst: np.ndarray, score: np.ndarray) -> Csr:
+    rows = np.concatenate([src, dst])
+    cols = np.concatenate([dst, src])
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_nodes), out=indptr[1:])
+    return Csr(
+        indptr=indptr,
+        indices=cols[order].astype(np.int32),
+        score=np.concatenate([score, score])[order],
+    )
+
+
+def csr_at(edges: EdgeTable, cutoff: int) -> Csr:
+    src, dst, score = edges_at(edges, cutoff)
+    return build_csr(edges.n_nodes, src, dst, score)
+
+
+def to_scipy(csr: Csr, weight: str = None):
+    """
+    转为 scipy.sparse.csr_matrix
+    weight=None -> 0/1 邻接；weight="score" -> combined_score/1000
+    """
+    from scipy import sparse
+    if weight is None:
+        data = np.ones(len(csr.indices), dtype=np.float64)
+    else:
+        data = csr.score.astype(np.float64) / 1000.0
+    n = csr.n_nodes
+    return sparse.csr_matrix((data, csr.indices, csr.indptr), shape=(n, n))
+
+
+def expand(csr: Csr, frontier: np.ndarray):
+    """
+    一次展开一批节点的全部邻接：返回 (来源节点, 邻居, 在 csr.indices 中的位置)
+    BFS / 自我网络等按层遍历的基础操作
+    """
+    starts = csr.indptr[frontier]
+    cnt = csr.indptr[np.asarray(frontier) + 1] - starts
+    total = int(cnt.sum())
+    offs = np.cumsum(cnt) - cnt
+    pos = np.arange(total, dtype=np.int64) - np.repeat(offs, cnt) + np.repeat(starts, cnt)
+    return np.repeat(frontier, cnt), csr.indices[pos], pos
+
+
+def node_index(ids: np.ndarray, pids) -> np.ndarray:
+    """protein_id -> 节点下标（ids 为排序后的 ID 数组）；不存在记 -1"""
+    pids = np.asarray(pids, dtype=str)
+    if len(ids) == 0 or len(pids) == 0:
+        return np.full(len(pids), -1, dtype=np.int64)
+    pos = np.minimum(np.searchsorted(ids, pids), len(ids) - 1)
+    return np.where(ids[pos] == pids, pos, -1)
+
+
+def induced_edges(csr: Csr, nodes: np.ndarray, cutoff: int = 0):
+    """nodes 之间、score >= cutoff 的边 (src, dst, score)，每条边一次（src < dst）"""
+    inside = np.zeros(csr.n_nodes, dtype=bool)
+    inside[nodes] = True
+    v, w, pos = expand(csr, np.asarray(nodes))
+    keep = inside[w] & (v < w) & (csr.score[pos] >= cutoff)
+    return v[keep], w[keep], csr.score[pos[keep]]
+
+
+def to_networkx(ids: np.ndarray, src: np.ndarray, dst: np.ndarray, score: np.ndarray):
+    """边数组 -> networkx 图（边属性与 pic3.build_graph 一致：score / weight）"""
+    import networkx as nx
+    G = nx.Graph()
+    G.add_edges_from(
+        (str(ids[u]), str(ids[v]), {"score": int(s), "weight": float(s) / 1000.0})
+        for u, v, s in zip(src.tolist(), dst.tolist(), score.tolist())
+    )
+    return G
+
+
+def graph_to_csr(G):
+    """networkx 图 -> (节点列表, Csr)；边属性 score 缺失时记 0"""
+    nodes = list(G.nodes())
+    index = {n: i for i, n in enumerate(nodes)}
+    m = G.number_of_edges()
+    src = np.empty(m, dtype=np.int32)
+    dst = np.empty(m, dtype=np.int32)
+    score = np.empty(m, dtype=np.uint16)
+    for i, (u, v, s) in enumerate(G.edges(data="score", default=0)):
+        src[i], dst[i], score[i] = index[u], index[v], s
+    return nodes, build_csr(len(nodes), src, dst, score)
+
+
+# -----------------------------
+# 5) 各模块共用：数据文件检查、进程池
+# -----------------------------
+def require_files(*paths) -> bool:
+    """数据文件是否齐全；缺少时打印统一的提示并返回 False（供各 main() 提前退出）"""
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"错误: 找不到文件 {path}")
+            print("请确保已下载 STRING 数据文件到正确的数据目录中")
+            return False
+    return True
+
+
+_WORKER = None
+
+
+def _init_worker(setup, setup_args):
+    global _WORKER
+    _WORKER = setup(*setup_args) if setup is not None else None
+
+
+def worker_state():
+    """parallel_map(setup=...) 在当前进程中构建的共享状态（在 fn 内调用）"""
+    return _WORKER
+
+
+def parallel_map(fn, tasks, n_jobs: int = None, setup=None, setup_args=()) -> list:
+    """
+    [fn(t) for t in tasks]，结果顺序与 tasks 一致
+    - setup(*setup_args)：每个进程只执行一次，返回值经 worker_state() 取得（大数组不随任务重复序列化）
+    - n_jobs=1 时在当前进程内运行（同样先执行 setup）；否则交给进程池（默认 CPU 核数，不超过任务数）
+    - fn / setup 须为模块级函数（可 pickle）
+    """
+    global _WORKER
+    tasks = list(tasks)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    if n_jobs == 1:
+        prev = _WORKER
+        _init_worker(setup, setup_args)
+        try:
+            return [fn(t) for t in tasks]
+        finally:
+            _WORKER = prev
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=(setup, setup_args)) as pool:
+        return list(pool.map(fn, tasks))
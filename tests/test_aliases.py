@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import aliases
+import string_net
+from conftest import protein_ids
+
+N = 50
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    ids = protein_ids(N)
+    rows = []
+    for i, pid in enumerate(ids):
+        rows += [(pid, f"Gene{i}", "Ensembl_gene_name"), (pid, f"Gene{i}", "BioMart_HUGO"),
+                 (pid, f"Q{i:05d}", "UniProt_AC")]
+    # 歧义：Shared1 -> 蛋白 0（2 个来源）/ 蛋白 1（1 个来源）；Tie1 -> 蛋白 3、5（同为 1 个来源）
+    rows += [(ids[0], "Shared1", "A"), (ids[0], "Shared1", "B"), (ids[1], "Shared1", "A"),
+             (ids[5], "Tie1", "A"), (ids[3], "Tie1", "A")]
+    root = tmp_path_factory.mktemp("aliases")
+    path = str(root / "10090.protein.aliases.v12.0.txt.gz")
+    pd.DataFrame(rows, columns=["#string_protein_id", "alias", "source"]).to_csv(
+        path, sep="\t", index=False, compression="gzip")
+    return aliases.load_aliases(path, str(root / "cache")), ids
+
+
+def test_round_trip(index):
+    idx, ids = index
+    res = idx.resolve([f"Gene{i}" for i in range(N)])
+    assert (res["status"] == "unique").all()
+    assert list(res["protein_id"]) == list(ids)
+    # UniProt、protein_id 本身、去掉物种前缀的 ENSMUSP 都能回到同一个蛋白
+    for names in ([f"Q{i:05d}" for i in range(N)], list(ids), [p.split(".", 1)[1] for p in ids]):
+        np.testing.assert_array_equal(idx.resolve_ids(names), ids)
+
+
+def test_normalization_and_unmatched(index):
+    idx, ids = index
+    res = idx.resolve(["  gene7 ", "GENE7", "NoSuchGene"])
+    assert list(res["protein_id"][:2]) == [ids[7], ids[7]]
+    assert res["status"].tolist() == ["unique", "unique", "unmatched"]
+    assert pd.isna(res["protein_id"][2])
+    assert idx.lookup(["nosuchgene"])[0] == -1
+
+
+def test_ambiguous_modes(index):
+    idx, ids = index
+    best = idx.resolve(["Shared1", "Tie1"], "best")
+    assert list(best["protein_id"]) == [ids[0], ids[3]]
+    assert list(best["n_candidates"]) == [2, 2]
+    assert (best["status"] == "ambiguous").all()
+
+    every = idx.resolve(["Shared1", "Gene9"], "all")
+    assert list(every["query"]) == ["Shared1", "Shared1", "Gene9"]
+    assert list(every["protein_id"]) == [ids[0], ids[1], ids[9]]
+
+    drop = idx.resolve(["Shared1", "Gene9"], "drop")
+    assert pd.isna(drop["protein_id"][0]) and drop["protein_id"][1] == ids[9]
+
+    with pytest.raises(ValueError):
+        idx.resolve(["Gene1"], "first")
+
+
+def test_resolve_nodes(index):
+    idx, ids = index
+    table_ids = np.asarray(ids[::2])
+    nodes = idx.resolve_nodes(["Gene0", "Gene1", "Gene4"], table_ids)
+    np.testing.assert_array_equal(nodes, string_net.node_index(table_ids, [ids[0], ids[4]]))
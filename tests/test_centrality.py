@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import centrality
+import string_net
+from conftest import nx_graph_at
+
+
+def _as_array(values: dict, nodes: np.ndarray) -> np.ndarray:
+    return np.array([values[v] for v in nodes])
+
+
+@pytest.mark.parametrize("cutoff", [150, 600])
+def test_exact_betweenness(edges, cutoff):
+    """枢轴数 = 非孤立节点数时，抽样估计即精确介数（标准误为 0）"""
+    csr = string_net.csr_at(edges, cutoff)
+    G = nx_graph_at(edges, cutoff)
+    nodes = np.array(list(G.nodes()))
+    res = centrality.approx_betweenness(csr, n_pivots=len(nodes), n_jobs=1)
+
+    assert res.pivots == len(nodes)
+    np.testing.assert_allclose(res.value[nodes], _as_array(nx.betweenness_centrality(G), nodes), atol=1e-12)
+    np.testing.assert_allclose(res.stderr, 0.0, atol=1e-12)
+
+
+def test_betweenness_parallel_matches_serial(edges):
+    csr = string_net.csr_at(edges, 400)
+    a = centrality.approx_betweenness(csr, n_pivots=64, n_jobs=1)
+    b = centrality.approx_betweenness(csr, n_pivots=64, n_jobs=2)
+    np.testing.assert_allclose(a.value, b.value)
+
+
+@pytest.mark.parametrize("weight, nx_weight", [(None, None), ("score", "weight")])
+def test_pagerank(edges, weight, nx_weight):
+    csr = string_net.csr_at(edges, 400)
+    G = nx_graph_at(edges, 400)
+    nodes = np.array(list(G.nodes()))
+    pr = centrality.pagerank(csr, weight=weight, tol=1e-10, max_iter=500)
+    expected = nx.pagerank(G, alpha=centrality.PAGERANK_ALPHA, weight=nx_weight, tol=1e-12, max_iter=500)
+
+    np.testing.assert_allclose(pr[nodes], _as_array(expected, nodes), atol=1e-8)
+    assert pr.sum() == pytest.approx(1.0)
+
+
+def test_eigenvector(edges):
+    csr = string_net.csr_at(edges, 0)
+    G = nx_graph_at(edges, 0)
+    nodes = np.array(list(G.nodes()))
+    ev = centrality.eigenvector_centrality(csr)
+    np.testing.assert_allclose(ev[nodes], _as_array(nx.eigenvector_centrality_numpy(G), nodes), atol=1e-8)
+
+
+def test_degree_centrality(edges):
+    csr = string_net.csr_at(edges, 700)
+    G = nx_graph_at(edges, 700)
+    nodes = np.array(list(G.nodes()))
+    np.testing.assert_allclose(centrality.degree_centrality(csr)[nodes],
+                               _as_array(nx.degree_centrality(G), nodes))
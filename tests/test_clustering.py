@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import clustering
+from conftest import nx_graph_at
+
+
+@pytest.mark.parametrize("cutoff", [150, 500, 800])
+def test_clustering_matches_networkx(edges, cutoff):
+    res = clustering.clustering_at(edges, cutoff)
+    G = nx_graph_at(edges, cutoff)
+    nodes = np.array(list(G.nodes()))
+
+    expected = nx.clustering(G)
+    np.testing.assert_allclose(res.local[nodes], [expected[v] for v in nodes])
+    tri = nx.triangles(G)
+    np.testing.assert_array_equal(res.triangles[nodes], [tri[v] for v in nodes])
+    assert res.transitivity == pytest.approx(nx.transitivity(G))
+    assert res.average == pytest.approx(nx.average_clustering(G))
+    # 不在该阈值网络中的节点：度 0、系数 0
+    absent = np.setdiff1d(np.arange(edges.n_nodes), nodes)
+    assert not res.local[absent].any() and not res.degree[absent].any()
+
+
+def test_clustering_curve_rows(edges):
+    curve = clustering.clustering_curve(edges, [400, 700])
+    for _, row in curve.iterrows():
+        G = nx_graph_at(edges, int(row["cutoff"]))
+        assert (row["nodes"], row["edges"]) == (G.number_of_nodes(), G.number_of_edges())
+        assert row["triangles"] == sum(nx.triangles(G).values()) // 3
+        assert row["transitivity"] == pytest.approx(nx.transitivity(G))
+        assert row["avg_clustering"] == pytest.approx(nx.average_clustering(G))
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import community_metrics
+import string_net
+from conftest import nx_graph_at
+
+CUTOFF = 400
+
+
+@pytest.fixture(scope="module")
+def partition(edges):
+    G = nx_graph_at(edges, CUTOFF)
+    comms = nx.community.louvain_communities(G, seed=1)
+    labels = np.full(edges.n_nodes, -1, dtype=np.int64)
+    for c, members in enumerate(comms):
+        labels[list(members)] = c
+    return G, comms, labels
+
+
+@pytest.mark.parametrize("weight, nx_weight", [(None, None), ("score", "weight")])
+def test_modularity_sum(edges, partition, weight, nx_weight):
+    G, comms, labels = partition
+    out = community_metrics.metrics_at(edges, CUTOFF, labels, weight)
+    assert out["modularity"].sum() == pytest.approx(nx.community.modularity(G, comms, weight=nx_weight))
+
+
+def test_per_community_columns(edges, partition):
+    G, comms, labels = partition
+    out = community_metrics.metrics_at(edges, CUTOFF, labels).set_index("community")
+    for c, members in enumerate(comms):
+        row = out.loc[c]
+        S = G.subgraph(members)
+        assert row["size"] == len(members)
+        assert row["internal_edges"] == S.number_of_edges()
+        assert row["cut_edges"] == nx.cut_size(G, members)
+        assert row["density"] == pytest.approx(nx.density(S))
+        assert row["conductance"] == pytest.approx(nx.conductance(G, members))
+        assert row["mean_score"] == pytest.approx(np.mean([d["score"] for *_, d in S.edges(data=True)]))
+        in_deg = dict(S.degree())
+        assert row["hub_internal_degree"] == max(in_deg.values())
+        assert row["hub"] == min(v for v, d in in_deg.items() if d == row["hub_internal_degree"])
+
+
+def test_unassigned_nodes(edges, partition):
+    """标签 -1 的节点不产生行，它们与社区之间的边计入 cut_edges"""
+    G, comms, labels = partition
+    labels = labels.copy()
+    dropped = sorted(comms[0])[:5]
+    labels[dropped] = -1
+    out = community_metrics.metrics_at(edges, CUTOFF, labels).set_index("community")
+    members = set(comms[0]) - set(dropped)
+    assert out.loc[0, "size"] == len(members)
+    assert out.loc[0, "cut_edges"] == nx.cut_size(G, members)
+
+
+def test_graph_interface(edges, partition):
+    G, comms, _ = partition
+    H = string_net.to_networkx(edges.ids, *string_net.edges_at(edges, CUTOFF))
+    part = {str(edges.ids[v]): c for c, members in enumerate(comms) for v in members}
+    out = community_metrics.graph_community_metrics(H, part)
+    assert out["modularity"].sum() == pytest.approx(
+        nx.community.modularity(H, [{str(edges.ids[v]) for v in m} for m in comms], weight=None))
+    assert set(out["hub"]) <= set(H.nodes())
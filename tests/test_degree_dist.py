@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from scipy.special import zeta
+
+import degree_dist
+
+
+def sample_power_law(rng, size: int, alpha: float, xmin: int, span: int = 200000) -> np.ndarray:
+    """离散幂律 P(X = x) ∝ x^-α（x >= xmin），精确 CCDF 逆变换抽样"""
+    x = np.arange(xmin, xmin + span)
+    ccdf = zeta(alpha, x.astype(np.float64)) / zeta(alpha, xmin)
+    u = rng.random(size)
+    return x[np.minimum(np.searchsorted(-ccdf, -u, side="right") - 1, span - 1)]
+
+
+def test_fit_recovers_known_exponent():
+    rng = np.random.default_rng(0)
+    alpha, xmin = 2.5, 6
+    tail = sample_power_law(rng, 5000, alpha, xmin)
+    body = rng.integers(1, xmin, 3000)             # x_min 以下的非幂律部分
+    fit = degree_dist.fit_power_law(np.concatenate([body, tail]))
+
+    assert abs(fit.alpha - alpha) < 3 * fit.sigma + 0.02
+    assert 4 <= fit.xmin <= 10
+    assert fit.n == 8000
+    assert fit.n_tail == int((np.concatenate([body, tail]) >= fit.xmin).sum())
+
+
+def test_fit_ignores_zero_degrees():
+    rng = np.random.default_rng(1)
+    k = sample_power_law(rng, 2000, 2.2, 1)
+    a = degree_dist.fit_power_law(k)
+    b = degree_dist.fit_power_law(np.concatenate([k, np.zeros(500, dtype=np.int64)]))
+    assert a == b
+
+
+def test_pmf_sums_to_one():
+    x = np.arange(3, 500000)
+    assert abs(degree_dist.pmf(x, 2.5, 3).sum() - 1.0) < 1e-3
+    assert degree_dist.pmf(np.array([1, 2]), 2.5, 3).sum() == 0
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import centrality
+import degree_profile
+import string_net
+
+
+@pytest.fixture(scope="module")
+def profile(links_path, cache_dir):
+    return degree_profile.load_profile(links_path, cache_dir)
+
+
+def test_degree_at_matches_filtered_edges(edges, profile):
+    score = np.asarray(edges.score)
+    for cutoff in [0, 1, 150, 151, 333, 500, 777, 999, 1000]:
+        keep = score >= cutoff
+        expected = string_net.degrees(edges.n_nodes, np.asarray(edges.src)[keep], np.asarray(edges.dst)[keep])
+        np.testing.assert_array_equal(profile.degree_at(cutoff), expected)
+
+
+def test_degree_at_subset(edges, profile):
+    nodes = np.array([5, 0, 299, 17])
+    np.testing.assert_array_equal(profile.degree_at(600, nodes), string_net.degrees_at(edges, 600)[nodes])
+
+
+@pytest.mark.parametrize("block", [1, 7, 4096])
+def test_block_size_does_not_matter(edges, profile, block):
+    csr = string_net.build_csr(edges.n_nodes, edges.src, edges.dst, edges.score)
+    for got, want in zip(degree_profile.build_profile(csr, block),
+                         (profile.offset, profile.step_score, profile.step_degree)):
+        np.testing.assert_array_equal(got, want)
+
+
+def test_top_hubs_match_centrality(edges, profile):
+    for cutoff in [400, 700, 900]:
+        order, deg = profile.top_hubs(cutoff, 15)
+        expected, _ = centrality.top_hubs(string_net.csr_at(edges, cutoff), 15, "degree")
+        np.testing.assert_array_equal(order, expected)
+        np.testing.assert_array_equal(deg, string_net.degrees_at(edges, cutoff)[order])
+
+
+def test_rank_and_trajectory(edges, profile):
+    deg = string_net.degrees_at(edges, 700)
+    rank = profile.rank_at(700)
+    np.testing.assert_array_equal(rank, [(deg > d).sum() + 1 for d in deg])
+    traj = profile.trajectory([0, 1], [400, 700])
+    assert list(traj["cutoff"]) == [400, 400, 700, 700]
+    np.testing.assert_array_equal(traj["rank"][2:], rank[[0, 1]])
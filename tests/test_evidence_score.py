@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import evidence_score
+import string_net
+from conftest import protein_ids
+
+
+def string_combined(row) -> int:
+    """STRING 合并公式的逐边参照实现（去先验 -> 独立合并 -> 加回先验）"""
+    p = evidence_score.PRIOR
+    q = 1.0
+    for c in evidence_score.CHANNELS:
+        s = max(row[c] / 1000.0 - p, 0.0) / (1.0 - p)
+        q *= 1.0 - s
+    return int(round(((1.0 - q) * (1.0 - p) + p) * 1000.0))
+
+
+@pytest.fixture(scope="module")
+def detailed(tmp_path_factory):
+    rng = np.random.default_rng(3)
+    n, m = 200, 3000
+    ids = protein_ids(n)
+    a, b = rng.integers(0, n, m), rng.integers(0, n, m)
+    key = np.unique(np.minimum(a, b)[a != b] * n + np.maximum(a, b)[a != b])
+    df = pd.DataFrame({"protein1": ids[key // n], "protein2": ids[key % n]})
+    for c in evidence_score.CHANNELS:
+        df[c] = np.where(rng.random(len(df)) < 0.4, rng.integers(1, 1000, len(df)), 0)
+    df.loc[df[list(evidence_score.CHANNELS)].sum(axis=1) == 0, "textmining"] = 500
+    df["combined_score"] = df.apply(string_combined, axis=1)
+    rev = df.rename(columns={"protein1": "protein2", "protein2": "protein1"})
+
+    root = tmp_path_factory.mktemp("detailed")
+    path = str(root / "10090.protein.links.detailed.v12.0.txt.gz")
+    pd.concat([df, rev], ignore_index=True).to_csv(path, sep=" ", index=False, compression="gzip")
+    return path, str(root / "cache"), df
+
+
+def test_all_channels_reproduce_combined_score(detailed):
+    path, cache, df = detailed
+    table = evidence_score.load_detailed(path, cache)
+    assert table.n_edges == len(df)
+    score = evidence_score.combine(table, evidence_score.CHANNELS)
+    np.testing.assert_allclose(score.astype(int), np.asarray(table.channel("combined_score"), dtype=int), atol=1)
+
+
+def test_single_channel_is_identity(detailed):
+    """只选一个通道时，>= 先验（41）的子得分原样返回，其余记为先验或 0"""
+    path, cache, _ = detailed
+    table = evidence_score.load_detailed(path, cache)
+    exp = np.asarray(table.channel("experimental"), dtype=int)
+    score = evidence_score.combine(table, ["experimental"]).astype(int)
+    high = exp >= 41
+    np.testing.assert_array_equal(score[high], exp[high])
+    assert (score[(exp > 0) & ~high] == 41).all()
+    assert (score[exp == 0] == 0).all()
+
+
+def test_custom_edges_sorted_and_cached(detailed):
+    path, cache, _ = detailed
+    channels, weights = ["experimental", "database"], [1.0, 0.5]
+    custom = evidence_score.load_custom_edges(channels, weights, path, cache)
+    assert (np.diff(custom.score.astype(int)) <= 0).all() and (custom.score > 0).all()
+
+    table = evidence_score.load_detailed(path, cache)
+    score = evidence_score.combine(table, channels, weights)
+    assert len(custom.src) == int((score > 0).sum())
+    again = evidence_score.load_custom_edges(channels, weights, path, cache)
+    np.testing.assert_array_equal(again.score, custom.score)
+    assert evidence_score.config_key(channels, weights) == "experimental-database@0.5"
+    assert string_net.n_edges_at(custom, 700) == int((score >= 700).sum())
+
+
+def test_unknown_channel(detailed):
+    path, cache, _ = detailed
+    with pytest.raises(ValueError):
+        evidence_score.combine(evidence_score.load_detailed(path, cache), ["homology"])
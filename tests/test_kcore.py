@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import kcore
+import string_net
+from conftest import nx_graph_at
+
+
+@pytest.mark.parametrize("cutoff", [0, 400, 800])
+def test_core_numbers_match_networkx(edges, cutoff):
+    core = kcore.core_numbers_at(edges, cutoff)
+    G = nx_graph_at(edges, cutoff)
+    expected = nx.core_number(G)
+    nodes = np.array(list(G.nodes()))
+    np.testing.assert_array_equal(core[nodes], [expected[v] for v in nodes])
+    assert not core[np.setdiff1d(np.arange(edges.n_nodes), nodes)].any()
+
+
+def test_graph_core_numbers(edges):
+    G = string_net.to_networkx(edges.ids, *string_net.edges_at(edges, 500))
+    assert kcore.graph_core_numbers(G) == nx.core_number(G)
+
+
+@pytest.mark.parametrize("max_nodes", [10, 60, 150])
+def test_densest_core_budget(edges, max_nodes):
+    csr = string_net.csr_at(edges, 0)
+    core = kcore.core_numbers(csr)
+    keep = kcore.densest_core_nodes(csr, core, max_nodes)
+    assert 0 < len(keep) <= max_nodes
+    # 从最内层核开始选，诱导子图中没有孤立点
+    assert core[keep].max() == core.max()
+    H = nx_graph_at(edges, 0).subgraph(keep.tolist())
+    assert min(dict(H.degree()).values()) >= 1
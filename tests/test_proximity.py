@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import proximity
+import string_net
+from conftest import nx_graph_at
+
+
+def nx_distances(G: nx.Graph, n_nodes: int, sources) -> np.ndarray:
+    """n_nodes × len(sources)，不可达（含不在图中的节点）记 -1"""
+    out = np.full((n_nodes, len(sources)), -1, dtype=np.int64)
+    for j, s in enumerate(sources):
+        if s not in G:
+            out[s, j] = 0
+            continue
+        for v, d in nx.single_source_shortest_path_length(G, s).items():
+            out[v, j] = d
+    return out
+
+
+@pytest.mark.parametrize("cutoff, batch", [(150, 256), (700, 64)])
+def test_source_distances_match_bfs(edges, cutoff, batch):
+    """多个 64 位字、多批次、不连通网络都要与逐源 BFS 一致"""
+    csr = string_net.csr_at(edges, cutoff)
+    G = nx_graph_at(edges, cutoff)
+    sources = np.random.default_rng(5).choice(edges.n_nodes, 150, replace=False)
+    D = proximity.source_distances(csr, sources, batch=batch)
+    np.testing.assert_array_equal(D, nx_distances(G, edges.n_nodes, sources))
+
+
+def test_source_distances_rows(edges):
+    csr = string_net.csr_at(edges, 500)
+    sources, rows = np.arange(0, 90, 3), np.arange(100, 160)
+    full = proximity.source_distances(csr, sources)
+    np.testing.assert_array_equal(proximity.source_distances(csr, sources, rows=rows), full[rows])
+
+
+def test_nearest_distance(edges):
+    csr = string_net.csr_at(edges, 700)
+    G = nx_graph_at(edges, 700)
+    sources = [1, 2, 3, 50]
+    D = nx_distances(G, edges.n_nodes, sources)
+    reachable = D >= 0
+    expected = np.where(reachable, D, D.max() + 1).min(axis=1)
+    expected[~reachable.any(axis=1)] = -1
+    np.testing.assert_array_equal(proximity.nearest_distance(csr, sources), expected)
+
+
+def test_set_measures(edges):
+    csr = string_net.csr_at(edges, 150)
+    G = nx_graph_at(edges, 150)
+    a, b = np.array([0, 4, 9, 30]), np.array([12, 40, 41])
+    d = dict(nx.all_pairs_shortest_path_length(G))
+    D_ab = np.array([[d[v][u] for u in a] for v in b])
+    m = proximity.set_measures(csr, a, b)
+    assert m["closest"] == pytest.approx(D_ab.min(axis=1).mean())
+    assert m["shortest"] == pytest.approx(D_ab.mean())